@@ -319,6 +319,79 @@ def time2datetime(dates):
     return [datetime_.fromtimestamp(time.mktime(i)) for i in dates]
 
 
+def decode_CF_times(values, units, calendar='standard',
+                    rtn_DatetimeIndex=True):
+    """
+    Convert CF numeric times (e.g. "hours since 1985-01-01") to datetimes
+
+    Parameters
+    -----
+    values (array): numeric times to convert
+    units (str): CF time units (e.g. 'hours since 1985-01-01 00:00:00')
+    calendar (str): CF calendar of the times
+    rtn_DatetimeIndex (bool): return a pd.DatetimeIndex, not a list
+
+    Returns
+    -------
+    (pd.DatetimeIndex or list)
+
+    Notes
+    -----
+     - All times are converted at once with numpy datetime64 arithmetic (to
+     microsecond precision, as for add_hrs etc), or with a single batch call to
+     netCDF4.num2date for non-standard calendars (which are then returned as
+     the equivalent standard dates).
+     - If the dates of a non-standard calendar do not all exist in the
+     standard calendar (e.g. 30th Feb for '360_day'), then they are returned
+     as cftime dates (in a xr.CFTimeIndex or list).
+     - A ValueError is raised for units that are not setup
+    """
+    values = np.atleast_1d(np.asarray(values, dtype=np.float64))
+    try:
+        unit_str, ref_str = [i.strip() for i in str(units).split('since')]
+    except ValueError:
+        unit_str, ref_str = None, None
+    us_in_unit = {
+        'days': 86400E6, 'day': 86400E6, 'd': 86400E6,
+        'hours': 3600E6, 'hour': 3600E6, 'h': 3600E6,
+        'minutes': 60E6, 'minute': 60E6, 'min': 60E6,
+        'seconds': 1E6, 'second': 1E6, 's': 1E6,
+    }
+    if unit_str not in us_in_unit:
+        err_str = 'time unit not setup: {}'.format(units)
+        logging.error(err_str)
+        raise ValueError(err_str)
+    standard_calendars = (None, 'standard', 'gregorian',
+                          'proleptic_gregorian')
+    if calendar in standard_calendars:
+        ref_date = pd.Timestamp(ref_str).tz_localize(None)
+        offsets = np.round(values * us_in_unit[unit_str])
+        dates = np.datetime64(ref_date, 'us') + \
+            offsets.astype('timedelta64[us]')
+        dates = pd.DatetimeIndex(dates)
+    else:
+        from netCDF4 import num2date
+        cf_dates = num2date(values, units, calendar=calendar,
+                            only_use_cftime_datetimes=True)
+        try:
+            dates = pd.DatetimeIndex([
+                datetime_(i.year, i.month, i.day, i.hour, i.minute, i.second,
+                          i.microsecond) for i in cf_dates])
+        except ValueError:
+            import xarray as xr
+            logging.info("Keeping cftime dates ('{}' calendar)".format(
+                calendar))
+            dates = xr.CFTimeIndex(cf_dates)
+            if rtn_DatetimeIndex:
+                return dates
+            else:
+                return list(dates)
+    if rtn_DatetimeIndex:
+        return dates
+    else:
+        return list(dates.to_pydatetime())
+
+
 def num2month(input=None, reverse=False, rtn_dict=False):
     """
     Convert number (1-12) to abbreviated name of month
@@ -356,6 +429,33 @@ def num2month(input=None, reverse=False, rtn_dict=False):
         return d[input]
 
 
+def get_season_labels4months(months=list(range(1, 13)),
+                             seasons=('DJF', 'MAM', 'JJA', 'SON')):
+    """
+    Get an index of the season for each month (e.g. for grouped reductions)
+
+    Parameters
+    -------
+    months (list): months (1-12) to label (e.g. of each model output time)
+    seasons (list): seasons, as strings of the first letter of each month
+
+    Returns
+    -------
+    (np.array) of season numbers (index of seasons), or -1 if not in a season
+    """
+    months_str = 'JFMAMJJASOND'
+    month2season = np.full(12, -1, dtype=np.int64)
+    for n, season in enumerate(seasons):
+        # Find the first month of the season (allowing for wrap around)
+        for start in range(12):
+            match = ''.join([months_str[(start+i) % 12]
+                             for i in range(len(season))])
+            if match == season:
+                month2season[[(start+i) % 12 for i in range(len(season))]] = n
+                break
+    return month2season[np.asarray(months, dtype=np.int64) - 1]
+
+
 def DF_YYYYMMDD_HHMM_2_dt(df, date_header='YYYYMMDD', time_header='HHMM',
                           rmvars=None, epoch=False):
     """
@@ -372,23 +472,25 @@ def DF_YYYYMMDD_HHMM_2_dt(df, date_header='YYYYMMDD', time_header='HHMM',
     -------
     (pd.DataFrame)
     """
-    # Function to map integer to 4 char str
-    def format(x): return '{:0>4}'.format(int(x))
-    # Use mapped function for speed.
-    df[time_header] = df[time_header].map(format)
-    # Combine to make datetime.
-    # ( go via integer for dates, to ensure no floating zeros appear )
-    df['Datetime'] = df[date_header].astype(int).astype(str) + \
-        df[time_header].astype(str)
-    logging.debug('1st 10 dates: '.format(logging.debug(df['Datetime'][:10])))
-    df['Datetime'] = pd.to_datetime(df['Datetime'], format='%Y%m%d%H%M')
+    # Get the dates and times as integers (e.g. from strings or floats)
+    dates = pd.to_numeric(df[date_header]).astype(np.int64).values
+    times = pd.to_numeric(df[time_header]).astype(np.int64).values
+    # Keep the times as 4 char strings (e.g. '0930')
+    df[time_header] = np.char.zfill(times.astype(str), 4)
+    # Combine to make datetime (vectorised over the components)
+    df['Datetime'] = pd.to_datetime(pd.DataFrame({
+        'year': dates // 10000, 'month': dates // 100 % 100,
+        'day': dates % 100, 'hour': times // 100, 'minute': times % 100,
+    }, index=df.index))
+    logging.debug('1st 10 dates: {}'.format(df['Datetime'][:10]))
     # Remove variables if list provided as "rmvars"
     if isinstance(rmvars, list):
-        [df.drop(i, 1) for i in rmvars]
+        df = df.drop(columns=rmvars)
     # Convert to Epoch if requested
     if epoch:
-        def format(x): return unix_time(x)
-        df['Epoch'] = df['Datetime'].map(format).astype('i8')
+        epoch0 = np.datetime64('1970-01-01T00:00:00', 's')
+        dt64 = df['Datetime'].values.astype('datetime64[s]')
+        df['Epoch'] = (dt64 - epoch0).astype('i8')
         del df['Datetime']
     else:
         df.index = df['Datetime']
@@ -57,9 +57,14 @@ try:
 except ImportError:
     print("WARNING: failed to import Python module 'BeautifulSoup'")
 
+# Folder for local copies of GEOS-CF subsets (see get_GEOSCF_subset_ds)
+GEOSCF_cache_dir = os.environ.get('AC_TOOLS_GEOSCF_CACHE',
+                                  os.path.join(os.path.expanduser('~'),
+                                               '.cache', 'AC_tools', 'GEOS-CF'))
+
 
 def get_GEOSCF_as_ds_via_OPeNDAP(collection='chm_inst_1hr_g1440x721_p23',
-                                 mode='fcast', date=None):
+                                 mode='fcast', date=None, root_url=None):
     """
     Get the GEOS Composition Forecast (GEOS-CF) as a xr.Dataset (using OPeNDAP)
 
@@ -68,6 +73,8 @@ def get_GEOSCF_as_ds_via_OPeNDAP(collection='chm_inst_1hr_g1440x721_p23',
     mode (str): retrieve the forecast (fcast) or assimilated fields (assim)
     date (datetime.datetime): date to retrieve forecast from or assimilation for
     collection (str): data collection to access (e.g. chm_inst_1hr_g1440x721_p23)
+    root_url (str): root OPeNDAP directory (default = NASA's GEOS-CF server),
+        this can also be a local folder of files named as the URLs
 
     Returns
     -------
@@ -87,8 +94,9 @@ def get_GEOSCF_as_ds_via_OPeNDAP(collection='chm_inst_1hr_g1440x721_p23',
     xgc_tavg_1hr_g1440x721_x1
     """
     # Root OPeNDAP directory
-    root_url = 'https://opendap.nccs.nasa.gov/dods/gmao/geos-cf/{}/'.format(
-        mode)
+    if isinstance(root_url, type(None)):
+        root_url = 'https://opendap.nccs.nasa.gov/dods/gmao/geos-cf/'
+    root_url = '{}/{}/'.format(root_url.rstrip('/'), mode)
     # Make up the complete URL for a forecast or assimilation field
     if mode == 'fcast':
         # Which date to use?
@@ -115,6 +123,149 @@ def get_GEOSCF_as_ds_via_OPeNDAP(collection='chm_inst_1hr_g1440x721_p23',
     return ds
 
 
+def get_slice4coord(values, vmin=None, vmax=None):
+    """
+    Get a slice of a (monotonic) coordinate for values between vmin and vmax
+
+    Parameters
+    ----------
+    values (np.array): coordinate values (ascending or descending)
+    vmin, vmax (float or np.datetime64): range of values to include
+
+    Returns
+    -------
+    (slice)
+    """
+    values = np.asarray(values)
+    descending = (len(values) > 1) and (values[0] > values[-1])
+    if descending:
+        values = values[::-1]
+    start, end = 0, len(values)
+    if not isinstance(vmin, type(None)):
+        start = np.searchsorted(values, vmin, side='left')
+    if not isinstance(vmax, type(None)):
+        end = np.searchsorted(values, vmax, side='right')
+    if descending:
+        start, end = len(values) - end, len(values) - start
+    return slice(int(start), int(end))
+
+
+def get_GEOSCF_subset_ds(collection='chm_inst_1hr_g1440x721_p23',
+                         mode='assim', sdate=None, edate=None, lat_min=None,
+                         lat_max=None, lon_min=None, lon_max=None,
+                         vars2extract=None, cache_dir=None, use_cache=True,
+                         root_url=None, date=None, dsLonVar='lon',
+                         dsLatVar='lat', dsTimeVar='time', complevel=4,
+                         debug=False):
+    """
+    Get a subset of a GEOS-CF collection (from a local copy if already saved)
+
+    Parameters
+    ----------
+    collection (str): data collection to access (e.g. chm_inst_1hr_g1440x721_p23)
+    mode (str): retrieve the forecast (fcast) or assimilated fields (assim)
+    sdate, edate (datetime.datetime): start and end dates of subset
+    lat_min, lat_max, lon_min, lon_max (float): bounding box of subset
+    vars2extract (list): variables to include (default = all)
+    cache_dir (str): folder to save subsets in (default = GEOSCF_cache_dir)
+    use_cache (bool): use (and save) local copies of subsets
+    root_url (str): root OPeNDAP directory (see get_GEOSCF_as_ds_via_OPeNDAP)
+    date (datetime.datetime): date of forecast to use for mode='fcast'
+        (default = latest)
+    complevel (int): zlib compression level for the saved variables
+
+    Returns
+    -------
+    (xr.dataset)
+
+    Notes
+    -----
+     - Subsets are saved as (compressed) NetCDF files, named by a hash of the
+     (collection, mode, root_url, forecast, dates, bounding box, variables).
+     The dates are extended to whole days and the bounding box to whole
+     degrees, so repeated extractions for nearby locations on the same days
+     use the same file.
+     - The latest forecast is opened to get its first time for the hash
+     - Subsets without an end date, or that end after the last time in the
+     collection (e.g. assimilation fields not yet available), are not saved
+     - The subset is selected by slicing the coordinates (using searchsorted)
+    """
+    import json
+    import hashlib
+    import tempfile
+    # Extend the subset to whole days and degrees
+    if not isinstance(sdate, type(None)):
+        sdate = pd.Timestamp(sdate).floor('D')
+    if not isinstance(edate, type(None)):
+        edate = pd.Timestamp(edate).ceil('D')
+    bbox = [lat_min, lat_max, lon_min, lon_max]
+    bbox = [None if isinstance(i, type(None)) else float(func(i)) for i, func
+            in zip(bbox, [np.floor, np.ceil, np.floor, np.ceil])]
+    if not isinstance(vars2extract, type(None)):
+        vars2extract = sorted(vars2extract)
+    # Which forecast is used? (the latest is identified by its first time)
+    ds = None
+    fcast = None
+    if mode == 'fcast':
+        if isinstance(date, type(None)):
+            ds = get_GEOSCF_as_ds_via_OPeNDAP(collection=collection,
+                                              mode=mode, root_url=root_url)
+            fcast = 'latest: {}'.format(ds[dsTimeVar].values[0])
+        else:
+            fcast = date.strftime('%Y%m%d_12z')
+    # Use a local copy of this subset, if it exists
+    key = [collection, mode, root_url, fcast, str(sdate), str(edate), bbox,
+           vars2extract]
+    key = json.dumps(key)
+    if isinstance(cache_dir, type(None)):
+        cache_dir = GEOSCF_cache_dir
+    filename = '{}_{}.nc'.format(collection,
+                                 hashlib.sha1(key.encode()).hexdigest())
+    filename = os.path.join(cache_dir, filename)
+    if use_cache and os.path.exists(filename):
+        if debug:
+            print('Using local copy of GEOS-CF subset: {}'.format(filename))
+        if not isinstance(ds, type(None)):
+            ds.close()
+        return xr.open_dataset(filename)
+    # Otherwise retrieve the subset via OPeNDAP
+    if isinstance(ds, type(None)):
+        ds = get_GEOSCF_as_ds_via_OPeNDAP(collection=collection, mode=mode,
+                                          date=date, root_url=root_url)
+    if not isinstance(vars2extract, type(None)):
+        ds = ds[vars2extract]
+    time = ds[dsTimeVar].values
+    to_dt64 = [None if isinstance(i, type(None)) else
+               np.datetime64(i.to_datetime64(), 'ns').astype(time.dtype)
+               for i in (sdate, edate)]
+    ds = ds.isel({
+        dsTimeVar: get_slice4coord(time, *to_dt64),
+        dsLatVar: get_slice4coord(ds[dsLatVar].values, *bbox[:2]),
+        dsLonVar: get_slice4coord(ds[dsLonVar].values, *bbox[2:]),
+    })
+    # Only save subsets that are complete (i.e. end within the collection)
+    complete = (not isinstance(edate, type(None))) and (to_dt64[1] <= time[-1])
+    if not (use_cache and complete):
+        if debug and use_cache:
+            print('Not saving incomplete GEOS-CF subset: {}'.format(key))
+        return ds.load()
+    # Save the subset locally (via a temporary file) and then reload
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+    ds.attrs['AC_tools_subset'] = key
+    encoding = dict([(i, {'zlib': True, 'complevel': complevel})
+                     for i in ds.data_vars])
+    fd, tmp_file = tempfile.mkstemp(suffix='.tmp', dir=cache_dir)
+    os.close(fd)
+    try:
+        ds.to_netcdf(tmp_file, encoding=encoding)
+        os.replace(tmp_file, filename)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return xr.open_dataset(filename)
+
+
 def get_GEOS5_as_ds_via_OPeNDAP(collection='inst3_3d_aer_Nv',
                                 fcast_start_hour=12,
                                 mode='seamless', dt=None):
@@ -339,12 +490,15 @@ def extract_GEOSCF4FAAM_flight(folder=None, flight_ID='C216', folder4csv=None,
                                LonVar='LON_GIN',
                                LatVar='LAT_GIN', TimeVar='Time',
                                testing_mode=True, csv_suffix='',
-                               inc_ds_vars_in_csv=False):
+                               inc_ds_vars_in_csv=False, cache_dir=None,
+                               root_url=None):
     """
     Extract the GEOS-CF model for a given FAAM BAe146 flight
 
     Parameters
     -------
+    cache_dir (str): folder to save local copies of GEOS-CF subsets in
+    root_url (str): root OPeNDAP directory (see get_GEOSCF_as_ds_via_OPeNDAP)
 
     Returns
     -------
@@ -367,12 +521,14 @@ def extract_GEOSCF4FAAM_flight(folder=None, flight_ID='C216', folder4csv=None,
     collection = 'chm_inst_1hr_g1440x721_p23'
     df1 = extract_GEOSCF_assim4df(df, PressVar=PressVar, LonVar=LonVar,
                                   LatVar=LatVar, TimeVar=TimeVar,
-                                  collection=collection)
+                                  collection=collection, cache_dir=cache_dir,
+                                  root_url=root_url)
     # Get variables from meterology collection
     collection = 'met_inst_1hr_g1440x721_p23'
     df2 = extract_GEOSCF_assim4df(df, PressVar=PressVar, LonVar=LonVar,
                                   LatVar=LatVar, TimeVar=TimeVar,
-                                  collection=collection)
+                                  collection=collection, cache_dir=cache_dir,
+                                  root_url=root_url)
     # Combine dataframes and remove duplicate columns
     dfs = [df1, df2]
     df = pd.concat(dfs, axis=1)
@@ -402,7 +558,8 @@ def extract_GEOSCF_assim4df(df=None, ds=None,
                             testing_mode=False, inc_attrs=True,
                             TEMP_nc_name=None,
                             resample_df2ds_freq=False,
-                            spatial_buffer=None,
+                            spatial_buffer=None, method='nearest',
+                            cache_dir=None, use_cache=True, root_url=None,
                             debug=False):
     """
     Extract GEOS-CF collection for dataframe point locations (e.g. flightpath)
@@ -410,16 +567,53 @@ def extract_GEOSCF_assim4df(df=None, ds=None,
     Parameters
     -------
     df (pd.DataFrame): dataframe with locations to extract as rows
+    method (str): 'nearest' (neighbour) or 'linear' interpolation (see
+        calc_4D_weights_in_ds)
+    cache_dir (str): folder to save local copies of subsets in
+    use_cache (bool): use (and save) local copies of subsets
+    root_url (str): root OPeNDAP directory (see get_GEOSCF_as_ds_via_OPeNDAP)
+    TEMP_nc_name (str): deprecated and not used (subsets are saved in
+        cache_dir)
 
     Returns
     -------
     (None)
+
+    Notes
+    -----
+     - The model coordinates ("model-lat", ...) are only included for 'nearest'
+     - The subset of the collection is loaded into memory (and its local copy
+     closed) before the values are extracted
     """
+    if not isinstance(TEMP_nc_name, type(None)):
+        import warnings
+        warnings.warn('TEMP_nc_name is not used (subsets are saved in '
+                      'cache_dir) and will be removed', DeprecationWarning,
+                      stacklevel=2)
     # Get the start and end date of dataframe (with a 1/4 day buffer)
     sdate = add_days(df.index.min(), -0.25)
     edate = add_days(df.index.max(), 0.25)
-    # Retrieve the 1D/3D fields from OPenDAP for given collection
-    ds = get_GEOSCF_as_ds_via_OPeNDAP(collection=collection, mode=mode)
+    # Reduce the dataset size to the spatial locations of the flight (+ buffer)
+    if isinstance(spatial_buffer, type(None)):
+        spatial_buffer = 2  # degrees lat / lon
+    lat_min = df[LatVar].values.min() - spatial_buffer
+    lat_max = df[LatVar].values.max() + spatial_buffer
+    lon_min = df[LonVar].values.min() - spatial_buffer
+    lon_max = df[LonVar].values.max() + spatial_buffer
+    # Retrieve the subset of the 1D/3D fields for the day(s) of the flight
+    # (and load this, closing the local copy)
+    with get_GEOSCF_subset_ds(collection=collection, mode=mode,
+                              sdate=sdate, edate=edate,
+                              lat_min=lat_min, lat_max=lat_max,
+                              lon_min=lon_min, lon_max=lon_max,
+                              vars2extract=vars2extract, cache_dir=cache_dir,
+                              use_cache=use_cache, root_url=root_url,
+                              dsLonVar=dsLonVar, dsLatVar=dsLatVar,
+                              dsTimeVar=dsTimeVar, debug=debug) as ds:
+        ds = ds.load()
+    # Extract all of the data variables unless a specific list is provided
+    if isinstance(vars2extract, type(None)):
+        vars2extract = list(ds.data_vars)
     # Check if there are multiple horizontal levels in OPenDAP dataset
     try:
         if len(ds.lev.values) == 1:
@@ -428,26 +622,6 @@ def extract_GEOSCF_assim4df(df=None, ds=None,
             single_horizontal_level = False
     except AttributeError:
         single_horizontal_level = True
-    # Extract all of the data variables unless a specific list is provided
-    if isinstance(vars2extract, type(None)):
-        vars2extract = list(ds.data_vars)
-    ds = ds[vars2extract]
-    # Restrict the dataset to the day(s) of the flight
-    dates = dt64_2_dt(ds.time.values)
-#    time_bool = [((i>=sdate) & (i<=edate)) for i in ds.time.values]
-    time_bool = [((i >= sdate) & (i <= edate)) for i in dates]
-    ds = ds.isel(time=time_bool)
-    # Reduce the dataset size to the spatial locations of the flight (+ buffer)
-    if isinstance(spatial_buffer, type(None)):
-        spatial_buffer = 2  # degrees lat / lon
-    lat_min = df[LatVar].values.min() - spatial_buffer
-    lat_max = df[LatVar].values.max() + spatial_buffer
-    lat_bool = [((i >= lat_min) & (i <= lat_max)) for i in ds[dsLatVar].values]
-    ds = ds.isel(lat=lat_bool)
-    lon_min = df[LonVar].values.min() - spatial_buffer
-    lon_max = df[LonVar].values.max() + spatial_buffer
-    lon_bool = [((i >= lon_min) & (i <= lon_max)) for i in ds[dsLonVar].values]
-    ds = ds.isel(lon=lon_bool)
     # Get a list of the levels that the data is present for
     # NOTE: GEOS-CF has 3 options (p23, interpolated; x1/v1, surface)
     if single_horizontal_level:
@@ -455,28 +629,66 @@ def extract_GEOSCF_assim4df(df=None, ds=None,
         HPa_l = [HPa_l[-1]]
     else:
         HPa_l = get_GEOSCF_vertical_levels(native_levels=False)
-    # Save subset of dataset locally and then reload
-    if isinstance(TEMP_nc_name, type(None)):
-        TEMP_nc_name = 'TEMP_NetCDF_{}.nc'.format(collection)
-    ds = save_ds2disk_then_reload(ds, savename=TEMP_nc_name, debug=debug)
     # Resample the values to extract
     if resample_df2ds_freq:
         grads_step = ds.time.attrs['grads_step']
         grads_step = grads_step.replace('mn', 'T')
         df = df.resample(grads_step).mean()
-    # Get nearest indexes in 4D data from locations in dataframe
-    idx_dict = calc_4D_idx_in_ds(ds_hPa=HPa_l, ds=ds, df=df,
-                                 TimeVar=TimeVar,
-                                 AltVar=PressVar,
-                                 LatVar=LatVar, LonVar=LonVar,
-                                 dsLonVar=dsLonVar, dsLatVar=dsLatVar,
-                                 dsTimeVar=dsTimeVar,
-                                 )
     # Make a dictionaries to convert between ds and df variable names
     df2ds_dict = {
         LonVar: dsLonVar, LatVar: dsLatVar, TimeVar: dsTimeVar, PressVar: dsAltVar,
     }
     df2ds_dict_r = {v: k for k, v in list(df2ds_dict.items())}
+    # Get interpolation indexes and weights in 4D data for dataframe locations
+    if method == 'linear':
+        idx_dict, weights = calc_4D_weights_in_ds(ds_hPa=HPa_l, ds=ds, df=df,
+                                                  TimeVar=TimeVar,
+                                                  AltVar=PressVar,
+                                                  LatVar=LatVar, LonVar=LonVar,
+                                                  dsLonVar=dsLonVar,
+                                                  dsLatVar=dsLatVar,
+                                                  dsTimeVar=dsTimeVar,
+                                                  )
+        idx_dict = dict([(df2ds_dict[i], idx_dict[i]) for i in idx_dict])
+        # Gather and weight all variables at once
+        dfN = extract_ds4idx(ds[vars2extract], idx_dict, weights=weights)
+    # Get nearest indexes in 4D data from locations in dataframe
+    else:
+        idx_dict = calc_4D_idx_in_ds(ds_hPa=HPa_l, ds=ds, df=df,
+                                     TimeVar=TimeVar,
+                                     AltVar=PressVar,
+                                     LatVar=LatVar, LonVar=LonVar,
+                                     dsLonVar=dsLonVar, dsLatVar=dsLatVar,
+                                     dsTimeVar=dsTimeVar,
+                                     )
+        dfN = extract_GEOSCF_vals4idx(ds, idx_dict, vars2extract, df2ds_dict_r,
+                                      dsTimeVar=dsTimeVar, dsLonVar=dsLonVar,
+                                      dsLatVar=dsLatVar, dsAltVar=dsAltVar,
+                                      debug=debug)
+    # Include variable attributes from original dataset
+    if inc_attrs:
+        for col in dfN.columns:
+            try:
+                attrs = ds[col].attrs.copy()
+                dfN[col].attrs = attrs
+            except KeyError:
+                pass
+    # Save the datetime as a column too
+    dfN['Datetime'] = df.index.values
+    # Return the extracted dataframe of flighttrack points
+    return dfN
+
+
+def extract_GEOSCF_vals4idx(ds, idx_dict, vars2extract, df2ds_dict_r,
+                            dsTimeVar='time', dsLonVar='lon', dsLatVar='lat',
+                            dsAltVar='lev', debug=False):
+    """
+    Extract GEOS-CF values (and model coordinates) for nearest 4D indexes
+
+    Returns
+    -------
+    (pd.DataFrame)
+    """
     # Create a data frame for values
     dfN = pd.DataFrame()
     # Extraction of data points in a bulk manner
@@ -498,21 +710,8 @@ def extract_GEOSCF_assim4df(df=None, ds=None,
     dfN['model-lat'] = ds[dsLatVar].values[lat_idx]
     alt_idx = idx_dict[df2ds_dict_r[dsAltVar]]
     dfN['model-alt'] = ds[dsAltVar].values[alt_idx]
-    # Include variable attributes from original dataset
-    if inc_attrs:
-        for col in dfN.columns:
-            try:
-                attrs = ds[col].attrs.copy()
-                dfN[col].attrs = attrs
-            except KeyError:
-                pass
-    # Save the datetime as a column too
-    dfN['Datetime'] = df.index.values
     # Update the model datetime to be in datetime units
     dfN['model-time'] = pd.to_datetime(dfN['model-time'].values)
-    # Remove the temporary NetCDF file (of OPenDap dataset subset) from disk
-    rm_file(folder='./', filename=TEMP_nc_name)
-    # Return the extracted dataframe of flighttrack points
     return dfN
 
 
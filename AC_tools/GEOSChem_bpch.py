@@ -83,6 +83,9 @@ def get_surface_area(res=None, wd=None, debug=False):
     -----
      - this function accesses previsouly run GEOS-Chem
         1day files with just DXYP / DXYP diagnostic ouptuted
+     - If no wd is given, the values are served from the static field bundle
+     for the resolution (see get_static_fields4res), or calculated for the
+     grid if there are no reference files (see calc_surface_area4grid)
     """
     # Log call of function to module log file
     logging.info("Getting the surface area for res={}".format(res))
@@ -93,29 +96,20 @@ def get_surface_area(res=None, wd=None, debug=False):
 
     logging.debug(locals())
 
-    # if the wd has not been specified then use the previous runs
+    # if the wd has not been specified then use the static field bundle
     if isinstance(wd, type(None)):
-
-        # Get AC_tools location, then set example data folder location
-        import os
-        import inspect
-        filename = inspect.getframeinfo(inspect.currentframe()).filename
-        path = os.path.dirname(os.path.abspath(filename))
-        dwd = path+'/../data/LM/'
-        logging.debug("dwd = " + str(dwd))
-        # Choose the correct directory for a given resolution
-        dir = {
-            '4x5': 'LANDMAP_LWI_ctm_4x5',
-            '2x2.5': 'LANDMAP_LWI_ctm_2x25',
-            '0.5x0.666': 'LANDMAP_LWI_ctm_05x0666',
-            '0.25x0.3125': 'LANDMAP_LWI_ctm_025x03125',
-            '0.125x0.125': 'LANDMAP_LWI_ctm_0125x0125',
-        }[res]
-        fd = dwd + dir
-
-        logging.debug("resolution = {res}, lookup directory = {fd}".format(
-            res=res, fd=fd))
-        wd = fd
+        logging.debug("Getting surface area from static fields for res={}"
+                      .format(res))
+        try:
+            return np.array(get_static_fields4res(res=res)['DXYP'])
+        except (IOError, KeyError):
+            logging.warning("No reference surface area for res={}, "
+                            "calculating it from the grid".format(res))
+        try:
+            return calc_surface_area4grid(res=res)[..., None]
+        except ValueError:
+            logging.error("Could not get the surface area!")
+            raise ValueError("Could not find the surface area")
 
     logging.debug("Trying to get surface area from {wd}".format(wd=wd))
     try:
@@ -206,61 +200,234 @@ def get_LWI_map(res='4x5', date=None, wd=None, rtn_ds=False,
 
     Notes
     -----
-     - This approach is inefficent and requires large files. Could this be improved with
-     on-line extract on inclusion of generic output for various resoltions as txt files?
+     - Values are served from a compact static field bundle made once from
+     the reference LANDMAP files (see get_static_fields4res)
     """
-    logging.info('called get surface area, for {}'.format(res))
-    # Get AC_tools location, then set example data folder location
-    import os
-    import xarray as xr
-    import inspect
-    filename = inspect.getframeinfo(inspect.currentframe()).filename
-    path = os.path.dirname(os.path.abspath(filename))
-    dwd = path+'/../data/LM/'
-    # Choose the right directory for the data
-    dir = {
-        '4x5': 'LANDMAP_LWI_ctm_4x5',
-        '2x2.5': 'LANDMAP_LWI_ctm_2x25',
-        '0.5x0.666': 'LANDMAP_LWI_ctm_05x0666',
-        '0.25x0.3125': 'LANDMAP_LWI_ctm_025x03125',
-        '0.125x0.125': 'LANDMAP_LWI_ctm_0125x0125',
-    }[res]
-    land_dir = os.path.join(dwd, dir)
-    if debug:
-        logging.info(land_dir)
-
-    # NetCDF approach unless
-    if res == '0.125x0.125':
-        #
+    logging.info('called get LWI map, for {}'.format(res))
+    # Return the full dataset from the reference file if requested
+    if rtn_ds:
+        land_dir = get_LANDMAP_dir4res(res=res)
         ds = xr.open_dataset(os.path.join(land_dir, 'ctm.nc'))
+        if (res == '0.125x0.125') and average_over_time and \
+                isinstance(date, type(None)):
+            ds = ds.mean(dim='time')
+        return ds
+    # Otherwise serve the values from the static field bundle
+    static_fields = get_static_fields4res(res=res)
+    if res == '0.125x0.125':
         # No date? Just use annual average
         if isinstance(date, type(None)):
             if average_over_time:
-                ds = ds.mean(dim='time')
-            if rtn_ds:
-                return ds
+                return np.array(static_fields['LWI'])
             else:
-                return ds['LWI'].values
+                return np.array(static_fields['LWI_monthly'])
         if isinstance(date, int):
-            import glob
-            # find nearest datetime
-#                landmap = ds['LWI']
-#                landmap = landmap.sel(time=date, method='nearest').values
             # Kludge, just find nearest month for now.
-            months = ds['time.month'].values
-            ind = find_nearest(date, months)
-            landmap = ds['LWI'][ind, ...].values
+            ind = find_nearest(date, static_fields['months'])
+            landmap = np.array(static_fields['LWI_monthly'][ind, ...])
             # transpose (as PyGChem read was re-ordering COARDS NetCDF)
-            landmap = landmap.T
-            return landmap
+            return landmap.T
+    else:
+        return np.array(static_fields['LWI'])
+
+
+def get_LANDMAP_dir4res(res='4x5'):
+    """
+    Get the folder containing the reference LANDMAP (LWI, DXYP) NetCDF
+
+    Parameters
+    -------
+    res (str): resolution of model to get the folder for (e.g. '4x5')
+
+    Returns
+    -------
+    (str)
+    """
+    # Get AC_tools location, then set example data folder location
+    AC_tools_dir = os.path.dirname(os.path.abspath(__file__))
+    dwd = os.path.join(AC_tools_dir, '..', 'data', 'LM')
+    # Choose the correct directory for a given resolution
+    try:
+        dir = {
+            '4x5': 'LANDMAP_LWI_ctm_4x5',
+            '2x2.5': 'LANDMAP_LWI_ctm_2x25',
+            '0.5x0.666': 'LANDMAP_LWI_ctm_05x0666',
+            '0.25x0.3125': 'LANDMAP_LWI_ctm_025x03125',
+            '0.125x0.125': 'LANDMAP_LWI_ctm_0125x0125',
+        }[res]
+    except KeyError:
+        logging.error("{res} not a recognised resolution!".format(res=res))
+        raise KeyError("No LANDMAP folder for res={}".format(res))
+    land_dir = os.path.join(dwd, dir)
+    logging.debug("resolution = {res}, lookup directory = {fd}".format(
+        res=res, fd=land_dir))
+    return land_dir
+
+
+# Folder for the static field bundles (see mk_static_fields_bundle4res)
+static_fields_cache_dir = os.environ.get(
+    'AC_TOOLS_STATIC_FIELDS_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'AC_tools',
+                 'static_fields'))
 
+# Static field bundles already loaded in this session (keyed by resolution)
+_static_fields4res = {}
+
+
+def mk_static_fields_bundle4res(res='4x5', folder=None, verbose=False):
+    """
+    Make a compact bundle of the static fields (LWI, DXYP) for a resolution
+
+    Parameters
+    -------
+    res (str): resolution of model to make the bundle for (e.g. '4x5')
+    folder (str): folder to save the bundle to (default: the resolution's
+        folder within static_fields_cache_dir)
+    verbose (bool): print (minor) logging to screen
+
+    Returns
+    -------
+    (dict) of arrays for the static fields
+
+    Notes
+    -----
+     - Fields: LWI (as returned by get_LWI_map), LWI_monthly (LWI for each
+     time in the reference file), DXYP (surface area, as returned by
+     get_surface_area) and, for 0.125x0.125, months (month of each
+     LWI_monthly time).
+     - Each field is saved as an uncompressed .npy file, so that it can be
+     memory-mapped by get_static_fields4res.
+     - Files are written to temporary names and then moved into place, with
+     a "bundle.json" file (holding the path and modification time of the
+     reference file) written last to mark the bundle as complete.
+     - The bundle is saved outside of the package (the folder can be set with
+     the AC_TOOLS_STATIC_FIELDS_CACHE environment variable), as installed
+     packages may be read-only.
+    """
+    land_dir = get_LANDMAP_dir4res(res=res)
+    if isinstance(folder, type(None)):
+        folder = os.path.join(static_fields_cache_dir, res)
+    if verbose:
+        print('Making static field bundle for {} in {}'.format(res, folder))
+    # Extract the fields from the reference NetCDF file
+    if not os.path.exists(os.path.join(land_dir, 'ctm.nc')):
+        err_msg = "Could not find {}, are the reference files in "
+        err_msg += "'AC_tools/data/LM'? (see scripts/get_data_files.py)"
+        logging.error(err_msg.format(land_dir))
+        raise IOError(err_msg.format(land_dir))
+    static_fields = {}
+    source = os.path.abspath(os.path.join(land_dir, 'ctm.nc'))
+    source_mtime = os.path.getmtime(source)
+    with xr.open_dataset(source) as ds:
+        has_DXYP = 'DXYP__DXYP' in ds.data_vars
+        if res == '0.125x0.125':
+            static_fields['LWI'] = ds['LWI'].mean(dim='time').values
+            static_fields['LWI_monthly'] = ds['LWI'].values
+            static_fields['months'] = ds['time.month'].values
+    if res != '0.125x0.125':
+        LWI = get_GC_output(wd=land_dir, vars=['LANDMAP__LWI'])
+        static_fields['LWI'] = LWI
+        static_fields['LWI_monthly'] = LWI
+    if has_DXYP:
+        static_fields['DXYP'] = get_GC_output(land_dir, vars=['DXYP__DXYP'])
     else:
-        if rtn_ds:
-            return xr.open_dataset(os.path.join(land_dir, 'ctm.nc'))
-        else:
-            return get_GC_output(wd=land_dir, vars=['LANDMAP__LWI'])
-        # Just use NetCDF4 instead of AC_tools function
-#            landmap = Dataset(land_dir+'ctm.nc', 'r')['LANDMAP__LWI'][:]
+        logging.warning("Could not get DXYP for res={}".format(res))
+    # Save the fields to disk (via temporary files)
+    import json
+    import tempfile
+    try:
+        if not os.path.exists(folder):
+            os.makedirs(folder, exist_ok=True)
+        for key, arr in static_fields.items():
+            fd, tmp_file = tempfile.mkstemp(suffix='.tmp', dir=folder)
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, np.asarray(arr))
+            os.replace(tmp_file, os.path.join(folder, key+'.npy'))
+        fd, tmp_file = tempfile.mkstemp(suffix='.tmp', dir=folder)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'source': source, 'source_mtime': source_mtime,
+                       'fields': sorted(static_fields)}, f)
+        os.replace(tmp_file, os.path.join(folder, 'bundle.json'))
+    except OSError:
+        logging.warning("Could not save static fields to {}".format(folder))
+    return static_fields
+
+
+def get_static_fields_bundle_info(folder, land_dir=None):
+    """
+    Get the description of a saved static field bundle if it is up to date
+
+    Parameters
+    -------
+    folder (str): folder the bundle is saved in
+    land_dir (str): folder of the reference NetCDF file the bundle was made from
+
+    Returns
+    -------
+    (dict) or None if the bundle is incomplete, or was made from another
+        reference file or an older version of it
+    """
+    import json
+    try:
+        with open(os.path.join(folder, 'bundle.json'), 'r') as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return None
+    npy_files = [os.path.join(folder, i+'.npy') for i in info['fields']]
+    if not all([os.path.exists(i) for i in npy_files]):
+        return None
+    # Only check the age if the reference file is present
+    if not isinstance(land_dir, type(None)):
+        source = os.path.abspath(os.path.join(land_dir, 'ctm.nc'))
+        if os.path.exists(source) and \
+                ((info.get('source') != source) or
+                 (os.path.getmtime(source) != info['source_mtime'])):
+            return None
+    return info
+
+
+def get_static_fields4res(res='4x5', remake=False, cache_dir=None,
+                          verbose=False):
+    """
+    Get the static fields (LWI, DXYP) for a resolution as read-only arrays
+
+    Parameters
+    -------
+    res (str): resolution of model to get the static fields for (e.g. '4x5')
+    remake (bool): remake the bundle from the reference NetCDF file
+    cache_dir (str): folder to save bundles in (default =
+        static_fields_cache_dir)
+    verbose (bool): print (minor) logging to screen
+
+    Returns
+    -------
+    (dict) of (memory-mapped) arrays for the static fields
+
+    Notes
+    -----
+     - The bundle is made from the reference LANDMAP files the first time a
+     resolution is requested (see mk_static_fields_bundle4res), then loaded
+     from disk as memory-mapped arrays and kept for the rest of the session.
+     - The bundle is remade if it is incomplete or if the reference file has
+     been modified since it was made.
+    """
+    if (res in _static_fields4res) and (not remake):
+        return _static_fields4res[res]
+    land_dir = get_LANDMAP_dir4res(res=res)
+    if isinstance(cache_dir, type(None)):
+        cache_dir = static_fields_cache_dir
+    folder = os.path.join(cache_dir, res)
+    info = get_static_fields_bundle_info(folder, land_dir=land_dir)
+    if remake or isinstance(info, type(None)):
+        static_fields = mk_static_fields_bundle4res(res=res, folder=folder,
+                                                    verbose=verbose)
+    else:
+        static_fields = {}
+        for key in info['fields']:
+            npy_file = os.path.join(folder, key+'.npy')
+            static_fields[key] = np.load(npy_file, mmap_mode='r')
+    _static_fields4res[res] = static_fields
+    return static_fields
 
 
 def get_air_mass_np(wd=None, times=None, trop_limit=True,
@@ -304,41 +471,12 @@ def get_OH_mean(wd, debug=False, file_type='*geos*log*'):
     """
     logging.debug('get_OH_mean called for wd={}'.format(wd))
     # --- Find all geos log files in directory...
-    files = glob.glob(wd+'/'+file_type)
-    if len(files) < 1:
-        err_str = 'WARNING! - no files found (assuming type={})'
-        logging.info(err_str.format(file_type))
-        print(err_str.format(file_type))
-        files = glob.glob(wd+'/logs/'+file_type)
-        if len(files) < 1:
-            err_str = 'WARNING! - no files found (type={} in wd/log/*)'
-            logging.info(err_str.format(file_type))
-            # try
-            file_type = 'log.*'
-            files = glob.glob(wd+'/logs/'+file_type)
-            print('Loooking for {} files instead'.format(file_type))
-            if len(files) < 1:
-                err_str = 'WARNING! - no files found (type={} in wd/log/*)'
-                logging.info(err_str.format(file_type))
-                # try
-                file_type = '*geos.log.*'
-                files = glob.glob(wd+'/logs/'+file_type)
-                print('Loooking for {} files instead'.format(file_type))
-                if len(files) < 1:
-                    err_str = 'WARNING! - no files found (type={} in wd/log/*)'
-                    logging.info(err_str.format(file_type))
-
+    files = find_geos_log_files(wd, file_type=file_type)
     # --- If there are any, then
-    if len(files) > 1:
-        # Loop and extract OH means, take an average if n>0
-        z = []
-        for file in files:
-            with open(file) as f:
-                if debug:
-                    print((file, f, z))
-                for line in f:
-                    if "Mean OH =    " in line:
-                        z += [float(line.split()[3])]
+    if len(files) > 0:
+        # Extract OH means, take an average if n>0
+        metrics = get_geos_log_metrics4files(files)
+        z = np.concatenate([i['Mean OH'] for i in metrics])
         logging.info('mean OH calculated from {} files'.format(len(z)))
         return np.mean(z)
     else:
@@ -366,18 +504,10 @@ def get_CH4_mean(wd, rtn_global_mean=True, rtn_avg_3D_concs=False,
     if debug:
         print(wd)
     # find all geos log files...
-    files = glob.glob(wd+'/*geos*log*')
-
-    # Loop and extract CH4 means, take an average if n>0
-    regex = re.compile('CH4{}:'.format('.'*13))
-    z = []
-    for file in files:
-        with open(file) as f:
-            if debug:
-                print((file, f, z))
-            for line in f:
-                if re.match(regex, line):
-                    z += [float(line.split()[-2])/1E9]
+    files = find_geos_log_files(wd, file_type='*geos*log*')
+    # Extract CH4 means, take an average if n>0
+    metrics = get_geos_log_metrics4files(files)
+    z = list(np.concatenate([[]]+[i['CH4'] for i in metrics]))
     if debug:
         print((z, np.mean(z)))
     if rtn_global_mean:
@@ -390,6 +520,188 @@ def get_CH4_mean(wd, rtn_global_mean=True, rtn_avg_3D_concs=False,
     return rtn_value
 
 
+def find_geos_log_files(wd, file_type='*geos*log*'):
+    """
+    Find the geos.log files in a run directory (or its "logs" sub-folder)
+
+    Parameters
+    -------
+    wd (str): directory containing log files
+    file_type (str): string with wildcards to match filenames
+
+    Returns
+    -------
+    (list)
+    """
+    # Try the given file type in the wd, then in wd/logs/, then try the
+    # other log file names used in wd/logs/
+    globs = [
+        os.path.join(wd, file_type), os.path.join(wd, 'logs', file_type),
+        os.path.join(wd, 'logs', 'log.*'),
+        os.path.join(wd, 'logs', '*geos.log.*'),
+    ]
+    for glob_str in globs:
+        files = sorted(glob.glob(glob_str))
+        if len(files) > 0:
+            return files
+        err_str = 'WARNING! - no files found (for {})'
+        logging.info(err_str.format(glob_str))
+    return []
+
+
+# Regular expressions for the metrics extracted from geos.log files
+_geos_log_regexes = {
+    'Mean OH': re.compile(rb'^(.*Mean OH =    .*)$', re.M),
+    'CH4': re.compile(rb'^(CH4.{13}:.*)$', re.M),
+    'SIMULATION': re.compile(
+        rb'=> SIMULATION (START|END) TIME: (\d{4}/\d{2}/\d{2} \d{2}:\d{2})'),
+    'Model Start': re.compile(rb'Start time of run[^\n]*?(\d{8} \d{6})'),
+    'Model End': re.compile(rb'End time of run[^\n]*?(\d{8} \d{6})'),
+    'STE start': re.compile(rb'^.*Strat-Trop Exchange.*$', re.M),
+}
+# Metrics of geos.log files already scanned (keyed by file, size + mod. time)
+_geos_log_metrics4file = {}
+
+
+def scan_geos_log_file(fn):
+    """
+    Extract all known metrics from a geos.log file in a single pass
+
+    Parameters
+    -------
+    fn (str): name (inc. path) of the geos.log file
+
+    Returns
+    -------
+    (dict) of mean OH values (1e5 molec/cm3), CH4 values (v/v), model and
+    real start/end times, and the lines of the Strat-Trop exchange section
+
+    Notes
+    -----
+     - The file is memory-mapped and searched with compiled regular
+     expressions, rather than read line by line for each metric.
+    """
+    import mmap
+    d = {
+        'Mean OH': np.array([]), 'CH4': np.array([]), 'STE': [],
+        'Real Start': pd.NaT, 'Real End': pd.NaT,
+        'Model Start': pd.NaT, 'Model End': pd.NaT,
+    }
+    if os.path.getsize(fn) == 0:
+        return d
+    with open(fn, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            regex = _geos_log_regexes['Mean OH']
+            d['Mean OH'] = np.array([float(i.split()[3])
+                                     for i in regex.findall(buf)])
+            regex = _geos_log_regexes['CH4']
+            d['CH4'] = np.array([float(i.split()[-2])/1E9
+                                 for i in regex.findall(buf)])
+            regex = _geos_log_regexes['SIMULATION']
+            for start_or_end, date in regex.findall(buf):
+                key = 'Real {}'.format(start_or_end.decode().title())
+                d[key] = datetime_.strptime(date.decode(), '%Y/%m/%d %H:%M')
+            for key in ('Model Start', 'Model End'):
+                match = _geos_log_regexes[key].search(buf)
+                if match:
+                    d[key] = datetime_.strptime(match.group(1).decode(),
+                                                '%Y%m%d %H%M%S')
+            # Get lines from the start of each strat-trop exchange section to
+            # the line before its end ("================")
+            for match in _geos_log_regexes['STE start'].finditer(buf):
+                end = buf.find(b'================', match.start())
+                if end < 0:
+                    end = len(buf)
+                end = buf.rfind(b'\n', match.start(), end) + 1
+                section = buf[match.start():end].decode()
+                d['STE'] += section.splitlines(True)
+        finally:
+            buf.close()
+    return d
+
+
+def get_geos_log_metrics4files(files, n_workers=1):
+    """
+    Get the metrics of geos.log files, scanning new/modified files (in parallel)
+
+    Parameters
+    -------
+    files (list): geos.log files (inc. paths) to get the metrics for
+    n_workers (int): number of processes to scan files with (default=1,
+        serial; None=n CPUs)
+
+    Returns
+    -------
+    (list) of dictionaries of metrics (see scan_geos_log_file)
+
+    Notes
+    -----
+     - For n_workers != 1, call this from within a "if __name__ ==
+     '__main__':" block (processes are started by "spawn" on some platforms)
+    """
+    keys = []
+    for fn in files:
+        stat = os.stat(fn)
+        keys += [(os.path.abspath(fn), stat.st_size, stat.st_mtime)]
+    to_scan = [i for i in keys if i not in _geos_log_metrics4file]
+    to_scan = sorted(set(to_scan), key=to_scan.index)
+    if len(to_scan) > 1 and (n_workers != 1):
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            metrics = list(executor.map(scan_geos_log_file,
+                                        [i[0] for i in to_scan]))
+    else:
+        metrics = [scan_geos_log_file(i[0]) for i in to_scan]
+    for key, d in zip(to_scan, metrics):
+        _geos_log_metrics4file[key] = d
+    return [_geos_log_metrics4file[i] for i in keys]
+
+
+def get_geos_log_metrics_as_df(wd=None, files=None, file_type='*geos*log*',
+                               n_workers=1):
+    """
+    Get a table of the metrics (e.g. mean OH, runtimes) for geos.log files
+
+    Parameters
+    -------
+    wd (str): directory containing log files
+    files (list): geos.log files (inc. paths) to use instead of searching wd
+    file_type (str): string with wildcards to match filenames
+    n_workers (int): number of processes to scan files with (default=1,
+        serial; None=n CPUs)
+
+    Returns
+    -------
+    (pd.DataFrame) with a row for each file
+
+    Notes
+    -----
+     - For n_workers != 1, call this from within a "if __name__ ==
+     '__main__':" block (processes are started by "spawn" on some platforms)
+    """
+    if isinstance(files, type(None)):
+        files = find_geos_log_files(wd, file_type=file_type)
+    metrics = get_geos_log_metrics4files(files, n_workers=n_workers)
+    Mtime = 'Model time (days)'
+    Rtime = 'Real time (hours)'
+    df = pd.DataFrame({
+        'Mean OH': [np.mean(i['Mean OH']) if len(i['Mean OH']) else np.nan
+                    for i in metrics],
+        'Mean CH4': [np.mean(i['CH4']) if len(i['CH4']) else np.nan
+                     for i in metrics],
+        'Real Start': pd.to_datetime([i['Real Start'] for i in metrics]),
+        'Real End': pd.to_datetime([i['Real End'] for i in metrics]),
+        'Model End': pd.to_datetime([i['Model End'] for i in metrics]),
+        'Model Start': pd.to_datetime([i['Model Start'] for i in metrics]),
+    }, index=[os.path.basename(i) for i in files])
+    # Add differences
+    df[Mtime] = (df['Model End']-df['Model Start']).dt.total_seconds()
+    df[Mtime] = df[Mtime] / 60 / 60 / 24
+    df[Rtime] = (df['Real End']-df['Real Start']).dt.total_seconds() / 60 / 60
+    return df
+
+
 def get_OH_HO2(t_p=None, a_m=None, vol=None,
                wd=None, HOx_weight=False, res='4x5', scale=1E5, trop_limit=True,
                molec_weight=True, time_averaged=True, debug=False):
@@ -927,8 +1239,8 @@ def calc_surface_area_in_grid(res='1x1', lon_e=None, lat_e=None,
     -------
     res (str): the resolution if wd not given (e.g. '4x5' )
     debug (bool): legacy debug option, replaced by python logging
-    lon_c (array): centres of longitude boxes
-    lat_c (array): centres of latitude boxes
+    lon_c (array): centres of longitude boxes (vestigial, not used)
+    lat_c (array): centres of latitude boxes (vestigial, not used)
     lon_e (array): edges of longitude boxes
     lat_e (array): edges of latitude boxes
 
@@ -1016,30 +1328,12 @@ def calc_surface_area_in_grid(res='1x1', lon_e=None, lat_e=None,
     # Get latitudes and longitudes in grid
     if any([isinstance(i, type(None)) for i in (lon_e, lat_e,)]):
         lon_e, lat_e, NIU = get_latlonalt4res(res=res, centre=False)
-    if any([isinstance(i, type(None)) for i in (lon_c, lat_c,)]):
-        lon_c, lat_c, NIU = get_latlonalt4res(res=res, centre=True)
-    # Set variables values
-    PI_180 = np.pi / 180.0
     Re = np.float64(6.375E6)  # Radius of Earth [m]
-#    lon_dim = get_dims4res(res=res)[0]
-    lon_dim = len(lon_c)
-    lon_degrees = float(lon_dim)
-    # Loop lats and calculate area
-    AREA = []
-    for n, lat_ in enumerate(lat_e[:-1]):
-        # Lat at S and N edges of 1x1 box [radians]
-        S = PI_180 * lat_e[n]
-        N = PI_180 * lat_e[n+1]
-        # S to N extent of grid box [unitless]
-        RLAT = np.sin(N) - np.sin(S)
-        # grid surface area [m2] (see [GEOS-Chem] "grid_mod.f" for algorithm)
-        AREA += [2.0 * np.pi * Re * Re / lon_degrees * RLAT]
-    AREA = np.array(AREA)
+    # grid surface area [m2] (see [GEOS-Chem] "grid_mod.f" for algorithm)
+    AREA = calc_surface_area4grid(lon_e=lon_e, lat_e=lat_e, Re=Re)
     if debug:
         print(AREA)
         print([(i.shape, i.min(), i.max()) for i in [AREA]])
-    # Convert to 2D array / apply to all longitudes
-    AREA = np.array([list(AREA)] * int(lon_dim))
     return AREA
 
 
@@ -1194,31 +1488,13 @@ def get_STRAT_TROP_exchange_from_geos_log(fn=None, ver='3.0',
     Notes
     -----
      - Works by extracting all lines between start ("Strat-Trop Exchange")
-         and end ("================") of section.
+         and end ("================") of section (see scan_geos_log_file).
      - file name (fn) is assumed to include directory as well as name
     """
     logging.info('get_STRAT_TROP_exchange_from_geos_log called for: '.format(
         fn))
-    # --- Open the file
-    file_ = open(fn, 'r')
-    # Read in just the TROP-STRAT exchange section
-    start_line = 'Strat-Trop Exchange'
-    end_line = '================'
-    # --- Loop and extract lines of file with data on exchange
-    readline = False
-    lines = []
-    for row in file_:
-        # once at prod/loss section, start added to list
-        if start_line in row:
-            readline = True
-        # if not at end of prod/loss section, add to list
-        if end_line in row:
-            readline = False
-        if readline:
-            try:
-                lines.append(row)
-            except:
-                lines = [row]
+    # --- Get lines of file with data on exchange
+    lines = list(get_geos_log_metrics4files([fn])[0]['STE'])
     # --- Process extracted lines
     # remove starting lines
     headers = [i.strip() for i in lines[5].split('    ')]
@@ -1297,8 +1573,8 @@ def get_gc_years(wd=None, filename='ctm.nc', set_=True,
     """
     Return list of years in GEOS-Chem output (ctm.bpch or NetCDF)
     """
-    dates = get_gc_datetime(wd=wd, filename=filename)
-    return [i.year for i in dates]
+    dates = get_gc_datetime(wd=wd, filename=filename, rtn_DatetimeIndex=True)
+    return dates.year.tolist()
 
 
 def get_gc_months(wd=None, filename='ctm.nc',
@@ -1306,15 +1582,19 @@ def get_gc_months(wd=None, filename='ctm.nc',
     """
     Return list of months in GEOS-Chem output (ctm.bpch or NetCDF)
     """
-    dates = get_gc_datetime(wd=wd, filename=filename,
+    dates = get_gc_datetime(wd=wd, filename=filename, rtn_DatetimeIndex=True,
                             debug=debug, verbose=verbose)
-    return [i.month for i in dates]
+    return dates.month.tolist()
+
+
+# Dates already decoded in this session (keyed by file, size and mod. time)
+_gc_datetime4file = {}
 
 
 def get_gc_datetime(wd=None, spec='O3', cat='IJ-AVG-$',
                     filename='ctm.nc',
                     date_str='hours since %Y-%m-%d %H:%M:%S',
-                    verbose=False, debug=False):
+                    rtn_DatetimeIndex=False, verbose=False, debug=False):
     """
     Return list of months in GEOS-Chem output (ctm.bpch or NetCDF)
 
@@ -1326,69 +1606,52 @@ def get_gc_datetime(wd=None, spec='O3', cat='IJ-AVG-$',
     spec (str): species/tracer/variable name
     ver (str): The GEOS-Chem halogen version that is being used
     wd (str): Specify the wd to get the results from a run.
+    date_str (str): vestigial (units are now read from the file)
+    rtn_DatetimeIndex (bool): return a pd.DatetimeIndex, not a list
 
     Returns
     -------
-    (list)
+    (list or pd.DatetimeIndex)
 
     Notes
     -----
+     - Dates are decoded in one vectorised step (see decode_CF_times) and
+     cached for each file until it is modified.
+     - Dates of non-standard calendars that are not valid standard dates
+     (e.g. 30th Feb for '360_day') are returned as cftime dates (as a
+     xr.CFTimeIndex or list)
     """
     logging.info('get_gc_datetime called @: {} with file: {}'.format(wd,
                                                                      filename))
-    # Extract datetime from cube
     # Create NetCDf if not created.
     fname = wd + '/'+filename
     if not os.path.isfile(fname):
         from .bpch2netCDF import convert_to_netCDF
         convert_to_netCDF(wd)
-    # "open" NetCDF + extract time
-    with Dataset(fname, 'r') as rootgrp:
-        dates = rootgrp['time']
-        unit_str = str(dates.units)
-        if verbose:
-            print((dates, dates.units, unit_str))
-        # Get units from cube, default is 'hours since 1985-01-01 00:00:00'
-        if 'hours since' in unit_str:
-            if isinstance(date_str, type(None)):
-                date_str = 'hours since %Y-%m-%d %H:%M:%S'
-            time_unit = 'hours'
-        elif 'minutes since' in unit_str:
-            if isinstance(date_str, type(None)):
-                date_str = 'minutes since %Y-%m-%d %H:%M:%S'
-            time_unit = 'minutes'
-        elif 'days since' in unit_str:
-            if isinstance(date_str, type(None)):
-                date_str = 'days since %Y-%m-%d %H:%M:%S'
-            time_unit = 'days'
-        else:
-            err_str = 'WARNING: time unit not setup: {}'.format(unit_str)
-            print(err_str)
-            logging.info(err_str)
-            sys.exit()
-        # calculate start time
-        starttime = time.strptime(unit_str, date_str)
-        starttime = time2datetime([starttime])[0]
-        dates = np.array(dates)
-    logging.info('file start date: {}'.format(starttime))
-    # allow for single date output <= is there a better gotcha than this?
-    if len(dates.shape) == 0:
-        dates = [float(dates)]
-    # Convert to date time
-    if time_unit == 'hours':
-        dates = [add_hrs(starttime, i) for i in dates]
-    elif time_unit == 'minutes':
-        dates = [add_minutes(starttime, i) for i in dates]
-    elif time_unit == 'days':
-        dates = [add_days(starttime, i) for i in dates]
-    else:
-        err_str = "processing not setup for unit: '{}' ".format(date_str)
-        print(err_str)
-        logging.info(err_str)
-        sys.exit()
+    # Use previously decoded dates if the file is unchanged
+    stat = os.stat(fname)
+    key = (os.path.abspath(fname), stat.st_size, stat.st_mtime)
+    if key not in _gc_datetime4file:
+        # "open" NetCDF + extract time
+        with Dataset(fname, 'r') as rootgrp:
+            dates = rootgrp['time']
+            unit_str = str(dates.units)
+            calendar = getattr(dates, 'calendar', 'standard')
+            if verbose:
+                print((dates, dates.units, unit_str))
+            values = np.array(dates)
+        # Convert to date time (a ValueError is raised for unknown units)
+        dates = decode_CF_times(values, unit_str, calendar=calendar)
+        _gc_datetime4file[key] = dates
+    dates = _gc_datetime4file[key]
     logging.debug('1st date dates {}'.format(dates[:10]))
     # Return datetime objects
-    return dates
+    if rtn_DatetimeIndex:
+        return dates
+    elif isinstance(dates, pd.DatetimeIndex):
+        return list(dates.to_pydatetime())
+    else:
+        return list(dates)
 
 
 def get_frequency_of_model_output(wd=None, months=None, years=None,
@@ -2189,7 +2452,7 @@ def molec_weighted_avg_BPCH(arr, wd=None, vol=None, t_p=None,
                             molecs=None,
                             weight_lon=False, weight_lat=False, LON_axis=0,
                             LAT_axis=1,
-                            n_air=None,
+                            n_air=None, weights=None,
                             annual_mean=True, res='4x5', debug=False):
     """
     Takes an array and retuns the average (molecular weighted) value
@@ -2210,6 +2473,8 @@ def molec_weighted_avg_BPCH(arr, wd=None, vol=None, t_p=None,
      multiply_method (bool): use a multiplication method, rather than masking for
         the arrays (aka set stratosphere to have zero values)
     LON_axis, LAT_axis (float): Index of longitudinal or latitudinal
+    weights (MolecWeighting): pre-calculated weighting for the run (used
+        instead of the other weighting arguments, see MolecWeighting)
 
     Returns
     -------
@@ -2226,6 +2491,12 @@ def molec_weighted_avg_BPCH(arr, wd=None, vol=None, t_p=None,
     """
     logging.info(
         'molec_weighted_avg_BPCH called for arr.shape={}'.format(arr.shape))
+    # Use the pre-calculated weighting if provided
+    if not isinstance(weights, type(None)):
+        axis = [LON_axis]*weight_lon + [LAT_axis]*weight_lat
+        if len(axis) == 0:
+            axis = None
+        return weights.weighted_avg([arr], axis=axis)[0]
     if isinstance(molecs, type(None)):
         if not isinstance(n_air, np.ndarray):  # [molec air/m3]
             n_air = get_number_density_variable(wd=wd, trop_limit=trop_limit)
@@ -2266,6 +2537,102 @@ def molec_weighted_avg_BPCH(arr, wd=None, vol=None, t_p=None,
         return (arr * molecs).sum()/molecs.sum()
 
 
+class MolecWeighting:
+    """
+    Class for holding the molecular weighting of a run for averaging arrays
+
+    Notes
+    -----
+     - The molecules per grid box (n_air * volume) and the tropospheric mask
+     are calculated once for a run, then any number of arrays (e.g. species)
+     can be averaged in one reduction with weighted_avg. The weighting is the
+     same as molec_weighted_avg_BPCH.
+    """
+
+    def __repr__(self):
+        rtn_str = "This is a class to hold molecular weighting for {} (shape={})"
+        return rtn_str.format(self.wd, self.molecs.shape)
+
+    def __init__(self, wd=None, res='4x5', trop_limit=True, rm_strat=True,
+                 multiply_method=False, annual_mean=True, n_air=None,
+                 vol=None, t_p=None, molecs=None):
+        self.wd = wd
+        self.res = res
+        # Calculate molecules per grid box
+        if isinstance(molecs, type(None)):
+            if not isinstance(n_air, np.ndarray):  # [molec air/m3]
+                n_air = get_number_density_variable(wd=wd,
+                                                    trop_limit=trop_limit)
+            if not isinstance(vol, np.ndarray):
+                vol = get_volume_np(wd=wd, res=res, trop_limit=trop_limit)
+                vol = vol / 1E6  # [cm^3 ]
+            molecs = n_air * vol  # [molec air]
+            if annual_mean:
+                molecs = molecs.mean(axis=-1)
+        molecs = np.ma.filled(molecs, 0)
+        # Get the tropospheric mask (or scaling if multiply_method=True)
+        mask = np.zeros(molecs.shape, dtype=bool)
+        self.arr_scale = None
+        if trop_limit and rm_strat:
+            if isinstance(t_p, type(None)):
+                t_p = get_GC_output(wd=wd, vars=['TIME_TPS__TIMETROP'],
+                                    trop_limit=trop_limit)
+            t_p = np.ma.filled(t_p, 0)
+            # Use time in the troposphere averaged over time for 3D weights
+            if multiply_method:
+                if molecs.ndim == 3:
+                    t_p = t_p.mean(axis=-1)
+                molecs = molecs * t_p
+                self.arr_scale = t_p
+            else:
+                mask = (t_p != 1)
+                if molecs.ndim == 3:
+                    mask = mask.all(axis=-1)
+        self.t_p = t_p
+        self.mask = mask
+        self.molecs = np.where(mask, 0, molecs)
+
+    def weighted_avg(self, ars, axis=None):
+        """
+        Get the molecular weighted average of a batch of arrays
+
+        Parameters
+        -------
+        ars (list or array): arrays (each the same shape as the weighting),
+            or an array with the arrays stacked along the first axis
+        axis (list): axes of the arrays to average over (default=all)
+
+        Returns
+        -------
+        (array) with the first axis for the arrays
+        """
+        if isinstance(ars, (list, tuple)):
+            ars = np.ma.stack(ars)
+        else:
+            ars = np.ma.asarray(ars)
+        if not isinstance(self.arr_scale, type(None)):
+            ars = ars * self.arr_scale[None, ...]
+        if isinstance(axis, type(None)):
+            axis = list(range(self.molecs.ndim))
+        axis = [i % self.molecs.ndim for i in np.atleast_1d(axis)]
+        mask = np.ma.getmask(ars)
+        arr = np.where(self.mask[None, ...] | mask, 0, np.ma.getdata(ars))
+        # One reduction for all arrays over the requested axes
+        if mask is np.ma.nomask:
+            dims = 'abcdefgh'[:self.molecs.ndim]
+            rtn_dims = ''.join([i for n, i in enumerate(dims)
+                                if n not in axis])
+            subscripts = 'z{},{}->z{}'.format(dims, dims, rtn_dims)
+            numerator = np.einsum(subscripts, arr, self.molecs)
+            denominator = self.molecs.sum(axis=tuple(axis))[None, ...]
+        else:
+            weights = self.molecs[None, ...] * ~mask
+            axis4ars = tuple([i+1 for i in axis])
+            numerator = (arr * weights).sum(axis=axis4ars)
+            denominator = weights.sum(axis=axis4ars)
+        return numerator / denominator
+
+
 def get_number_density_variable(wd=None, trop_limit=True):
     """ Get number density variable from GEOS-Chem output NetCDF """
     try:
@@ -2286,33 +2653,31 @@ def split_4D_array_into_seasons(arr, annual_plus_seasons=True,
     average of the seasons
 
     NOTE(s):
-     - currently seasons index is mannual set assuming Jan-Dec
+     - currently seasons index is mannual set assuming Jan-Dec (only the
+     first 12 times are used)
+     - All seasons are averaged in one pass (see get_grouped_reductions)
      - TODO - update to use extract data?
     """
     if debug:
         print((arr.shape))
-    if annual_plus_seasons:
-        seasons = ['Annual', 'DJF', 'MAM', 'JJA', 'SON']
-        # assume calender month order
-        # ( this can be automated using get_GC_datetime )
-        indices = [
-            list(range(0, 12)), [11, 0, 1], [2, 3, 4], [5, 6, 7], [8, 9, 10]
-        ]
-    else:
-        seasons = ['DJF', 'MAM', 'JJA', 'SON']
-        # assume calender month order
-        # ( this can be automated using get GC datetime )
-        indices = [[11, 0, 1], [2, 3, 4], [5, 6, 7], [8, 9, 10]]
-    ars = []
-    # Extract data by month
-    for n, s in enumerate(seasons):
-        if debug:
-            print((s, n, indices[n]))
-        ars += [[arr[..., i] for i in indices[n]]]
+    seasons = ['DJF', 'MAM', 'JJA', 'SON']
+    # assume calender month order
+    # ( this can be automated using get_GC_datetime )
+    months = np.arange(arr.shape[-1]) + 1
+    labels = np.full(months.shape, -1, dtype=np.int64)
+    labels[months <= 12] = get_season_labels4months(months[months <= 12],
+                                                    seasons=seasons)
     # Average by season
-    if debug:
-        print(([np.ma.array(i).shape for i in ars], seasons))
-    ars = [np.ma.array(i).mean(axis=0) for i in ars]
+    sums, counts = get_grouped_sums_and_weights(arr, labels, axis=-1,
+                                                n_groups=len(seasons))
+    if annual_plus_seasons:
+        seasons = ['Annual'] + seasons
+        sums = np.concatenate([sums.sum(axis=-1)[..., None], sums], axis=-1)
+        counts = np.concatenate([counts.sum(axis=-1)[..., None], counts],
+                                axis=-1)
+    empty = counts == 0
+    ars = np.ma.array(sums / np.where(empty, 1, counts), mask=empty)
+    ars = [ars[..., n] for n in range(len(seasons))]
     if debug:
         print(([i.shape for i in ars], np.ma.array(ars).mean(), seasons))
     # Return list array averaged by season
@@ -2345,11 +2710,10 @@ def prt_seaonal_values(arr=None, res='4x5', area_weight=True, zonal=False,
     m = mask_all_but(region=region, mask3D=True, debug=debug,
                      use_multiply_method=False,
                      trop_limit=trop_limit)[..., :38]
-    print([i.shape for i in (m, arr.mask)])
-    m = np.ma.concatenate([m[..., None]] * len(months), axis=-1)
-    # Mask array individually
+    # Mask array (broadcasting the mask through time)
+    m = np.broadcast_to(m[..., None], arr.shape)
     print([i.shape for i in (m, arr.mask, arr)])
-    arr = np.ma.array(arr, mask=np.ma.mask_or(m, arr.mask))
+    arr = np.ma.array(arr, mask=np.ma.mask_or(m, np.ma.getmaskarray(arr)))
     #    ars = [ np.ma.array( i, mask=m ) for i in ars ]
     if debug:
         print((m, region, [(type(i), i.shape) for i in [m] + [arr]],
@@ -2386,9 +2750,14 @@ def prt_seaonal_values(arr=None, res='4x5', area_weight=True, zonal=False,
         npstr = '{:<20}' + '{:<20,.3f}'*len(regions)
         print((pstr.format('spec', *regions)))
         print((seasons, ars[0].mean()))
-        # Mean of 3D region
+        # Mean of 3D region (sum all regions and seasons in one pass)
+        stacked = np.ma.stack(ars, axis=-1)
+        members = np.stack([np.ma.filled(i, 0) for i in sects3D])
+        sums, counts = get_grouped_sums_and_weights(stacked, members,
+                                                    axis=(0, 1, 2))
+        counts = np.ma.count(stacked, axis=(0, 1, 2))
         for n, s in enumerate(seasons):
-            vars = [float((i*ars[n]).mean()) for i in sects3D]
+            vars = [float(i) for i in sums[n, :] / counts[n]]
             print((npstr.format(s, *vars)))
         # Min of 3D region
         for n, s in enumerate(seasons):
@@ -2417,6 +2786,18 @@ def prt_seaonal_values(arr=None, res='4x5', area_weight=True, zonal=False,
         pstr = '{:<15}'*(len(header))
         npstr = '{:<15}'+'{:<15,.4f}'*(len(header)-1)
         print((pstr.format(*header)))
+        # Get area weighted means for all seasons/months in one pass
+        # (over the area of the region, inc. any masked values in the arrays)
+        if zonal:
+            weights = s_area.sum(axis=0)[:, None]
+        else:
+            weights = s_area
+        weights = np.ma.filled(weights, 0)
+        stacked = np.ma.stack(ars, axis=-1)
+        sums, _ = get_grouped_sums_and_weights(stacked,
+                                               np.ones((1,)+stacked.shape[:2]),
+                                               axis=(0, 1), weights=weights)
+        wtd_means = sums / np.broadcast_to(weights, stacked.shape[:2]).sum()
         for n, s in enumerate(seasons):
             # Get vars for printing
             vars = [
@@ -2425,19 +2806,80 @@ def prt_seaonal_values(arr=None, res='4x5', area_weight=True, zonal=False,
                  float(np.percentile(i.compressed(), 95)),
                  float(i.mean()),
                  float(np.median(i.compressed())),
-                 float((i*s_area).sum()/s_area.sum()))
+                 float(wtd_means[n, 0]))
                 for i in [ars[n]]
             ][0]
             # Print vars
             print((npstr.format(s,  *vars)))
 
 
+def get_GC_output4fam(wd=None, specs=None, stioch4fam=None, scale=1.,
+                      prefix='IJ_AVG_S__', trop_limit=True, rtn_list=False,
+                      acc_dtype=np.float64):
+    """
+    Extract all members of a family in one request and sum them
+
+    Parameters
+    -------
+    wd (str): Specify the wd to get the results from a run.
+    specs (list): species in the family
+    stioch4fam (list): stoichiometry of each species in the family
+        (default=1 for all species)
+    scale (float): scaling to apply (e.g. 1E12 for v/v to pmol mol-1)
+    prefix (str): prefix of the variable names (e.g. 'IJ_AVG_S__')
+    trop_limit (bool): limit output to "chemical troposphere" (level 38 )
+    rtn_list (bool): return the members (adjusted to stoichiometry, but not
+        scaled) as a list, rather than summed
+    acc_dtype (type): type to sum the members with (e.g. np.float32 to reduce
+        memory use for large runs)
+
+    Returns
+    -------
+    (array) or (list) of arrays
+
+    Notes
+    -----
+     - The stoichiometry and scaling are applied as one vector and the
+     members are summed in a single reduction (np.tensordot)
+     - For masked arrays, points are only masked if masked in all members
+     - As for fam_data_extractor, the list of members (rtn_list=True) is not
+     scaled (so callers can apply the scaling themselves)
+    """
+    if isinstance(stioch4fam, type(None)):
+        stioch4fam = [1.]*len(specs)
+    stioch4fam = np.array(stioch4fam, dtype=acc_dtype)
+    # Extract data (with the species as the first dimension)
+    arr = get_GC_output(wd=wd, vars=[prefix+i for i in specs],
+                        trop_limit=trop_limit, r_list=True)
+    arr = list(arr)
+    mask = np.ma.nomask
+    if any([np.ma.isMaskedArray(i) for i in arr]):
+        mask = np.stack([np.ma.getmaskarray(i) for i in arr])
+    # Cast each member as it is copied in (rather than the stacked array)
+    data = np.empty((len(arr),)+np.shape(arr[0]), dtype=acc_dtype)
+    for n in range(len(arr)):
+        data[n] = np.ma.filled(arr[n], 0)
+        arr[n] = None
+    arr = data
+    logging.debug('get_GC_output4fam for {}, shape={}'.format(specs,
+                                                             arr.shape))
+    if rtn_list:
+        arr = arr * stioch4fam.reshape((-1,)+(1,)*(arr.ndim-1))
+        if mask is not np.ma.nomask:
+            arr = np.ma.array(arr, mask=mask)
+        return list(arr)
+    arr = np.tensordot(stioch4fam * scale, arr, axes=1)
+    if mask is not np.ma.nomask:
+        arr = np.ma.array(arr, mask=mask.all(axis=0))
+    return arr
+
+
 def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
                        annual_mean=True, t_ps=None, a_m=None, vol=None,
                        res='4x5',
                        title=None, rtn_list=False, use_time_in_trop=True,
                        multiply_method=True, rtn_specs=False, verbose=False,
-                       rtn_units=False,
+                       rtn_units=False, acc_dtype=np.float64,
                        units=None, debug=False):
     """
     Driver to extract data for a given family requested
@@ -2453,6 +2895,8 @@ def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
     t_ps (array): time in the troposphere diganostic ( float values 0 to 1 )
     title (str): run title, ignore if not using halogen code
     ver (str): GEOSChem version with halogens (default = 3.0), ignore if not using halogen code
+    acc_dtype (type): type to sum family members with (e.g. np.float32 to
+        reduce memory use, see get_GC_output4fam)
 
     definition of troposphere to use?
         - use_time_in_trop (bool): time a given box is in the troposphere
@@ -2482,14 +2926,10 @@ def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
         specs = ['NO2', 'NO']
         scale = 1E12
 #        units, scale = tra_unit(specs[0], IUPAC_unit=True, scale=True)
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit)
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in [arr]])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1) * scale
+        # Extract data and sum
+        arr = get_GC_output4fam(wd=wd, specs=specs, scale=scale,
+                                trop_limit=trop_limit, rtn_list=rtn_list,
+                                acc_dtype=acc_dtype)
         units = 'pmol mol${^-1}$'
     # --- OH ( in molec/cm3 )
     elif fam == 'OH':
@@ -2554,51 +2994,33 @@ def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
         specs = GC_var('NOy')
 #        units, scale = tra_unit(specs[0], IUPAC_unit=True, scale=True)
         scale = 1E12
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='N')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1) * scale
+        # Extract data, adjust to stoichiometry and sum
+        stioch4fam = [spec_stoich(i, ref_spec='N') for i in specs]
+        arr = get_GC_output4fam(wd=wd, specs=specs, stioch4fam=stioch4fam,
+                                scale=scale, trop_limit=trop_limit,
+                                rtn_list=rtn_list, acc_dtype=acc_dtype)
         units = 'pmol mol${^-1}$'
     # --- All NIT (inc. HNO3)
     elif fam == 'NIT_ALL':
         # Select species in family
         specs = 'HNO3', 'NIT', 'NITs'
         scale = 1E12
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='N')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1) * scale
+        # Extract data, adjust to stoichiometry and sum
+        stioch4fam = [spec_stoich(i, ref_spec='N') for i in specs]
+        arr = get_GC_output4fam(wd=wd, specs=specs, stioch4fam=stioch4fam,
+                                scale=scale, trop_limit=trop_limit,
+                                rtn_list=rtn_list, acc_dtype=acc_dtype)
         units = 'pmol mol${^-1}$'
     # --- all sulfate
     elif fam == 'SO4':
         # Select species in family
         specs = 'SO4', 'SO4s',
         scale = 1E12
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='S')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1) * scale
+        # Extract data, adjust to stoichiometry and sum
+        stioch4fam = [spec_stoich(i, ref_spec='S') for i in specs]
+        arr = get_GC_output4fam(wd=wd, specs=specs, stioch4fam=stioch4fam,
+                                scale=scale, trop_limit=trop_limit,
+                                rtn_list=rtn_list, acc_dtype=acc_dtype)
         units = 'pmol mol${^-1}$'
     # --- all sulfate
     elif fam == 'NH4':
@@ -2606,17 +3028,11 @@ def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
         #        specs = GC_var('NIT_ALL' )
         specs = 'NH4',
         scale = 1E12
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='N')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1) * scale
+        # Extract data, adjust to stoichiometry and sum
+        stioch4fam = [spec_stoich(i, ref_spec='N') for i in specs]
+        arr = get_GC_output4fam(wd=wd, specs=specs, stioch4fam=stioch4fam,
+                                scale=scale, trop_limit=trop_limit,
+                                rtn_list=rtn_list, acc_dtype=acc_dtype)
         units = 'pmol mol${^-1}$'
 
     # --- Ozone (O3)
@@ -2659,17 +3075,11 @@ def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
 #        specs += [ 'BrSALA', 'BrSALC', ]
         if ver == 'v11-1':
             specs.pop(specs.index('IBr'))
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='Br')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1)
+        # Extract data, adjust to stoichiometry and sum
+        stioch4fam = [spec_stoich(i, ref_spec='Br') for i in specs]
+        arr = get_GC_output4fam(wd=wd, specs=specs, stioch4fam=stioch4fam,
+                                scale=1., trop_limit=trop_limit,
+                                rtn_list=rtn_list, acc_dtype=acc_dtype)
         units = 'v/v'
     # ---  Inorganic iodine ( Iy )
     elif fam == 'Iy':
@@ -2677,17 +3087,11 @@ def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
         specs = GC_var('Iy')
         # Also include iodine aerosol and CH3I
 #        specs = GC_var('Iy' ) + ['AERI', 'ISALA', 'ISALC', 'CH3I' ]
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='I')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1)
+        # Extract data, adjust to stoichiometry and sum
+        stioch4fam = [spec_stoich(i, ref_spec='I') for i in specs]
+        arr = get_GC_output4fam(wd=wd, specs=specs, stioch4fam=stioch4fam,
+                                scale=1., trop_limit=trop_limit,
+                                rtn_list=rtn_list, acc_dtype=acc_dtype)
         units = 'v/v'
     # ---  Inorganic iodine ( Cly )
     elif fam == 'Cly':
@@ -2695,33 +3099,21 @@ def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
         specs = GC_var('Cly')
         if ver == 'v11-1':
             specs.pop(specs.index('ICl'))
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='Cl')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1)
+        # Extract data, adjust to stoichiometry and sum
+        stioch4fam = [spec_stoich(i, ref_spec='Cl') for i in specs]
+        arr = get_GC_output4fam(wd=wd, specs=specs, stioch4fam=stioch4fam,
+                                scale=1., trop_limit=trop_limit,
+                                rtn_list=rtn_list, acc_dtype=acc_dtype)
         units = 'v/v'
     # ---  Reactive chlorine ( ClOx )
     elif fam == 'ClOx':
         # Select species in family
         specs = ['Cl', 'ClO', 'Cl2O2', 'ClOO', ]
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='Cl')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1)
+        # Extract data, adjust to stoichiometry and sum
+        stioch4fam = [spec_stoich(i, ref_spec='Cl') for i in specs]
+        arr = get_GC_output4fam(wd=wd, specs=specs, stioch4fam=stioch4fam,
+                                scale=1., trop_limit=trop_limit,
+                                rtn_list=rtn_list, acc_dtype=acc_dtype)
         units = 'v/v'
     # --- Nitrogen Oxides NOx ( NO + NO2)
     elif fam == 'VOC':
@@ -2730,14 +3122,10 @@ def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
             'ALK4', 'ISOP', 'ACET', 'MEK',  'ALD2', 'PRPE', 'C2H6', 'C3H8'
         ]
         scale = 1E9
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit)
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in [arr]])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1) * scale
+        # Extract data and sum
+        arr = get_GC_output4fam(wd=wd, specs=specs, scale=scale,
+                                trop_limit=trop_limit, rtn_list=rtn_list,
+                                acc_dtype=acc_dtype)
         units = 'nmol(C) mol${^-1}$'
     # --- Get PM2.5 (Approximation from gas-phase species )
     elif fam == 'PM2.5':
@@ -2760,17 +3148,11 @@ def fam_data_extractor(wd=None, fam=None, trop_limit=True, ver='3.0',
     elif fam == 'TNO3':
         # Select species in family
         specs = ['HNO3', 'NIT', 'NITs']
-        # Extract data
-        arr = get_GC_output(wd=wd, vars=['IJ_AVG_S__'+i for i in specs],
-                            trop_limit=trop_limit, r_list=True)
-        # Adjust to stoichiometry
-        arr = [arr[n]*spec_stoich(i, ref_spec='N')
-               for n, i in enumerate(specs)]
-        if debug:
-            print([(i.shape, i.min(), i.max(), i.mean()) for i in arr])
-        if not rtn_list:
-            arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
-            arr = arr.sum(axis=-1)
+        # Extract data, adjust to stoichiometry and sum
+        stioch4fam = [spec_stoich(i, ref_spec='N') for i in specs]
+        arr = get_GC_output4fam(wd=wd, specs=specs, stioch4fam=stioch4fam,
+                                scale=1., trop_limit=trop_limit,
+                                rtn_list=rtn_list, acc_dtype=acc_dtype)
         units = 'nmol mol${^-1}$'
     # --- Try extracting as a species rather than family?
     else:
@@ -2919,8 +3301,9 @@ def fam_data_extractor4ts_bpch_files(spec='NOy', wd=None,
                 # save extracted data to list
                 data_l += [data_[:]]
         # Add stiochmetric scaling for species if applicable (from stioch4fam)
-        if len(stioch4fam) > 0:
-            data_l = [i*stioch4fam[n] for n, i in enumerate(data_l)]
+        if len(stioch4fam) == 0:
+            stioch4fam = [1.]*len(specs)
+        stioch4fam = np.array(stioch4fam, dtype=np.float64)
         # If PM2.5
         if spec == 'PM2.5':
             # get data and scale from ppbv (assumed) to v/v
@@ -2938,9 +3321,8 @@ def fam_data_extractor4ts_bpch_files(spec='NOy', wd=None,
                 data_l[n] = convert_spec_v_v_2_ugm3(data=data, spec=fam_spec)
             # convert to ug m3
             units = '$\mu$g m$^{-3}$'
-        # Sum family...
-        data = np.array(data_l)
-        data = data.sum(axis=0)  # * scale
+        # Apply stiochmetry and sum family in a single reduction
+        data = np.tensordot(stioch4fam, np.stack(data_l), axes=1)
         logging.debug('Shape for array:{}, units={}'.format(data.shape, units))
         return data, units
 
@@ -3020,7 +3402,7 @@ def get_LOC_df_from_NetCDF(site=None, spec='O3', wd=None, res=None,
             units = 'UNITS NOT IN FILE'
 
     # Extract dates in NetCDF
-    dates = get_gc_datetime(filename=filename, wd=wd)
+    dates = get_gc_datetime(filename=filename, wd=wd, rtn_DatetimeIndex=True)
     # Make dataframe and return
     df = pd.DataFrame(data, index=dates, columns=[spec])
     if rtn_units:
@@ -3031,6 +3413,102 @@ def get_LOC_df_from_NetCDF(site=None, spec='O3', wd=None, res=None,
         return df
 
 
+def get_LOCs_df_from_NetCDF(sites=None, specs=['O3'], wd=None,
+                            filename='ts_ctm.nc', LONs=None, LATs=None,
+                            var_prefix='IJ_AVG_S__', rtn_long_form=False,
+                            rtn_units=False, verbose=False, debug=False):
+    """
+    Extract *ts*bpch* (1D) data from file for many sites and species at once
+
+    Parameters
+    ----------
+    sites (list): names of locations (must be present in "get_loc" dictionary)
+    specs (list): species/tracer/variable names
+    wd (str): the directory to search for file in
+    filename (str): name of NetCDF file to extract from
+    LONs (list): longitudes in units of degrees East (instead of sites)
+    LATs (list): latitudes in units of degrees North (instead of sites)
+    var_prefix (str): prefix of the variable names in the NetCDF
+    rtn_long_form (bool): return a long-form DataFrame (with columns of
+        datetime, site, spec and value), not one with (site, spec) columns
+    rtn_units (bool): also return a dictionary of units for each species
+
+    Returns
+    -------
+    (pd.DataFrame object)
+
+    Notes
+    -----
+     - Grid indices are calculated once for all sites from the file's own
+     coordinates and each species is read with one hyperslab (the unique
+     lon and lat indices of all sites), so the file is only opened once.
+     - Either sites or both LONs and LATs must be given
+    """
+    # Check the locations given
+    no_LONs_LATs = any([isinstance(i, type(None)) for i in (LONs, LATs)])
+    if isinstance(sites, type(None)) and no_LONs_LATs:
+        err_msg = 'sites or both LONs and LATs must be provided'
+        logging.error(err_msg)
+        raise ValueError(err_msg)
+    if (not no_LONs_LATs) and (len(LONs) != len(LATs)):
+        err_msg = 'LONs and LATs must have the same length ({} vs. {})'
+        logging.error(err_msg.format(len(LONs), len(LATs)))
+        raise ValueError(err_msg.format(len(LONs), len(LATs)))
+    if (not no_LONs_LATs) and (not isinstance(sites, type(None))) and \
+            (len(sites) != len(LONs)):
+        err_msg = 'sites must have the same length as LONs and LATs'
+        logging.error(err_msg)
+        raise ValueError(err_msg)
+    # Get LAT and LON for sites, if values not given.
+    if no_LONs_LATs:
+        try:
+            locs = np.array([get_loc(loc=i)[:2] for i in sites])
+        except KeyError:
+            err_msg = 'SITE not defined in get_loc'
+            logging.error(err_msg)
+            raise KeyError(err_msg)
+        LONs, LATs = locs[:, 0], locs[:, 1]
+    if isinstance(sites, type(None)):
+        sites = ['({}, {})'.format(*i) for i in zip(LONs, LATs)]
+    LONs, LATs = [np.asarray(i, dtype=np.float64) for i in (LONs, LATs)]
+    # Extract data for locations
+    units = {}
+    data = {}
+    with Dataset(os.path.join(wd, filename), 'r') as rootgrp:
+        # Find indices for grid boxes (array shape = TIME, LON, LAT)
+        try:
+            lon_c, lat_c = rootgrp['longitude'][:], rootgrp['latitude'][:]
+        except IndexError:
+            lon_c, lat_c = rootgrp['lon'][:], rootgrp['lat'][:]
+        LON_inds = np.abs(lon_c[None, :] - LONs[:, None]).argmin(axis=1)
+        LAT_inds = np.abs(lat_c[None, :] - LATs[:, None]).argmin(axis=1)
+        # Read the unique lon and lat indices of all the sites at once
+        uLON_inds, LON_pos = np.unique(LON_inds, return_inverse=True)
+        uLAT_inds, LAT_pos = np.unique(LAT_inds, return_inverse=True)
+        for spec in specs:
+            var = rootgrp[var_prefix+spec]
+            arr = var[:, uLON_inds, uLAT_inds]
+            data[spec] = np.ma.filled(arr[:, LON_pos, LAT_pos], np.nan)
+            units[spec] = getattr(var, 'cf_units', 'UNITS NOT IN FILE')
+            if verbose:
+                print(('Extracted data:', spec, data[spec].shape))
+    # Extract dates in NetCDF
+    dates = get_gc_datetime(filename=filename, wd=wd, rtn_DatetimeIndex=True)
+    # Make dataframe and return
+    arr = np.stack([data[i] for i in specs], axis=-1)
+    columns = pd.MultiIndex.from_product([sites, specs],
+                                         names=['site', 'spec'])
+    df = pd.DataFrame(arr.reshape(len(dates), -1), index=dates,
+                      columns=columns)
+    df.index.name = 'datetime'
+    if rtn_long_form:
+        df = df.melt(value_name='value', ignore_index=False).reset_index()
+    if rtn_units:
+        return df, units
+    else:
+        return df
+
+
 def mask4troposphere(ars=[], wd=None, t_ps=None, trop_limit=False,
                      t_lvl=None, masks4stratosphere=False,
                      use_time_in_trop=True,
@@ -3264,11 +3742,17 @@ def prt_2D_vals_by_region(specs=None, res='4x5', arrs=None, prt_pcent=False,
     """
     # Which regions?
     m_titles = ['Tropics', 'Mid lats', 'Extratropics', 'Oceanic', 'NH', 'SH']
-    # Get maskes
+    # Get maskes (as a stack of region memberships)
     masks = [mask_all_but(i, mask2D=True, trop_limit=True, res=res)
              for i in m_titles]
     if debug:
         print([(m_titles[n], i.shape) for n, i in enumerate(masks)])
+    masks = np.stack([np.ma.filled(i, 0) for i in masks])
+
+    def get_regional_sums(arr):
+        """ Sum an array for all regions in one pass over the data """
+        sums, _ = get_grouped_sums_and_weights(arr, masks, axis=(0, 1))
+        return sums.reshape((-1, len(m_titles))).sum(axis=0)
     # --- Average or total ?
     if add_total:
         arrs += [np.ma.concatenate([i[..., None] for i in arrs],
@@ -3281,12 +3765,12 @@ def prt_2D_vals_by_region(specs=None, res='4x5', arrs=None, prt_pcent=False,
     print((m_titles, arrsn))
     print((pstr.format(*arrsn)))
     for n, s in enumerate(specs):
+        sums = get_regional_sums(arrs[n])
         if summate:
-            vars = [s, np.ma.sum(arrs[n])]
-            vars += [np.ma.sum(arrs[n]*m) for m in masks]
+            vars = [s, np.ma.sum(arrs[n])] + list(sums)
         else:
             vars = [s, np.ma.mean(arrs[n])]
-            vars += [np.ma.mean(arrs[n]*m) for m in masks]
+            vars += list(sums / np.ma.count(arrs[n]))
         print((pstrn.format(*vars)))
     # --- Print out percent values
     if prt_pcent:
@@ -3306,8 +3790,8 @@ def prt_2D_vals_by_region(specs=None, res='4x5', arrs=None, prt_pcent=False,
         vars_l = []
         for n, s in enumerate(specs):
             vars = [s, np.ma.sum(arrs[n]), np.ma.sum(s_arrs[n])]
-            vars += [np.ma.sum(s_arrs[n]*m)/np.ma.sum(s_arrs[n])*100
-                     for m in masks]
+            vars += list(get_regional_sums(s_arrs[n]) /
+                         np.ma.sum(s_arrs[n])*100)
             vars_l += [vars]
             print((pstrn.format(*vars)))
         # --- Convert to DataFrame, then save to csv
@@ -4025,70 +4509,19 @@ def get_model_run_stats(wd=None, file_type='*geos.log*', debug=False):
     # Get log files
     logging.debug('get_model_run_stats called for wd={}'.format(wd))
     # --- Find all geos log files in directory...
-    files = glob.glob(wd+'/'+file_type)
-    if len(files) < 1:
-        err_str = 'WARNING! - no files found (assuming type={})'
-        logging.info(err_str.format(file_type))
-        print(err_str.format(file_type))
-        files = glob.glob(wd+'/logs/'+file_type)
-        if len(files) < 1:
-            err_str = 'WARNING! - no files found (type={} in wd/log/*)'
-            logging.info(err_str.format(file_type))
-            # try
-            file_type = 'log.*'
-            files = glob.glob(wd+'/logs/'+file_type)
-            print('Loooking for {} files instead'.format(file_type))
-            if len(files) < 1:
-                err_str = 'WARNING! - no files found (type={} in wd/log/*)'
-                logging.info(err_str.format(file_type))
+    files = find_geos_log_files(wd, file_type=file_type)
     # --- If there are any, then
-    if len(files) > 1:
-        # Define some variable names
-        Rstart = 'Real Start'
-        Rend = 'Real End'
-        Mend = 'Model End'
-        Mstart = 'Model Start'
+    if len(files) > 0:
         Mtime = 'Model time (days)'
         Rtime = 'Real time (hours)'
-        vars4df = [Rstart, Rend, Mend, Mstart, ]
-        # Loop and extract OH means, take an average if n>0
-        filenames = [i.split('/')[-1] for i in files]
-        for n_file, file in enumerate(files):
-            d = {}
-            with open(file) as f:
-                if debug:
-                    print((file, f))
-                for line in f:
-                    if '=> SIMULATION ' in line:
-                        date = line.split('TIME:')[1][:-5].strip()
-                        date = time.strptime(date, '%Y/%m/%d %H:%M')
-                        if 'START' in line:
-                            d[Rstart] = time2datetime([date])[0]
-                        if 'END' in line:
-                            d[Rend] = time2datetime([date])[0]
-                    elif 'Start time of run' in line:
-                        sdate = line[30:].strip()
-                        sdate = time.strptime(sdate, '%Y%m%d %H%M%S')
-                        d[Mstart] = time2datetime([sdate])[0]
-                    elif 'End time of run' in line:
-                        edate = line[30:].strip()
-                        edate = time.strptime(edate, '%Y%m%d %H%M%S')
-                        d[Mend] = time2datetime([edate])[0]
-                if all([i in d.keys() for i in vars4df]):
-                    # Add differences
-                    d[Mtime] = (d[Mend]-d[Mstart]
-                                ).total_seconds() / 60 / 60 / 24
-                    d[Rtime] = (d[Rend]-d[Rstart]).total_seconds() / 60 / 60
-                    # keys
-                    keys = vars4df + [Mtime, Rtime]
-                    try:
-                        df[filenames[n_file]] = [d[i] for i in keys]
-                    except:
-                        df = pd.DataFrame(index=keys)
-                else:
-                    print('Exc. incomplete file: {}'.format(filenames[n_file]))
+        vars4df = ['Real Start', 'Real End', 'Model End', 'Model Start', ]
+        df = get_geos_log_metrics_as_df(files=files)
+        # Exclude incomplete files
+        incomplete = df[vars4df].isnull().any(axis=1)
+        for filename in df.index[incomplete]:
+            print('Exc. incomplete file: {}'.format(filename))
+        df = df.loc[~incomplete, vars4df + [Mtime, Rtime]]
         # - Now calculate some stats
-        df = df.T
         # Get average times
         AvgMtime = df[Mtime].mean()
         AvgRtime = df[Rtime].mean()
@@ -4101,12 +4534,117 @@ def get_model_run_stats(wd=None, file_type='*geos.log*', debug=False):
         # print model
         prt_str = 'Avg. Model days per Real hour = {:.2f}'
         print(prt_str.format(AvgMtime/AvgRtime))
-
+        return df
     else:
         print('No *log files found! (folder:{})'.format(wd))
         sys.exit()
 
 
+def get_bpch_summary4run(wd=None, burden_specs=['O3'], surface_specs=['O3'],
+                         trop_specs=[], a_m=None, t_p=None, s_area=None,
+                         res='4x5', trop_limit=True,
+                         TimeInTropVar='TIME_TPS__TIMETROP'):
+    """
+    Get tropospheric burdens and mean concentrations for a list of species
+
+    Parameters
+    ----------
+    wd (str): Specify the wd to get the results from a run.
+    burden_specs (list): species to get tropospheric burdens (Gg) for
+    surface_specs (list): species to get area weighted surface values for
+    trop_specs (list): species to get molecule weighted tropospheric values for
+    a_m (np.array): 4D array of air mass
+    t_p (np.array): fractional time a grid box has spent in tropospehre
+    s_area (array): array of areas of grid boxes (could be any variable)
+    res (str): the resolution if wd not given (e.g. '4x5' )
+    trop_limit (bool): limit 4D arrays to troposphere
+    TimeInTropVar (str): variable name for time in the troposphere
+
+    Returns
+    -------
+    (dict) of dictionaries ('burden', 'surface', 'trop') of values by species
+
+    Notes
+    -----
+     - The shared fields (air mass, time in the troposphere, surface area)
+     are read once and all species are extracted in a single request. Values
+     are the same as get_trop_burden(...).sum() (with all_data=False),
+     get_avg_surface_conc_of_X and get_avg_trop_conc_of_X.
+    """
+    specs = list(burden_specs) + list(surface_specs) + list(trop_specs)
+    specs = sorted(set(specs), key=specs.index)
+    # Get shared variables (if not provided)
+    if len(burden_specs) > 0:
+        if not isinstance(a_m, np.ndarray):
+            a_m = get_air_mass_np(wd=wd, trop_limit=trop_limit)
+        if not isinstance(t_p, np.ndarray):
+            t_p = get_GC_output(wd, vars=[TimeInTropVar],
+                                trop_limit=trop_limit)
+    if (len(surface_specs) > 0) and isinstance(s_area, type(None)):
+        s_area = get_surface_area(res)[..., 0]  # m2 land map
+    # Extract all the species at once - dims: (spec, lon, lat, alt, time)
+    ars = get_GC_output(wd, vars=['IJ_AVG_S__'+i for i in specs],
+                        trop_limit=trop_limit, r_list=True)
+    ars = np.stack([np.ma.filled(i, 0) for i in ars])
+    logging.debug('get_bpch_summary4run for {}, shape={}'.format(wd,
+                                                                 ars.shape))
+    summary = {'burden': {}, 'surface': {}, 'trop': {}}
+    # Tropospheric burdens (Gg)
+    if len(burden_specs) > 0:
+        idx = [specs.index(i) for i in burden_specs]
+        # v/v * (mass total of air (kg)/ 1E3 (converted kg to g)) = moles
+        scale = np.ma.filled(a_m, 0) * np.ma.filled(t_p, 0)
+        moles = np.einsum('sijkl,ijkl->s', ars[idx], scale) / ars.shape[-1]
+        moles = moles * 1E3 / constants('RMM_air')
+        # Convert moles to mass (* RMM) , then to Gg
+        RMMs = np.array([float(species_mass(i)) for i in burden_specs])
+        summary['burden'] = dict(zip(burden_specs, moles * RMMs / 1E9))
+    # Area weighted surface values (mean over time)
+    if len(surface_specs) > 0:
+        idx = [specs.index(i) for i in surface_specs]
+        arr = ars[idx][:, :, :, 0, :].mean(axis=-1)
+        vals = np.einsum('sij,ij->s', arr, s_area) / s_area.sum()
+        summary['surface'] = dict(zip(surface_specs, vals))
+    # Molecule weighted tropospheric values (mean over time)
+    if len(trop_specs) > 0:
+        idx = [specs.index(i) for i in trop_specs]
+        weighting = MolecWeighting(wd=wd, res=res, trop_limit=trop_limit,
+                                    annual_mean=True)
+        vals = weighting.weighted_avg(ars[idx].mean(axis=-1))
+        summary['trop'] = dict(zip(trop_specs, vals))
+    return summary
+
+
+def get_bpch_summary4runs(wds, n_workers=1, **kwargs):
+    """
+    Get burdens and mean concentrations for a list of runs (in parallel)
+
+    Parameters
+    ----------
+    wds (list): list of directories of model runs
+    n_workers (int): number of processes to use (default=1, serial; None=n
+        CPUs)
+    kwargs (dict): keyword arguments for get_bpch_summary4run
+
+    Returns
+    -------
+    (list) of dictionaries (see get_bpch_summary4run)
+
+    Notes
+    -----
+     - For n_workers != 1, call this from within a "if __name__ ==
+     '__main__':" block (processes are started by "spawn" on some platforms)
+    """
+    if len(wds) > 1 and (n_workers != 1):
+        import functools
+        from concurrent.futures import ProcessPoolExecutor
+        func = functools.partial(get_bpch_summary4run, **kwargs)
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            return list(executor.map(func, wds))
+    else:
+        return [get_bpch_summary4run(wd=i, **kwargs) for i in wds]
+
+
 def get_general_stats4run_dict_as_df_bpch(run_dict=None, extra_str='',
                                           REF1=None,
                                           REF2=None, REF_wd=None, res='4x5',
@@ -4116,6 +4654,7 @@ def get_general_stats4run_dict_as_df_bpch(run_dict=None, extra_str='',
                                           extra_burden_specs=['NIT', 'NITs'],
                                           extra_surface_specs=['NIT', 'NITs'],
                                           GC_version='v11-02d',
+                                          n_workers=1,
                                           debug=False):
     """
     Get various stats on a set of runs in a dictionary ({name: location})
@@ -4134,6 +4673,10 @@ def get_general_stats4run_dict_as_df_bpch(run_dict=None, extra_str='',
     extra_burden_specs (list): list of extra species to give trop. burden stats on
     extra_surface_specs (list): list of extra species to give surface conc. stats on
     res (str): resolution of the modul output (e.g. 4x5, 2x2.5, 0.125x0.125)
+    n_workers (int): number of processes to extract burdens and surface
+        values for runs with (default=1, serial; None=n CPUs). For
+        n_workers != 1, call this from within a "if __name__ == '__main__':"
+        block (processes are started by "spawn" on some platforms)
 
     Returns
     -------
@@ -4166,25 +4709,33 @@ def get_general_stats4run_dict_as_df_bpch(run_dict=None, extra_str='',
     # volume
     vol = get_volume_np(wd=REF_wd, res=res)
     #
+    # Core species for tropospheric burdens and surface concentrations
+    core_burden_specs = [
+        'NO', 'NO2', 'N2O5'
+    ]
+    core_surface_specs = [
+        'O3', 'NO', 'NO2', 'N2O5'
+    ]
+    burden_specs = ['O3'] + core_burden_specs + extra_burden_specs
+    surface_specs = core_surface_specs+extra_surface_specs
+    # Get burdens and surface values for all species for each run at once
+    summaries = get_bpch_summary4runs(wds, n_workers=n_workers,
+                                      burden_specs=burden_specs,
+                                      surface_specs=surface_specs,
+                                      t_p=t_p, s_area=s_area, res=res)
     # --- Now add analysis values into a pd.DataFrame
     # -- Tropospheric burdens?
     # Get tropospheric burden for run
     varname = 'O3 burden ({})'.format(mass_unit)
-    ars = [get_O3_burden_bpch(i, t_p=t_p, res=res).sum() for i in wds]
+    ars = [i['burden']['O3'] for i in summaries]
     df = pd.DataFrame(ars, columns=[varname], index=run_names)
 
-    # Get other core species
-    core_burden_specs = [
-        'NO', 'NO2', 'N2O5'
-    ]
     # Loop and add core species.
     for spec in core_burden_specs+extra_burden_specs:
         varname = '{} burden ({})'.format(spec, mass_unit)
         ref_spec = get_ref_spec(spec)
-        # get arrrays
-        ars = [get_trop_burden(spec=spec, t_p=t_p, wd=i,
-                               all_data=False, res=res).sum()
-               for i in wds]
+        # get values
+        ars = [i['burden'][spec] for i in summaries]
 
         # convert to N equivalent
         ars = [i/species_mass(spec)*species_mass(ref_spec) for i in ars]
@@ -4235,16 +4786,12 @@ def get_general_stats4run_dict_as_df_bpch(run_dict=None, extra_str='',
         pass
 
     # - Surface concentrations?
-    core_surface_specs = [
-        'O3', 'NO', 'NO2', 'N2O5'
-    ]
-    for spec in core_surface_specs+extra_surface_specs:
+    for spec in surface_specs:
         #
         units, scale = tra_unit(spec, scale=True)
         # Surface ozone
         varname = '{} surface ({})'.format(spec, units)
-        ars = [get_avg_surface_conc_of_X(spec=spec, wd=i, s_area=s_area, res=res)
-               for i in wds]
+        ars = [i['surface'][spec] for i in summaries]
         df[varname] = ars
 
     # Surface NOx (note: NO units are pptv, NO2 is ppbv)
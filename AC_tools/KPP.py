@@ -31,11 +31,78 @@ from .GEOSChem_bpch import *
 from .GEOSChem_nc import *
 
 
+def get_PL_da4mech_NetCDF(Ox_fam_dict=None, ref_spec='O3', rm_strat=False,
+                          use_time_in_trop=True, dates2use=None,
+                          StateMet=None, wd=None, dsPL=None):
+    """
+    Get prod/loss for family tags as a lazy data array (in g/month)
+
+    Parameters
+    -------
+    Ox_fam_dict (dict), dictionary of Ox loss variables/data (from get_Ox_fam_dicts)
+    ref_spec (str): reference species to normalise to
+    rm_strat (bool): (fractionally) replace values in statosphere with zeros
+    use_time_in_trop (bool): remove the stratosphere using the time in the
+        troposphere (or a mask of the tropopause level if False)
+    dates2use (list): dates of model output to use
+    StateMet (dataset): Dataset object containing time in troposphere
+    wd (str): working directory ("wd") of model output
+    dsPL (dataset): prod/loss output (default = read from wd)
+
+    Returns
+    -------
+    (xr.DataArray) with the tags as the "tag" dimension
+
+    Notes
+    -----
+     - All tags are converted from molec/cm3/s with one broadcast of the
+     stoichiometry (by tag) and seconds per month (by time), so nothing is
+     computed until values are requested. For the multi-file (dask) prod/loss
+     output this is then done a time chunk at a time.
+    """
+    # - Get KPP production/loss tags
+    RR_dict_fam_stioch = Ox_fam_dict['RR_dict_fam_stioch']
+    tags2_rxn_num = Ox_fam_dict['tags2_rxn_num']
+    tags = Ox_fam_dict['tags']
+    # - Get model output for fluxes through these tagged routes
+    # Get the prod/loss netCDFs
+    if isinstance(dsPL, type(None)):
+        dsPL = get_ProdLoss_ds(wd=wd, dates2use=dates2use)
+    prefix = 'Prod_'
+    diag_tag_prefix = '{}{}'.format(prefix, 'T')
+    vars2use = [i.replace('PT', diag_tag_prefix) for i in tags]
+    # Rename back into old format for now - Update this?
+    rename_dict = dict(zip(vars2use, tags))
+    dsPL = dsPL[vars2use].rename(rename_dict)
+    dims = dsPL[tags[0]].dims
+    # Convert seconds to per month (assuming monthly output)
+    months = list(dsPL['time.month'].values.flatten())
+    years = list(dsPL['time.year'].values.flatten())
+    month2sec = xr.DataArray(secs_in_month(years=years, months=months),
+                             dims=('time',), coords={'time': dsPL['time']})
+    # Molecules to g mass, accounting for the stoichiometry of the reaction
+    # routes (to consider any stoichiometeric scalling on Ox)
+    stioch = [RR_dict_fam_stioch[tags2_rxn_num[i]] for i in tags]
+    scale = xr.DataArray(stioch, dims=('tag',), coords={'tag': tags})
+    scale = scale / constants('AVG') * species_mass('O3') * month2sec
+    # Convert the units from molec/cm3/s to g/month (removing volume (*cm3))
+    da = dsPL.to_array(dim='tag') * (StateMet['Met_AIRVOL'] * 1E6)
+    da = da * scale
+    # Remove the stratosphere?
+    if rm_strat:
+        if use_time_in_trop:
+            # By multiplication through by "time in troposphere"
+            da = da * StateMet['FracOfTimeInTrop']
+        else:
+            da = da.where(create4Dmask4trop_level(StateMet=StateMet))
+    return da.transpose(*(('tag',)+dims))
+
+
 def get_PL_ars4mech_NetCDF(fam='LOx', ref_spec='O3', Ox_fam_dict=None,
                            region=None, rm_strat=False, use_time_in_trop=True,
                            GC_version='v12.9.1',
                            weight_by_molecs=False, dates2use=None,
-                           StateMet=None, wd=None,
+                           StateMet=None, wd=None, rtn_totals=False,
                            verbose=True, debug=False):
     """
     Extract prod/loss for family from wd (NetCDF files)
@@ -54,94 +121,55 @@ def get_PL_ars4mech_NetCDF(fam='LOx', ref_spec='O3', Ox_fam_dict=None,
     tags (list): list of prod/loss tags to extract
     rm_strat (bool): (fractionally) replace values in statosphere with zeros
     weight_by_molecs (bool): weight grid boxes by number of molecules
+    rtn_totals (bool): just return the total for each tag (computed without
+        holding the full arrays in memory)
 
     Returns
     -------
-    (None)
+    (list)
+
+    Notes
+    -----
+     - see get_PL_da4mech_NetCDF for the (lazy) unit conversion of the tags
     """
-    # - Get KPP production/loss tags
-    RR_dict_fam_stioch = Ox_fam_dict['RR_dict_fam_stioch']
-    tags2_rxn_num = Ox_fam_dict['tags2_rxn_num']
     tags = Ox_fam_dict['tags']
-    # - Get model output for fluxes through these tagged routes
-    # Get the prod/loss netCDFs
-    dsPL = get_ProdLoss_ds(wd=wd, dates2use=dates2use)
-    prefix = 'Prod_'
-    diag_tag_prefix = '{}{}'.format(prefix, 'T')
-    vars2use = [i.replace('PT', diag_tag_prefix) for i in Ox_fam_dict['tags']]
-    dsPL = dsPL[vars2use]
-    # Rename back into old format for now - Update this?
-    rename_dict = dict(zip(vars2use, Ox_fam_dict['tags']))
-    dsPL = dsPL.rename(rename_dict)
-    # Convert seconds to per month (assuming monthly output)
-    months = list(dsPL['time.month'].values.flatten())
-    years = list(dsPL['time.year'].values.flatten())
-    month2sec = secs_in_month(years=years, months=months)
-    # Convert the units from molec/cm3/s to g/s
-    # Remove volume (*cm3)
-    dsPL = dsPL * StateMet['Met_AIRVOL'] * 1E6
-    # Update for stoichiometry of the reaction routes
-    # (to consider any stoichiometeric scalling on Ox)
-    AVG = constants('AVG')
-    for var2use in Ox_fam_dict['tags']:
-        if debug:
-            print(var2use)
-        values = dsPL[var2use]
-        # Convert molecules to moles
-        values = values / AVG
-        # Convert to g mass
-        values = (values * species_mass('O3'))
-        # Account for stiochiometrey of reaction
-        values = values * RR_dict_fam_stioch[tags2_rxn_num[var2use]]
-        # Convert to /month from /s
-        values = values * month2sec[:, None, None, None]
-        dsPL[var2use].values = values
-    # Save data dataset and reload
-    savename = 'TEMP_ProdLoss_Ox_budget_{}.nc'.format('dsPL')
-    dsPL = save_ds2disk_then_reload(ds=dsPL, savename=savename,
-                                    folder='~/tmp/')
-    # Remove the stratosphere by multiplication through by "time in troposphere"
-    # Remove stratosphere?
-    if rm_strat:
-        # Loop by spec
-        if use_time_in_trop:
-            dsPL = rm_fractional_troposphere(dsPL, StateMet=StateMet,
-                                             vars2use=Ox_fam_dict['tags'])
-        else:
-            trop_mask = create4Dmask4trop_level(StateMet=StateMet)
-            for spec_var in vars2use:
-                dsPL[spec_var] = dsPL[spec_var].where(trop_mask)
+    da = get_PL_da4mech_NetCDF(Ox_fam_dict=Ox_fam_dict, ref_spec=ref_spec,
+                               rm_strat=rm_strat, wd=wd, StateMet=StateMet,
+                               use_time_in_trop=use_time_in_trop,
+                               dates2use=dates2use)
+    # Compute the arrays once, if these are to be returned
+    if not rtn_totals:
+        da = da.compute()
+    # The total can be taken from the tag totals if these are tropospheric
+    total_from_tags = rtn_totals and rm_strat and use_time_in_trop and \
+        (not weight_by_molecs)
     # Check the total tropospheric Ox loss
-    # Extract the arrays (to follow same approach as for BPCH files)
-    ars = [dsPL[i].values for i in Ox_fam_dict['tags']]
-    arr = np.ma.array(ars).sum(axis=0)
-    var2use = Ox_fam_dict['tags'][0]
-    ds_TEMP = dsPL[[var2use]].copy()
-    print(arr.shape, dsPL[var2use].values.shape)
-    print(arr.sum())
-    ds_TEMP[var2use].values = arr
-    LOx_trop = rm_fractional_troposphere(ds_TEMP, vars2use=[var2use],
-                                         StateMet=StateMet)
-    LOx_trop = float(ds_TEMP[var2use].values.sum()) / 1E12
-    if verbose:
+    if verbose and (not total_from_tags):
+        LOx_trop = da.sum(dim='tag')
+        if not (rm_strat and use_time_in_trop):
+            LOx_trop = LOx_trop * StateMet['FracOfTimeInTrop']
+        LOx_trop = float(LOx_trop.sum().values) / 1E12
         print('Annual tropospheric Ox loss (Tg O3): ', LOx_trop)
     # Weight by molecules?
     if weight_by_molecs:
         # Calculate number of molecules
         MolecVar = 'Met_MOLECS'
         RMM_air = constants('RMM_air')
-        StateMet[MolecVar] = StateMet['Met_AIRDEN'].copy()
         # kg/m3 => molecs/cm3
-        StateMet[MolecVar].values = StateMet[MolecVar].values / RMM_air / 1E6
-        # Multiply values through by # molecules
-        dsPL = dsPL * StateMet[MolecVar]
-        # sum over lat and lon
-        dsPL = dsPL.sum(dim=['lat', 'lon', 'time'])
+        StateMet[MolecVar] = StateMet['Met_AIRDEN'] / RMM_air / 1E6
+        # Multiply values through by # molecules and sum over lat and lon
+        dims2sum = ['lat', 'lon', 'time']
+        da = (da * StateMet[MolecVar]).sum(dim=dims2sum)
         # divide by the total number of molecules
-        dsPL = dsPL / StateMet[MolecVar].sum(dim=['lat', 'lon', 'time'])
+        da = da / StateMet[MolecVar].sum(dim=dims2sum)
+    if rtn_totals:
+        totals = da.sum(dim=[i for i in da.dims if i != 'tag']).values
+        if verbose and total_from_tags:
+            LOx_trop = float(totals.sum()) / 1E12
+            print('Annual tropospheric Ox loss (Tg O3): ', LOx_trop)
+        return list(totals)
     # Extract the arrays (to follow same approach as for BPCH files)
-    ars = [dsPL[i].values for i in Ox_fam_dict['tags']]
-    return ars
+    return list(da.values)
 
 
 def get_PL_ars4mech_BPCH(fam='LOx', ref_spec='O3', Ox_fam_dict=None,
@@ -242,16 +270,13 @@ def get_PL_ars4mech_BPCH(fam='LOx', ref_spec='O3', Ox_fam_dict=None,
         sys.exit()
     else:
         if weight_by_molecs:
-            ars = [molec_weighted_avg_BPCH(i, weight_lon=True,
-                                           res=Data_rc['res'],
-                                           weight_lat=True, wd=Var_rc['wd'],
-                                           trop_limit=Var_rc['trop_limit'],
-                                           rm_strat=Var_rc['rm_strat'], \
-                                           # provide shared data arrays averaged over time...
-                                           molecs=Data_rc['molecs'].mean(
-                                               axis=-1),
-                                           t_p=t_ps) \
-                   for i in ars]
+            # provide shared data arrays averaged over time...
+            # (the stratosphere has already been removed above)
+            weights = MolecWeighting(res=Data_rc['res'], wd=Var_rc['wd'],
+                                      molecs=Data_rc['molecs'].mean(axis=-1),
+                                      trop_limit=Var_rc['trop_limit'],
+                                      rm_strat=False)
+            ars = list(weights.weighted_avg(ars, axis=[0, 1]))
         else:
             pass
     if debug:
@@ -363,15 +388,26 @@ def KPP_eqn_file_headers(folder=None, filename=None):
 
 
 def get_reactants_and_products4tagged_fam(fam='LOx', KPP_output_mech=None,
-                                          folder=None, GC_version='v12.9.1'):
+                                          folder=None, GC_version='v12.9.1',
+                                          rxn_index=None):
     """
     Return a list of reactants and products of reactions making fam tag
+
+    Parameters
+    -------
+    fam (str): tagged family (e.g. 'LOx')
+    KPP_output_mech (dict): dictionary of compiled KPP mechanism (from
+        get_dict_of_KPP_mech)
+    rxn_index (KPP_species_index): species index of KPP_output_mech (default =
+        that of the compiled mechanism in folder, see get_KPP_mechanism)
     """
     import pandas as pd
-    # Get the outputted KPP mechanism if not provided.
+    # Get the outputted KPP mechanism (and its species index) if not provided.
     if isinstance(KPP_output_mech, type(None)):
-        KPP_output_mech = get_dict_of_KPP_mech(wd=folder,
-                                               GC_version=GC_version)
+        mech = get_KPP_mechanism(wd=folder, GC_version=GC_version)
+        KPP_output_mech = dict(mech.RR_dict)
+        if isinstance(rxn_index, type(None)):
+            rxn_index = mech.rxn_index
     # Make a DataFrame from the dictionary
     s = pd.Series(KPP_output_mech)
     df = pd.DataFrame()
@@ -406,6 +442,12 @@ def get_reactants_and_products4tagged_fam(fam='LOx', KPP_output_mech=None,
                 if a__ != b_[n]:
                     print(a__, b_[n])
     # Only consider reaction that include family in the products
+    if isinstance(rxn_index, type(None)):
+        rxn_index = get_KPP_species_index(RR_dict=KPP_output_mech)
+    rxns = rxn_index.rxns4search_str(fam, as_reactant=False)
+    if isinstance(rxns, type(None)):
+        rxns = df.index
+    df = df.loc[rxns]
 
     def fam_in_rxn(input):
         return (fam in input)
@@ -498,97 +540,175 @@ def KPP_eqn_file_species(folder=None, filename=None, debug=False):
     return df
 
 
+# Functions used to give the rate of reactions in KPP *.eqn files
+KPP_rxn_funcs = (
+    # Main KPP functions
+    'HET', 'PHOTOL', 'GCARR', 'GCJPLPR',
+    #    'GC_',
+    # Specialist KPP functions for mechanism
+    'GC_HO2HO2', 'GC_OHCO',
+    'GC_RO2NO', 'GC_OHHNO3', 'GC_RO2HO2', 'GC_HACOHA',
+    'GC_RO2HO2', 'GC_HACOHB', 'GC_TBRANCH', 'GCJPLEQ',
+    'GC_GLYCOHA', 'GC_GLYCOHB', 'GC_DMSOH', 'GC_GLYXNO3',
+    'GC_HO2NO3',
+    # Include ISOP reaction functions (inc. GC)
+    'GC_ALK', 'GC_NIT', 'GC_PAN', 'GC_EPO', 'GC_ISO1', 'GC_ISO2',
+    # KPP function without GC prefix
+    #   'NIT', 'PAN', 'ALK', 'EPO',
+    'ARRPLUS', 'TUNPLUS',
+    '1.33E-13+3.82E-11*exp',  # Why is this function not in gckpp.kpp?
+    #New Specist functions for Hetrogeneous
+    'uptk', 'ByAcid', 'K_MT', 'K_CLD',
+)
+_KPP_rxn_funcs_regex = re.compile('|'.join([re.escape(i)
+                                            for i in KPP_rxn_funcs]))
+_KPP_spacing_error_regex = re.compile(r' \+([0-9a-zA-Z])')
+_KPP_rxn_term_regex = re.compile(
+    r'^([0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?)?\s*(\S.*)$')
+# KPP *.eqn files already parsed in this session (keyed by file hash)
+_KPP_eqn_file_reactions = {}
+
+
+def remove_KPP_spacing_errors(input):
+    """ Remove differences in spacing in KPP (e.g. 'A +B' => 'A + B') """
+    return _KPP_spacing_error_regex.sub(r' + \1', input)
+
+
+def split_KPP_rxn_terms(input):
+    """
+    Split reactants or products of a KPP reaction into species and coefficients
+
+    Parameters
+    -------
+    input (str): reactants or products (e.g. '0.500ALD2 + 2 NO2 + hv')
+
+    Returns
+    -------
+    (tuple) of lists of species and their (float) coefficients
+
+    Notes
+    -----
+     - third bodies (e.g. '{+M}') and photons ('hv') are not included
+    """
+    specs = []
+    coefs = []
+    for term in re.sub(r'\{.*?\}', '', input).split('+'):
+        match = _KPP_rxn_term_regex.match(term.strip())
+        if isinstance(match, type(None)) or (match.group(2) == 'hv'):
+            continue
+        coef, spec = match.groups()
+        specs += [spec.strip()]
+        coefs += [float(coef) if coef else 1.0]
+    return specs, coefs
+
+
+def get_KPP_eqn_file_reaction_table(folder=None, filename=None,
+                                    debug=False):
+    """
+    Get a table of all reactions in a KPP *.eqn file (parsing it once)
+
+    Parameters
+    -------
+    folder (str): folder containing the *.eqn file
+    filename (str): name of the *.eqn file
+
+    Returns
+    -------
+    (pd.DataFrame) with a row per reaction, indexed by KPP (FORTRAN) reaction
+        number, with the reaction string ('rxn_str'), reactants and products
+        as strings ('react', 'prod') and lists ('reactants', 'products',
+        'react_coefs', 'prod_coefs'), the rate expression ('eqn'), metadata,
+        reaction section ('Type') and line number in the file ('line')
+
+    Notes
+    -----
+     - The file is read in a single pass and the table is cached (by the hash
+     of the file's contents) for the rest of the session, so the returned
+     table should be copied before it is edited.
+    """
+    import hashlib
+    with open(os.path.join(folder, filename), 'rb') as file_:
+        contents = file_.read()
+    key = hashlib.sha1(contents).hexdigest()
+    if key in _KPP_eqn_file_reactions:
+        return _KPP_eqn_file_reactions[key]
+    lines = contents.decode('utf-8', errors='replace').splitlines(True)
+    # Loop the lines of the file once, moving through the reaction sections
+    rxns = []
+    n_line = 0
+    for section in ('Gas-phase', 'Heterogeneous', 'Photolysis',):
+        num2read_line_from = 999999
+        eqns = []
+        # Tmp variables to catch KPP reactions over more than one line
+        tmp_line_ = ''
+        tmp_line_num = None
+        # Line numbers are relative to the start of the section's search
+        for n_sect_line, line_ in enumerate(lines[n_line:]):
+            n_line += 1
+            # Are we at the section?
+            if ('//' in line_) and (section in line_):
+                num2read_line_from = n_sect_line+2
+            # Now save the reaction details
+            if (n_sect_line >= num2read_line_from) and (len(line_) > 1):
+                # Add the line to any partial rxn str from previous lines
+                tmp_line_ += line_.strip()
+                if isinstance(tmp_line_num, type(None)):
+                    tmp_line_num = n_line
+                # Is there is rxn func in the tmp_line_ str?
+                if _KPP_rxn_funcs_regex.search(tmp_line_):
+                    eqns += [(tmp_line_, tmp_line_num)]
+                    # Reset the tmp str
+                    tmp_line_ = ''
+                    tmp_line_num = None
+            # Stop reading lines at end of section
+            if ("//" in line_) and len(eqns) > 3:
+                break
+            if debug:
+                print(n_line, line_)
+        # Remove KPP spacing errors and split any combined "eqns"
+        for eqn, line_num in eqns:
+            eqn = remove_KPP_spacing_errors(eqn)
+            for rxn in split_combined_KPP_eqns([eqn]):
+                rxns += [[section, line_num, rxn]]
+    # Extract the parts of the reaction strings
+    rows = []
+    for section, line_num, rxn in rxns:
+        rxn_str = rxn.split(':')[0].strip()
+        eqn = rxn.split(':')[1].split(';')[0].strip()
+        metadata = rxn[rxn.find(';')+1:]
+        # Split off reactants and products...
+        react = rxn_str.split('=')[0].strip()
+        prod = rxn_str.split('=')[-1].strip()
+        reactants, react_coefs = split_KPP_rxn_terms(react)
+        products, prod_coefs = split_KPP_rxn_terms(prod)
+        rows += [[rxn_str, react, prod, eqn, metadata, section, line_num,
+                  reactants, products, react_coefs, prod_coefs, rxn]]
+    columns = [
+        'rxn_str', 'react', 'prod', 'eqn', 'metadata', 'Type', 'line',
+        'reactants', 'products', 'react_coefs', 'prod_coefs', 'KPP_str',
+    ]
+    df = pd.DataFrame(rows, columns=columns)
+    # Use the index numbers from FORTRAN / KPP
+    df.index = df.index + 1
+    _KPP_eqn_file_reactions[key] = df
+    return df
+
+
 def get_dicts_of_KPP_eqn_file_reactions(folder=None, filename=None,
                                         debug=False):
     """
     Get reactions (Heterogeneous, Photolysis, Gas-phase) from *.eqn file
-    """
-    import string
-    # Local vars
-    KPP_rxn_funcs = (
-        # Main KPP functions
-        'HET', 'PHOTOL', 'GCARR', 'GCJPLPR',
-        #    'GC_',
-        # Specialist KPP functions for mechanism
-        'GC_HO2HO2', 'GC_OHCO',
-        'GC_RO2NO', 'GC_OHHNO3', 'GC_RO2HO2', 'GC_HACOHA',
-        'GC_RO2HO2', 'GC_HACOHB', 'GC_TBRANCH', 'GCJPLEQ',
-        'GC_GLYCOHA', 'GC_GLYCOHB', 'GC_DMSOH', 'GC_GLYXNO3',
-        'GC_HO2NO3',
-        # Include ISOP reaction functions (inc. GC)
-        'GC_ALK', 'GC_NIT', 'GC_PAN', 'GC_EPO', 'GC_ISO1', 'GC_ISO2',
-        # KPP function without GC prefix
-        #   'NIT', 'PAN', 'ALK', 'EPO',
-        'ARRPLUS', 'TUNPLUS',
-        '1.33E-13+3.82E-11*exp',  # Why is this function not in gckpp.kpp?
-        #New Specist functions for Hetrogeneous 
-        'uptk','ByAcid','K_MT','K_CLD',
-    )
-    # Loop lines in file
-    with open(folder+filename, 'r') as file_:
-        rxns_dict = {}
-        for rxns in ('Gas-phase', 'Heterogeneous', 'Photolysis',):
-            #        for rxns in ('Gas-phase',):
-            num2read_line_from = 999999
-            eqns = []
-            # Tmp variables to catch KPP reactions over more than one line
-            tmp_line_ = ''
-            partial_rxn_str = False
-            # Now loop
-            for n_line, line_ in enumerate(file_):
-                # Are we at the species section?
-                if ('//' in line_) and (rxns in line_):
-                    num2read_line_from = n_line+2
-                # Now save the species detail
-                if (n_line >= num2read_line_from) and (len(line_) > 1):
-                    # Is there a rxn function in  the line?
-                    if not any([(i in line_) for i in KPP_rxn_funcs]):
-                        # If not then str/line only contains a partial strin
-                        partial_rxn_str = True
-                        rxn_func_in_str = False
-                    else:
-                        rxn_func_in_str = True
-                    # If only part of rxn str, then save and add to next line
-                    if partial_rxn_str:
-                        tmp_line_ += line_.strip()
-                        if debug:
-                            print('added to tmp_line_:', tmp_line_, line_)
-                    # If the tmp str is empty, just fill it with the line_
-                    if (tmp_line_ == ''):
-                        tmp_line_ = line_.strip()
-                    # (extra) check: is there is rxn func in the tmp_line_ str?
-                    if any([(i in tmp_line_) for i in KPP_rxn_funcs]):
-                        rxn_func_in_str = True
-                    if rxn_func_in_str:
-                        eqns += [tmp_line_]
-                        # Reset the tmp str
-                        tmp_line_ = ''
-                        partial_rxn_str = False
-                # Stop reading lines at end of section
-                if ("//" in line_) and len(eqns) > 3:
-                    break
-                if debug:
-                    print(n_line, line_)
-            # Remove spacing errors in KPP eqn entries
-
-            def remove_KPP_spacing_errors(input):
-                """ Remove differences in spacing in KPP """
-                # Numbers
-                for num in [str(i) for i in range(0, 10)]:
-                    input = input.replace(' +'+num, ' + '+num)
-                # Lower case letters
-                for let in string.ascii_lowercase:
-                    input = input.replace(' +'+let, ' + '+let)
-                # Upper case letters
-                for let in string.ascii_uppercase:
-                    input = input.replace(' +'+let, ' + '+let)
-                return input
-            # Remove KPP spacing errors
-            eqns = [remove_KPP_spacing_errors(i) for i in eqns]
-            # Check for "eqns" with more than one eqn in
-            eqns = split_combined_KPP_eqns(eqns)
-            # Save out
-            rxns_dict[rxns] = eqns
+
+    Notes
+    -----
+     - reactions are extracted from a cached table of the file's reactions
+     (see get_KPP_eqn_file_reaction_table)
+    """
+    df = get_KPP_eqn_file_reaction_table(folder=folder, filename=filename,
+                                         debug=debug)
+    rxns_dict = {}
+    for rxns in ('Gas-phase', 'Heterogeneous', 'Photolysis',):
+        rxns_dict[rxns] = list(df.loc[df['Type'] == rxns, 'KPP_str'].values)
     return rxns_dict
 
 
@@ -883,32 +1003,117 @@ def get_tags4family(fam='LOx', filename='gckpp_Monitor.F90',
     return dict(list(zip(tagged_rxns, tagged_rxn_tags)))
 
 
-def get_dict_of_KPP_mech(filename='gckpp_Monitor.F90', wd=None,
-                         Mechanism='Halogens', GC_version='v12.9.1', ):
+# Compiled KPP mechanisms already read in this session
+# (keyed by file, size, modification time and GEOS-Chem version)
+_KPP_mechanism4file = {}
+# Folder for cache files of compiled KPP mechanisms (see KPP_mechanism)
+KPP_cache_dir = os.environ.get('AC_TOOLS_KPP_CACHE',
+                               os.path.join(os.path.expanduser('~'),
+                                            '.cache', 'AC_tools', 'KPP'))
+
+
+class KPP_mechanism:
     """
-    Get a dictionary of KPP mechansim from compile mechanism
+    Class for holding a compiled KPP mechanism (from gckpp_Monitor.F90)
+
+    Notes
+    -----
+     - Use get_KPP_mechanism to get the mechanism for a file, as this is only
+     read once per (file, GC_version) and the reaction strings are saved to a
+     small cache file in cache_dir (default = KPP_cache_dir, which can be set
+     with the AC_TOOLS_KPP_CACHE environment variable). The GEOS-Chem source
+     folder is not written to.
+     - RR_dict is the same dictionary of reaction number (or "RR" dummy tag
+     for v11-01) to reaction string as returned by get_dict_of_KPP_mech, and
+     rxn_index is its species index (see KPP_species_index).
+    """
+
+    def __repr__(self):
+        rtn_str = "This is a class to hold a compiled KPP mechanism for {} ({})"
+        return rtn_str.format(self.filename, self.GC_version)
+
+    def __init__(self, filename='gckpp_Monitor.F90', wd=None,
+                 GC_version='v12.9.1', use_cache_file=True, cache_dir=None):
+        import hashlib
+        self.filename = os.path.join(wd, filename)
+        self.GC_version = GC_version
+        # Name the cache file by the (hashed) location of the monitor file
+        path = os.path.abspath(self.filename)
+        if isinstance(cache_dir, type(None)):
+            cache_dir = KPP_cache_dir
+        cache_file = '{}.{}.{}.json'.format(
+            os.path.basename(path), GC_version,
+            hashlib.sha1(path.encode()).hexdigest())
+        cache_file = os.path.join(cache_dir, cache_file)
+        stat = os.stat(self.filename)
+        file_id = [stat.st_size, stat.st_mtime]
+        rxns = None
+        # Use the cached reaction strings, if the file has not changed
+        if use_cache_file and os.path.exists(cache_file):
+            try:
+                import json
+                with open(cache_file, 'r') as file_:
+                    cache = json.load(file_)
+                if cache['file_id'] == file_id:
+                    rxns = cache['rxns']
+            except (IOError, ValueError, KeyError):
+                logging.info('Ignoring KPP cache file: {}'.format(cache_file))
+        if isinstance(rxns, type(None)):
+            rxns = read_KPP_Monitor_file_rxns(filename=self.filename,
+                                              GC_version=GC_version)
+            if use_cache_file:
+                try:
+                    import json
+                    import tempfile
+                    if not os.path.isdir(cache_dir):
+                        os.makedirs(cache_dir, exist_ok=True)
+                    fd, tmp_file = tempfile.mkstemp(suffix='.tmp',
+                                                    dir=cache_dir)
+                    with os.fdopen(fd, 'w') as file_:
+                        json.dump({'file_id': file_id, 'rxns': rxns}, file_)
+                    os.replace(tmp_file, cache_file)
+                except IOError:
+                    logging.info('Unable to save KPP cache file: {}'.format(
+                        cache_file))
+        # Reaction numbers (or RR dummy tags), strings and parsed species
+        self.rxn_nums = [i[0] for i in rxns]
+        self.RR_dict = dict([(i[0], i[1]) for i in rxns])
+        self.reactants = {}
+        self.react_coefs = {}
+        self.products = {}
+        self.prod_coefs = {}
+        for key_, rxn_str in rxns:
+            react, prod = (rxn_str.split('-->')+[''])[:2]
+            react = split_KPP_rxn_terms(react)
+            prod = split_KPP_rxn_terms(prod)
+            self.reactants[key_], self.react_coefs[key_] = react
+            self.products[key_], self.prod_coefs[key_] = prod
+        self.rxn_index = KPP_species_index(self.RR_dict)
+
+    def rxns_with_str(self, str_):
+        """ Get the reactions which contain a string (e.g. a tag, "LOx") """
+        return [i for i in self.rxn_nums if (str_ in self.RR_dict[i])]
+
+
+def read_KPP_Monitor_file_rxns(filename='gckpp_Monitor.F90',
+                               GC_version='v12.9.1'):
+    """
+    Read the reaction strings from a compiled KPP mechanism
 
     Parameters
     -------
-    wd (str): the working (code) directory to search for files in
-    Mechanism (str): name of mechanism (e.g. dir in KPP folder)
-    filename (str): name of KPP monitor file
+    filename (str): name of KPP monitor file (inc. path)
     GC_version (str): name of GEOS-Chem version
 
     Returns
     -------
-    (dict)
+    (list) of reaction numbers (or RR dummy tags for v11-01) and strings
     """
-    log_str = 'get_dict_of_KPP_mech called for Mech:{} (ver={}, wd={})'
-    logging.info(log_str.format(Mechanism, GC_version, wd))
-    # Get base working code directory
-    if isinstance(wd, type(None)):
-        print('wd with code must be provided')
     MECH_start_str = 'INTEGER, DIMENSION(1) :: MONITOR'
 #    rxn_line_ind = '! index'
     strs_in_non_rxn_lines = 'N_NAMES_', 'CHARACTER', 'DIMENSION', 'PARAMETER'
-    RR_dict = {}
-    with open(wd+filename, 'r') as file:
+    rxns = []
+    with open(filename, 'r') as file:
         # Loop by line in file
         start_extracting_mech_line = 1E99
         for n, line in enumerate(file):
@@ -928,14 +1133,12 @@ def get_dict_of_KPP_mech(filename='gckpp_Monitor.F90', wd=None,
                     # RR??? dummy tags only available on v11-01 patches!
                     if GC_version == 'v11-01':
                         RR_dummy = 'RR{}'.format(line[118:].strip())
-                        # Add to dictionary
-                        RR_dict[RR_dummy] = rxn_str
+                        rxns += [[RR_dummy, rxn_str]]
                     # Use just reaction number for other versions...
                     else:
                         try:
                             RR_num = int(line[118:].strip())
-                            # Add to dictionary
-                            RR_dict[RR_num] = rxn_str
+                            rxns += [[RR_num, rxn_str]]
                         except ValueError:
                             # Add gotcha for lines printed without an index in
                             # KPP
@@ -948,10 +1151,370 @@ def get_dict_of_KPP_mech(filename='gckpp_Monitor.F90', wd=None,
                             # N+1)
                             logging.debug('rxn # assumed as {} for {}'.format(
                                 RR_num+1, rxn_str))
-                            # use the value of the line previous and add to
-                            # dictionary
-                            RR_dict[RR_num+1] = rxn_str
-    return RR_dict
+                            # use the value of the line previous
+                            rxns += [[RR_num+1, rxn_str]]
+    return rxns
+
+
+def get_KPP_mechanism(filename='gckpp_Monitor.F90', wd=None,
+                      GC_version='v12.9.1', use_cache_file=True,
+                      cache_dir=None):
+    """
+    Get the compiled KPP mechanism (read once per file and GC_version)
+
+    Parameters
+    -------
+    wd (str): the working (code) directory to search for files in
+    filename (str): name of KPP monitor file
+    GC_version (str): name of GEOS-Chem version
+    use_cache_file (bool): save/use a cache file of the mechanism
+    cache_dir (str): folder for the cache file (default = KPP_cache_dir)
+
+    Returns
+    -------
+    (KPP_mechanism)
+    """
+    path = os.path.abspath(os.path.join(wd, filename))
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime, GC_version)
+    if key not in _KPP_mechanism4file:
+        mech = KPP_mechanism(filename=filename, wd=wd, GC_version=GC_version,
+                             use_cache_file=use_cache_file,
+                             cache_dir=cache_dir)
+        _KPP_mechanism4file[key] = mech
+    return _KPP_mechanism4file[key]
+
+
+def get_dict_of_KPP_mech(filename='gckpp_Monitor.F90', wd=None,
+                         Mechanism='Halogens', GC_version='v12.9.1', ):
+    """
+    Get a dictionary of KPP mechansim from compile mechanism
+
+    Parameters
+    -------
+    wd (str): the working (code) directory to search for files in
+    Mechanism (str): name of mechanism (e.g. dir in KPP folder)
+    filename (str): name of KPP monitor file
+    GC_version (str): name of GEOS-Chem version
+
+    Returns
+    -------
+    (dict)
+
+    Notes
+    -----
+     - The mechanism is only read once per session (see get_KPP_mechanism)
+    """
+    log_str = 'get_dict_of_KPP_mech called for Mech:{} (ver={}, wd={})'
+    logging.info(log_str.format(Mechanism, GC_version, wd))
+    # Get base working code directory
+    if isinstance(wd, type(None)):
+        print('wd with code must be provided')
+    mech = get_KPP_mechanism(filename=filename, wd=wd, GC_version=GC_version)
+    return dict(mech.RR_dict)
+
+
+class KPP_species_index:
+    """
+    Class for holding an inverted index of species to reactions in a mechanism
+
+    Notes
+    -----
+     - as_reactant and as_product are dictionaries of species to ordered
+     dictionaries of reaction (key in rxn_strs) to stoichiometry, so finding
+     the reactions for a species does not need a scan of every reaction string
+     - reaction strings can be from the KPP *.eqn file ("=") or from the
+     compiled mechanism ("-->")
+     - other_terms holds the terms in the reactions which are not species
+     (e.g. '{+M}', 'hv')
+    """
+
+    def __repr__(self):
+        rtn_str = "This is a class to hold a species index for {} reactions"
+        return rtn_str.format(len(self.rxns))
+
+    def __init__(self, rxn_strs):
+        self.rxns = list(rxn_strs.keys())
+        self.position = dict([(i, n) for n, i in enumerate(self.rxns)])
+        self.as_reactant = {}
+        self.as_product = {}
+        self.other_terms = set()
+        for key_ in self.rxns:
+            rxn_str = str(rxn_strs[key_])
+            arrow = '-->' if ('-->' in rxn_str) else '='
+            react, prod = (rxn_str.split(arrow)+[''])[:2]
+            for terms, index in ((react, self.as_reactant),
+                                 (prod, self.as_product)):
+                self.other_terms |= set(re.findall(r'\{.*?\}', terms))
+                self.other_terms |= set([i.strip() for i in re.sub(
+                    r'\{.*?\}', '', terms).split('+') if i.strip() == 'hv'])
+                for spec, coef in zip(*split_KPP_rxn_terms(terms)):
+                    rxns4spec = index.setdefault(spec, {})
+                    rxns4spec[key_] = rxns4spec.get(key_, 0.) + coef
+        self.species = sorted(set(self.as_reactant) | set(self.as_product))
+
+    def rxns4spec(self, spec, as_reactant=True, as_product=True, coef=None):
+        """
+        Get the reactions a species is in (in the order of the mechanism)
+
+        Parameters
+        -------
+        spec (str): name of species
+        as_reactant (bool): include reactions where species is a reactant
+        as_product (bool): include reactions where species is a product
+        coef (float): only include reactions with this stoichiometry
+
+        Returns
+        -------
+        (list)
+        """
+        rxns = set()
+        for use, index in ((as_reactant, self.as_reactant),
+                           (as_product, self.as_product)):
+            if use:
+                rxns4spec = index.get(spec, {})
+                rxns |= set([i for i in rxns4spec if isinstance(coef, type(
+                    None)) or np.isclose(rxns4spec[i], coef)])
+        return sorted(rxns, key=self.position.get)
+
+    def rxns4search_str(self, search_str, as_reactant=True, as_product=True):
+        """
+        Get the reactions with a species whose name contains a search string
+
+        Parameters
+        -------
+        search_str (str): string to search for (e.g. 'HOBr', 'CH4 ', '0.150IBr')
+        as_reactant (bool): search reactants
+        as_product (bool): search products
+
+        Returns
+        -------
+        (list) or None (if search_str is not part of a species in the index)
+
+        Notes
+        -----
+         - Any leading coefficient and whitespace is ignored, so these are the
+         (few) reactions which could contain the search string. Check the
+         string is in these reaction strings for an exact match.
+         - None is returned for strings which are not (part of) a species name
+         (e.g. 'hv', 'M', 'A + B'), so all reactions should be searched.
+        """
+        if any([(i in search_str) for i in ('+', '=', '>', '{', '}')]):
+            return None
+        match = _KPP_rxn_term_regex.match(search_str.strip())
+        if isinstance(match, type(None)) or (' ' in match.group(2)):
+            return None
+        str_ = match.group(2)
+        specs = [i for i in self.species if (str_ in i)]
+        if (len(specs) == 0) or any([(str_ in i) for i in self.other_terms]):
+            return None
+        rxns = set()
+        for spec in specs:
+            rxns |= set(self.rxns4spec(spec, as_reactant=as_reactant,
+                                       as_product=as_product))
+        return sorted(rxns, key=self.position.get)
+
+
+def get_KPP_species_index(rxn_dicts=None, RR_dict=None):
+    """
+    Get an inverted index of species to reactions for a KPP mechanism
+
+    Parameters
+    -------
+    rxn_dicts (dict): dictionary of DataFrames of KPP *.eqn file reactions
+        (from process_KPP_rxn_dicts2dfs), reactions are keyed by (key, index)
+    RR_dict (dict): dictionary of compiled KPP mechanism (from
+        get_dict_of_KPP_mech), reactions are keyed by reaction number
+
+    Returns
+    -------
+    (KPP_species_index)
+    """
+    if isinstance(rxn_dicts, type(None)):
+        return KPP_species_index(RR_dict)
+    rxn_strs = {}
+    for key_ in rxn_dicts.keys():
+        df = rxn_dicts[key_]
+        for idx, rxn_str in zip(df.index, df['rxn_str'].values):
+            rxn_strs[(key_, idx)] = rxn_str
+    return KPP_species_index(rxn_strs)
+
+
+class KPP_stoich_matrix:
+    """
+    Class for holding the (sparse) stoichiometry of a KPP mechanism
+
+    Notes
+    -----
+     - matrix is a scipy.sparse (species x reactions) matrix of the net
+     stoichiometry (products - reactants), so the net production of all
+     species is a single sparse matrix product with the reaction rates
+     - use get_KPP_stoich_matrix to make this from a *.eqn or monitor file
+    """
+
+    def __repr__(self):
+        rtn_str = "This is a class to hold a stoichiometry matrix ({} x {})"
+        return rtn_str.format(len(self.species), len(self.rxns))
+
+    def __init__(self, rxn_index):
+        import scipy.sparse as sparse
+        self.species = list(rxn_index.species)
+        self.rxns = list(rxn_index.rxns)
+        spec_pos = dict([(i, n) for n, i in enumerate(self.species)])
+        rows, cols, vals = [], [], []
+        for sign, index in ((-1., rxn_index.as_reactant),
+                            (1., rxn_index.as_product)):
+            for spec, rxns4spec in index.items():
+                for rxn, coef in rxns4spec.items():
+                    rows += [spec_pos[spec]]
+                    cols += [rxn_index.position[rxn]]
+                    vals += [sign*coef]
+        shape = (len(self.species), len(self.rxns))
+        # NOTE: duplicate entries (e.g. a catalyst) are summed by scipy
+        self.matrix = sparse.coo_matrix((vals, (rows, cols)), shape=shape)
+        self.matrix = self.matrix.tocsr()
+
+    def get_fam_matrix(self, fams):
+        """
+        Get a sparse (family x species) matrix of weights for families
+
+        Parameters
+        -------
+        fams (dict): dictionary of family names to lists of species, or to
+            dictionaries of species and their weights (e.g. {'Br': 1, 'Br2': 2})
+
+        Returns
+        -------
+        (scipy.sparse.csr_matrix)
+        """
+        import scipy.sparse as sparse
+        spec_pos = dict([(i, n) for n, i in enumerate(self.species)])
+        rows, cols, vals = [], [], []
+        for n_fam, fam in enumerate(fams.keys()):
+            specs = fams[fam]
+            if not isinstance(specs, dict):
+                specs = dict([(i, 1.) for i in specs])
+            for spec, weight in specs.items():
+                if spec not in spec_pos:
+                    logging.info('{} not in mechanism ({})'.format(spec, fam))
+                    continue
+                rows += [n_fam]
+                cols += [spec_pos[spec]]
+                vals += [weight]
+        shape = (len(fams), len(self.species))
+        return sparse.coo_matrix((vals, (rows, cols)), shape=shape).tocsr()
+
+    def calc_net_tendency(self, rates, fams=None, species=None):
+        """
+        Calculate the net production (or loss if negative) from reaction rates
+
+        Parameters
+        -------
+        rates (array): reaction rates with reactions as the first dimension
+            (in the order of self.rxns), or a xr.DataArray with a "rxn"
+            dimension (reactions not included are assumed to be zero)
+        fams (dict): families to return the net production for, rather than
+            species (see get_fam_matrix)
+        species (list): species to return (default = all)
+
+        Returns
+        -------
+        (array) with species (or families) as the first dimension, or a
+            xr.DataArray with a "species" (or "fam") dimension
+
+        Notes
+        -----
+         - The units are those of the rates (e.g. molec/cm3/s)
+        """
+        matrix = self.matrix
+        names = self.species
+        dim = 'species'
+        if not isinstance(species, type(None)):
+            matrix = matrix[[self.species.index(i) for i in species]]
+            names = list(species)
+        if not isinstance(fams, type(None)):
+            matrix = self.get_fam_matrix(fams).dot(matrix)
+            names = list(fams.keys())
+            dim = 'fam'
+        da = None
+        if isinstance(rates, xr.DataArray):
+            da = rates
+            rates = da.reindex(rxn=self.rxns, fill_value=0.)
+            rates = rates.transpose(*(('rxn',)+tuple(i for i in da.dims
+                                                     if i != 'rxn'))).values
+        rates = np.asarray(rates)
+        shape = rates.shape[1:]
+        tend = matrix.dot(rates.reshape(rates.shape[0], -1))
+        tend = np.asarray(tend).reshape((matrix.shape[0],)+shape)
+        if not isinstance(da, type(None)):
+            other_dims = [i for i in da.dims if i != 'rxn']
+            coords = dict([(i, da[i]) for i in other_dims if i in da.coords])
+            coords[dim] = names
+            tend = xr.DataArray(tend, dims=[dim]+other_dims, coords=coords)
+        return tend
+
+
+def get_KPP_stoich_matrix(folder=None, filename=None, RR_dict=None,
+                          rxn_index=None):
+    """
+    Get a sparse stoichiometry matrix of a KPP mechanism
+
+    Parameters
+    -------
+    folder (str): folder containing the KPP *.eqn file
+    filename (str): name of the KPP *.eqn file
+    RR_dict (dict): dictionary of compiled KPP mechanism (from
+        get_dict_of_KPP_mech), used instead of the *.eqn file if provided
+    rxn_index (KPP_species_index): species index of a mechanism
+
+    Returns
+    -------
+    (KPP_stoich_matrix)
+
+    Notes
+    -----
+     - For a *.eqn file the reactions are numbered as in KPP (from 1, see
+     get_KPP_eqn_file_reaction_table) and for a compiled mechanism by their
+     number (or RR dummy tag) in the monitor file
+    """
+    if isinstance(rxn_index, type(None)):
+        if isinstance(RR_dict, type(None)):
+            df = get_KPP_eqn_file_reaction_table(folder=folder,
+                                                 filename=filename)
+            RR_dict = dict(zip(df.index, df['rxn_str'].values))
+        rxn_index = get_KPP_species_index(RR_dict=RR_dict)
+    return KPP_stoich_matrix(rxn_index)
+
+
+def get_rxn_rates4tags(dsPL, tags2_rxn_num, prefix='Prod_'):
+    """
+    Get the rates of tagged reactions from prod/loss output (e.g. Prod_T001)
+
+    Parameters
+    -------
+    dsPL (dataset): prod/loss output (e.g. from get_ProdLoss_ds)
+    tags2_rxn_num (dict): dictionary of tags (e.g. 'PT001') to reaction numbers
+    prefix (str): prefix of the tagged variables in the output
+
+    Returns
+    -------
+    (xr.DataArray) with a "rxn" dimension (e.g. for calc_net_tendency)
+
+    Notes
+    -----
+     - A reaction can have more than one tag (e.g. if tagged for more than one
+     search string by add_tags4strs2mech), these all give its rate, so only
+     the first tag is used for each reaction
+    """
+    tags = []
+    rxns = []
+    for tag in tags2_rxn_num.keys():
+        if tags2_rxn_num[tag] not in rxns:
+            tags += [tag]
+            rxns += [tags2_rxn_num[tag]]
+    vars2use = [i.replace('PT', '{}T'.format(prefix)) for i in tags]
+    da = dsPL[vars2use].to_array(dim='rxn')
+    return da.assign_coords(rxn=rxns)
 
 
 def prt_families4rxns_to_input_to_PL(fam='LOx', rxns=None, wd=None,
@@ -1035,21 +1598,15 @@ def get_KKP_mech_from_eqn_file_as_dicts(folder=None, Mechanism='Tropchem',
     # Get dictionaries of all reactions
     if verbose:
         print('get_KKP_mech_from_eqn_file_as_dicts', folder, filename)
-    rxn_dicts = get_dicts_of_KPP_eqn_file_reactions(folder=folder,
-                                                    filename=filename,
-                                                    debug=debug,)
-    # Process rxns to be in dictionaries of DataFrames
+    df = get_KPP_eqn_file_reaction_table(folder=folder, filename=filename,
+                                         debug=debug)
+    # Split rxns into dictionaries of DataFrames
     # (with extra diagnostic columns, inc. reactants, products, metadata,...)
-    rxn_dicts = process_KPP_rxn_dicts2dfs(rxn_dicts=rxn_dicts, debug=debug)
-    # Update the numbering of DataFrame indexes...
-    Gas_dict = rxn_dicts['Gas-phase']
-    Het_dict = rxn_dicts['Heterogeneous']
-    Hv_dict = rxn_dicts['Photolysis']
-    # Update index start points
-    Het_dict.index = Het_dict.index + Gas_dict.shape[0]
-    Hv_dict.index = Hv_dict.index + Gas_dict.shape[0] + Het_dict.shape[0]
-    rxn_dicts['Heterogeneous'] = Het_dict
-    rxn_dicts['Photolysis'] = Hv_dict
+    # NOTE: the index is already numbered through all the reaction types
+    columns = ['rxn_str', 'react', 'prod', 'eqn', 'metadata']
+    rxn_dicts = {}
+    for key_ in ('Gas-phase', 'Heterogeneous', 'Photolysis',):
+        rxn_dicts[key_] = df.loc[df['Type'] == key_, columns].copy()
     # Return  dictionary of dictionaries
     return rxn_dicts
 
@@ -1065,19 +1622,11 @@ def get_KKP_mech_from_eqn_file_as_df(folder=None, Mechanism='Tropchem',
         filename = '{}.eqn'.format(Mechanism)
     if verbose:
         print('get_KKP_mech_from_eqn_file_as_df', folder, filename)
-    # Get dictionary of dictionaries
-    dicts = get_KKP_mech_from_eqn_file_as_dicts(folder=folder,
-                                                Mechanism=Mechanism,
-                                                filename=filename,
-                                                debug=debug)
-    # Add a flag for reaction type
-    for key in dicts.keys():
-        df = dicts[key]
-        df['Type'] = key
-        dicts[key] = df
-    # Combine into a single data frame
-    df = pd.concat([dicts[i] for i in dicts.keys()], join='outer')
-    return df
+    # Get the (cached) table of reactions with a flag for reaction type
+    df = get_KPP_eqn_file_reaction_table(folder=folder, filename=filename,
+                                         debug=debug)
+    columns = ['rxn_str', 'react', 'prod', 'eqn', 'metadata', 'Type']
+    return df[columns].copy()
 
 
 def get_dictionary_of_tagged_reactions(filename='globchem.eqn',
@@ -1304,7 +1853,8 @@ def get_Ox_fam_based_on_reactants(filename='gckpp_Monitor.F90',
 
 def get_tags_in_rxn_numbers(rxn_nums=[], RR_dict=None, Mechanism='Halogens',
                             filename='gckpp_Monitor.F90', wd=None,
-                            GC_version='v12.9.1', debug=False):
+                            GC_version='v12.9.1', tag_prefix='T',
+                            rxn_index=None, debug=False):
     """
     Get tags in given list of reactions
 
@@ -1313,41 +1863,41 @@ def get_tags_in_rxn_numbers(rxn_nums=[], RR_dict=None, Mechanism='Halogens',
     rxns (list): lisst of reactions to use for
     Mechanism (str): name of mechanism (e.g. dir in KPP folder)
     filename (str): name of KPP monitor file
+    tag_prefix (str): the prefix of tags in the mechanism
+    rxn_index (KPP_species_index): species index of the mechanism
 
     Returns
     -------
     (dict)
+
+    Notes
+    -----
+     - tags are products named as the prefix followed by a number (e.g. T001)
     """
     # Get dictionary of reactions in Mechanism
     if isinstance(RR_dict, type(None)):
         RR_dict = get_dict_of_KPP_mech(Mechanism=Mechanism, filename=filename,
                                        GC_version=GC_version, wd=wd)
-    # Loop dictionary of reactions and save those that contain tag
-    tagged_rxns = []
-    tags_for_rxns = []
-    # Create a sub dictionary for reaction numbers provided
-    sub_dict = dict([(i, RR_dict[i]) for i in rxn_nums])
-    print(sub_dict)
-    for key_ in list(sub_dict.keys()):
-        # Get reaction string
-        rxn_str = RR_dict[key_]
-        # Collection reactions with tag
-        tag_strs = [' + T', '> T']
-        # Replace this with reg ex?
+    if isinstance(rxn_index, type(None)):
+        rxn_index = get_KPP_species_index(RR_dict=RR_dict)
+    # Get the reactions for each tag in the mechanism
+    tag_rg = re.compile(r'^{}\d+$'.format(re.escape(tag_prefix)))
+    tags4rxn = {}
+    for tag in [i for i in rxn_index.as_product if tag_rg.match(i)]:
+        for rxn in rxn_index.as_product[tag]:
+            tags4rxn.setdefault(rxn, []).append(tag)
+    # Save the reactions (of those provided) that contain tag
+    tagged_rxns = {}
+    for key_ in rxn_nums:
+        tag_ = tags4rxn.get(key_, [])
         if debug:
-            print((key_, rxn_str, any([i in rxn_str for i in tag_strs])))
-        if any([i in rxn_str for i in tag_strs]):
-            # Split reaction str by '+' (excluding reactants part)
-            product_str_list = rxn_str[18:].split('+')
-            # Select tag(s)
-            tag_ = [i for i in product_str_list if (' T' in i)]
-            if len(tag_) > 1:
-                print(('WARNING - more than one tag for reaction? :', tag_))
-                sys.exit()
-            else:
-                tags_for_rxns += [tag_[0].strip()]
-                tagged_rxns += [key_]
-    return dict(list(zip(tagged_rxns, tags_for_rxns)))
+            print((key_, RR_dict[key_], tag_))
+        if len(tag_) > 1:
+            print(('WARNING - more than one tag for reaction? :', tag_))
+            sys.exit()
+        elif len(tag_) == 1:
+            tagged_rxns[key_] = tag_[0]
+    return tagged_rxns
 
 
 def get_oxidative_release4specs(filename='gckpp_Monitor.F90', wd=None,
@@ -1388,9 +1938,16 @@ def get_oxidative_release4specs(filename='gckpp_Monitor.F90', wd=None,
 def get_Ox_fam_dicts(fam='LOx', ref_spec='O3', GC_version='v12.9.1',
                      CODE_wd=None, wd=None, Mechanism='Halogens',
                      tag_prefix='PT', weight_by_molecs=False,
-                     StateMet=None, rm_strat=False,
+                     StateMet=None, rm_strat=False, extract_ars=True,
                      verbose=True, debug=False):
     """
+    Get a dictionary of variables/data for the Ox budget of a tagged family
+
+    Notes
+    -----
+     - set extract_ars=False to just get the tags and their families (e.g.
+     for calc_fam_loss_by_route_and_region), without extracting the model
+     output
     """
     # Get reaction dictionary
     RR_dict = get_dict_of_KPP_mech(wd=CODE_wd, GC_version=GC_version,
@@ -1425,11 +1982,13 @@ def get_Ox_fam_dicts(fam='LOx', ref_spec='O3', GC_version='v12.9.1',
         'tags_dict': tags_dict,
     }
     # - Extract data for Ox loss for family from model
-    ars = get_PL_ars4mech_NetCDF(Ox_fam_dict=Ox_fam_dict,
-                                 rm_strat=rm_strat, wd=wd,
-                                 fam=fam, ref_spec=ref_spec,
-                                 StateMet=StateMet,
-                                 weight_by_molecs=weight_by_molecs)
+    ars = None
+    if extract_ars:
+        ars = get_PL_ars4mech_NetCDF(Ox_fam_dict=Ox_fam_dict,
+                                     rm_strat=rm_strat, wd=wd,
+                                     fam=fam, ref_spec=ref_spec,
+                                     StateMet=StateMet,
+                                     weight_by_molecs=weight_by_molecs)
 
     # Convert this to a dictionary and return
     # Inc. lists of sorted family names and ars in returned dictionary
@@ -1635,11 +2194,89 @@ def calc_fam_loss_by_route(wd=None, fam='LOx', ref_spec='O3',
         return dfFam
 
 
+def calc_fam_loss_by_route_and_region(wd=None, Ox_fam_dict=None, masks=None,
+                                      mtitles=None, StateMet=None,
+                                      mask_dims=('lon', 'lat', 'lev'),
+                                      rm_strat=True, use_time_in_trop=True,
+                                      dates2use=None, rtn_by_fam=False,
+                                      dsPL=None, verbose=True, debug=False):
+    """
+    Build a table of Ox loss by route (tag) for many regions in one pass
+
+    Parameters
+    -------
+    wd (str): working directory ("wd") of model output
+    Ox_fam_dict (dict), dictionary of Ox loss variables/data (from
+        get_Ox_fam_dicts, the 'ars' are not needed - see extract_ars)
+    masks (list): masks of regions/layers (1 or True in the region), e.g. from
+        get_analysis_masks (with use_multiply_method=True). Alternatively, an
+        integer array of region numbers (index of mtitles) for each box.
+    mtitles (list): names of the regions/layers
+    mask_dims (tuple): dimensions of the masks (if these are not xr.DataArrays)
+    StateMet (dataset): Dataset object containing time in troposphere
+    rm_strat (bool): (fractionally) replace values in statosphere with zeros
+    use_time_in_trop (bool): remove the stratosphere using the time in the
+        troposphere (or a mask of the tropopause level if False)
+    dates2use (list): dates of model output to use
+    rtn_by_fam (bool): return the table summed by family, rather than tag
+    dsPL (dataset): prod/loss output (default = read from wd)
+
+    Returns
+    -------
+    (pd.DataFrame) of fluxes (Tg O3) with tags (or families) as the index and
+        regions as columns
+
+    Notes
+    -----
+     - The prod/loss output is only read once. The tags are summed over time
+     (see get_PL_da4mech_NetCDF), then reduced by all the regions together
+     using the masks as labels (see get_grouped_sums_and_weights)
+     - masks with fewer levels than the model output (e.g. trop_limit=True)
+     are assumed to be zero in the levels above, and levels beyond those of
+     the model output are ignored
+    """
+    tags = Ox_fam_dict['tags']
+    da = get_PL_da4mech_NetCDF(Ox_fam_dict=Ox_fam_dict, rm_strat=rm_strat,
+                               use_time_in_trop=use_time_in_trop,
+                               dates2use=dates2use, StateMet=StateMet,
+                               wd=wd, dsPL=dsPL)
+    # Sum the fluxes over time (this is the only pass over the model output)
+    da = da.sum(dim='time')
+    spatial_dims = [i for i in da.dims if i != 'tag']
+    # Setup the masks as labels with the same dimensions as the fluxes
+    if isinstance(masks, np.ndarray) and np.issubdtype(masks.dtype,
+                                                       np.integer):
+        masks = [masks == n for n in range(len(mtitles))]
+    members = []
+    for mask in masks:
+        if not isinstance(mask, xr.DataArray):
+            mask = xr.DataArray(np.ma.filled(mask, 0), dims=mask_dims)
+        mask = mask.astype(np.float64).transpose(*spatial_dims)
+        # Use the model output's levels (assuming zero above the provided
+        # levels, e.g. for trop_limit=True)
+        mask = mask.values[tuple(slice(0, da.sizes[i]) for i in spatial_dims)]
+        pad = [(0, da.sizes[i]-mask.shape[n])
+               for n, i in enumerate(spatial_dims)]
+        members += [np.pad(mask, pad, mode='constant')]
+    members = np.stack(members)
+    if debug:
+        print(da.shape, members.shape)
+    axis = tuple(range(1, len(da.dims)))
+    sums, _ = get_grouped_sums_and_weights(da.values, members, axis=axis)
+    df = pd.DataFrame(sums/1E12, index=tags, columns=mtitles)
+    if rtn_by_fam:
+        fam_dict = Ox_fam_dict['fam_dict']
+        df = df.groupby([fam_dict[i] for i in tags]).sum()
+    if verbose:
+        print(df.sum())
+    return df
+
+
 def add_tags4strs2mech(rxn_dicts, tagged_rxns={},
                        search_strs=None, counter=0,
                        search_reactants=False,
                        search_products=False,
-                       tag_prefix='T',
+                       tag_prefix='T', rxn_index=None, use_index=True,
                        debug=False):
     """
     Tag reactions in provided string found in KPP reaction string
@@ -1653,10 +2290,21 @@ def add_tags4strs2mech(rxn_dicts, tagged_rxns={},
     rxn_dicts (dict): dictionary of KPP reaction mechanisms
     counter (int): number of reactions already tagged
     tag_prefix (str): the prefix to use for tags added to mechansism
+    rxn_index (KPP_species_index): species index of rxn_dicts (from
+        get_KPP_species_index) - this is made if not provided
+    use_index (bool): find reactions with the species index, rather than by
+        searching every reaction string
 
     Returns
     -------
     (dict, dict)
+
+    Notes
+    -----
+     - The species index is used to find the few reactions which could
+     contain each search string, so only these reaction strings are searched.
+     Search strings that are not part of a single species name (e.g.
+     'O3 + NO') are still searched for in every reaction string.
     """
     if isinstance(search_strs, type(None)):
         search_strs = 'BrSAL', 'CH3Br', 'CH3Cl', 'CH2Cl2', 'CHCl3', '0.150IBr',
@@ -1670,49 +2318,61 @@ def add_tags4strs2mech(rxn_dicts, tagged_rxns={},
     rg = re.compile(re1+re2+re3+re4, re.IGNORECASE | re.DOTALL)
     # ( Or just all reactions that contain a species of interest )
     current_tag = '{}{:0>3}'.format(tag_prefix, counter)
+    # Get the index of species to reactions
+    if use_index and isinstance(rxn_index, type(None)):
+        rxn_index = get_KPP_species_index(rxn_dicts=rxn_dicts)
+    as_reactant = not search_products or search_reactants
+    as_product = not search_reactants
     for search_str in search_strs:
-        for key_ in list(rxn_dicts.keys()):
+        # Get the (key, index) of reactions which could include the string
+        rxns = None
+        if use_index:
+            rxns = rxn_index.rxns4search_str(search_str,
+                                             as_reactant=as_reactant,
+                                             as_product=as_product)
+        if isinstance(rxns, type(None)):
+            rxns = [(i, ii) for i in rxn_dicts.keys()
+                    for ii in rxn_dicts[i].index]
+        for key_, idx in rxns:
             df = rxn_dicts[key_]
-            for idx in df.index:
-                # retrive the reaction string and check if the family is in it
-                rxn_str = df.loc[idx]['rxn_str']
-                reactant_str = rxn_str.split('= ')[0]
-                product_str = rxn_str.split('= ')[-1]
-                if search_reactants:
-                    str2search4search_str = reactant_str
-                elif search_products:
-                    str2search4search_str = product_str
-                else:
-                    str2search4search_str = rxn_str
-                if search_str in str2search4search_str:
-                    # Update the counter (NOTE: counter starts from 1)
-                    counter += 1
-                    if debug:
-                        print(counter, current_tag)
-                    # Check if rxn already tagged, if so just use that tag.
-                    m = rg.search(rxn_str)
-                    if m:
-                        # Extract tag from regex matched groups
-                        existing_tag = m.group(3)+m.group(4)
-                        # For # rxn tagged save the rxn., its tag and its family
-                        tmp_dict = {
-                            'tag': existing_tag, 'search_str': search_str,
-                            'rxn_str': rxn_str
-                        }
-                        tagged_rxns[counter] = tmp_dict
-                    else:
-                        # Get a new tag and add to the reaction string
-                        current_tag = get_next_KPP_PL_tag(current_tag)
-                        rxn_str += ' + ' + current_tag
-                        df.loc[idx, 'rxn_str'] = rxn_str
-                        # Save the reaction, its tag and its family
-                        tmp_dict = {
-                            'tag': current_tag, 'search_str': search_str,
-                            'rxn_str': rxn_str
-                        }
-                        tagged_rxns[counter] = tmp_dict
-            # Now update the DataFrame in the rxn_dicts dictionary
-            rxn_dicts[key_] = df
+            # retrive the reaction string and check if the family is in it
+            rxn_str = df.loc[idx, 'rxn_str']
+            reactant_str = rxn_str.split('= ')[0]
+            product_str = rxn_str.split('= ')[-1]
+            if search_reactants:
+                str2search4search_str = reactant_str
+            elif search_products:
+                str2search4search_str = product_str
+            else:
+                str2search4search_str = rxn_str
+            if search_str not in str2search4search_str:
+                continue
+            # Update the counter (NOTE: counter starts from 1)
+            counter += 1
+            if debug:
+                print(counter, current_tag)
+            # Check if rxn already tagged, if so just use that tag.
+            m = rg.search(rxn_str)
+            if m:
+                # Extract tag from regex matched groups
+                existing_tag = m.group(3)+m.group(4)
+                # For # rxn tagged save the rxn., its tag and its family
+                tmp_dict = {
+                    'tag': existing_tag, 'search_str': search_str,
+                    'rxn_str': rxn_str
+                }
+                tagged_rxns[counter] = tmp_dict
+            else:
+                # Get a new tag and add to the reaction string
+                current_tag = get_next_KPP_PL_tag(current_tag)
+                rxn_str += ' + ' + current_tag
+                df.loc[idx, 'rxn_str'] = rxn_str
+                # Save the reaction, its tag and its family
+                tmp_dict = {
+                    'tag': current_tag, 'search_str': search_str,
+                    'rxn_str': rxn_str
+                }
+                tagged_rxns[counter] = tmp_dict
     return rxn_dicts, tagged_rxns
 
 
@@ -1727,8 +2387,10 @@ def GCARR(A0, B0, C0, TEMP=298.0):
       REAL A0,B0,C0
       GCARR =  DBLE(A0) * EXP(DBLE(C0)/TEMP) * (300._dp/TEMP)**DBLE(B0)
   END FUNCTION GCARR
+     - All arguments can be numbers or arrays (e.g. a 3D field of TEMP)
     """
-    return float(A0) * np.exp(float(C0)/TEMP) * (300.0/TEMP)**float(B0)
+    A0, B0, C0 = [np.asarray(i, dtype=np.float64) for i in (A0, B0, C0)]
+    return A0 * np.exp(C0/TEMP) * (300.0/TEMP)**B0
 
 
 def GC_OHCO(A0, B0, C0, NUMDEN=1E4, TEMP=298.0, PRESS=1000.0):
@@ -1765,8 +2427,9 @@ def GC_OHCO(A0, B0, C0, NUMDEN=1E4, TEMP=298.0, PRESS=1000.0):
 
   END FUNCTION GC_OHCO
 
+     - All arguments can be numbers or arrays (e.g. a 3D field of TEMP)
     """
-    R0 = float(A0) * np.exp(float(C0)/TEMP) * (300./TEMP)**float(B0)
+    R0 = GCARR(A0, B0, C0, TEMP=TEMP)
     R0 = R0 * (1.E+0 + 0.6E+0 * 9.871E7 * PRESS)
 
     # new OH+CO rate from JPL2006.
@@ -1824,28 +2487,42 @@ def GCJPLPR(A0=0.0, B0=0.0, C0=0.0, A1=0.0, B1=0.0, C1=0.0, FV=0.0, FCT1=0.0,
          FEXP           = 1.e+0_dp / (1.e+0_dp + BLOG * BLOG)
          GCJPLPR        = RLOW*FV**FEXP/(1e+0_dp+XYRAT)
     ENDIF
+
+     - All arguments can be numbers or arrays (e.g. a 3D field of TEMP)
     """
-    RLOW  = GCARR( A0, B0, C0, TEMP=TEMP )*NUMDEN
-    RHIGH = GCARR( A1, B1, C1, TEMP=TEMP )
-
-    if (FCT2 != 0.0):
-         FCT            = np.exp(-TEMP / FCT1) + np.exp(-FCT2 / TEMP)
-         XYRAT          = RLOW / RHIGH
-         BLOG           = np.log10(XYRAT)
-         FEXP           = 1.0 / (1.0 + BLOG * BLOG)
-         k              = RLOW * FCT ** FEXP / (1.0 + XYRAT)
-    elif (FCT1 != 0.0):
-         FCT            = np.exp( -TEMP / FCT1 )
-         XYRAT          = RLOW / RHIGH
-         BLOG           = np.log10(XYRAT)
-         FEXP           = 1.0 / (1.0 + BLOG * BLOG)
-         k              = RLOW * FCT ** FEXP / (1.0 + XYRAT)
-    else:
-         XYRAT          = RLOW / RHIGH
-         BLOG           = np.log10( XYRAT )
-         FEXP           = 1.0 / (1.0 + BLOG * BLOG)
-         k              = RLOW * FV ** FEXP / (1.0 + XYRAT)
-    return k
+    RLOW = GCARR(A0, B0, C0, TEMP=TEMP)*NUMDEN
+    RHIGH = GCARR(A1, B1, C1, TEMP=TEMP)
+    FCT = get_KPP_falloff_factor(FV, FCT1, FCT2, TEMP=TEMP)
+    XYRAT = RLOW / RHIGH
+    BLOG = np.log10(XYRAT)
+    FEXP = 1.0 / (1.0 + BLOG * BLOG)
+    return RLOW * FCT ** FEXP / (1.0 + XYRAT)
+
+
+def get_KPP_falloff_factor(FV, FCT1, FCT2, TEMP=298.0):
+    """
+    Get the broadening factor of the KPP falloff functions (GCJPLPR, GEOS_P)
+
+    Notes
+    -------
+     - All arguments can be numbers or arrays. This is the equivalent of:
+    IF     (FCT2.NE.0.) THEN
+         FCT            = EXP(-TEMP / FCT1) + EXP(-FCT2 / TEMP)
+    ELSEIF (FCT1.NE.0.) THEN
+         FCT            = EXP(-TEMP / FCT1)
+    ELSE
+         FCT            = FV
+    ENDIF
+    """
+    FV, FCT1, FCT2 = [np.asarray(i, dtype=np.float64)
+                      for i in (FV, FCT1, FCT2)]
+    # Avoid dividing by zero for the cases where FCT1 is not used
+    FCT1_ = np.where(FCT1 != 0.0, FCT1, 1.0)
+    with np.errstate(over='ignore'):
+        FCT1_term = np.where(FCT1 != 0.0, np.exp(-TEMP / FCT1_), 0.0)
+        FCT = np.where(FCT2 != 0.0, FCT1_term + np.exp(-FCT2 / TEMP),
+                       np.where(FCT1 != 0.0, FCT1_term, FV))
+    return FCT
 
 
 def GEOS_P(A0, B0, C0, A1, B1, C1, FCV, FCT1, FCT2,
@@ -1868,22 +2545,146 @@ def GEOS_P(A0, B0, C0, A1, B1, C1, FCV, FCT1, FCT2,
     return (K0M / (1.0 + K1))*   \
            (CF)**(1.0 / (1.0 + (log10(K1))**2))
 
+     - All arguments can be numbers or arrays, with Tstd the temperature
     """
     # REAL A0, B0, C0, A1, B1, C1 ,CF
     # REAL FCV, FCT1, FCT2
     # REAL(kind=dp) K0M, K1
-    INVTEMP = 1./Tstd
-    if (FCT2 != 0.000000e+00):
-        CF = exp(-Tstd / FCT1) + exp(-FCT2 * INVTEMP)
-    elif (FCT1 != 0.000000e+00):
-        CF = exp(-Tstd / FCT1)
-    else:
-        CF = FCV
-        #
-    K0M = GCARR(A0, B0, C0) * NUMDEN
+    CF = get_KPP_falloff_factor(FCV, FCT1, FCT2, TEMP=Tstd)
+    #
+    K0M = GCARR(A0, B0, C0, TEMP=Tstd) * NUMDEN
     # calculate K1
-    K1 = GCARR(A1, B1, C1)
+    K1 = GCARR(A1, B1, C1, TEMP=Tstd)
     K1 = K0M / K1
     # Return the rates
     return (K0M / (1.0 + K1)) *   \
            (CF)**(1.0 / (1.0 + (np.log10(K1))**2))
+
+
+# KPP rate functions that can be evaluated offline (with their arguments)
+KPP_rate_funcs = {
+    'GCARR': (GCARR, ('A0', 'B0', 'C0')),
+    'GC_OHCO': (GC_OHCO, ('A0', 'B0', 'C0')),
+    'GCJPLPR': (GCJPLPR, ('A0', 'B0', 'C0', 'A1', 'B1', 'C1', 'FV', 'FCT1',
+                          'FCT2')),
+}
+
+
+def split_KPP_rate_expression(eqn):
+    """
+    Split a KPP rate expression into its rate function calls
+
+    Parameters
+    -------
+    eqn (str): rate expression (e.g. 'GCARR(3.00E-12, 0.0E+00, -1500.0)')
+
+    Returns
+    -------
+    (list) of tuples of function names and arguments, or None if the
+        expression is not a sum of calls with numerical arguments
+    """
+    # Split the expression by "+" outside of brackets
+    terms = []
+    depth = 0
+    term = ''
+    for char in eqn.strip():
+        depth += (char == '(') - (char == ')')
+        if (char == '+') and (depth == 0):
+            terms += [term]
+            term = ''
+        else:
+            term += char
+    terms += [term]
+    calls = []
+    for term in terms:
+        match = re.match(r'^\s*(\w+)\s*\((.*)\)\s*$', term)
+        if isinstance(match, type(None)):
+            return None
+        try:
+            args = [float(i.replace('_dp', '').replace('d', 'e'))
+                    for i in match.group(2).split(',')]
+        except ValueError:
+            return None
+        calls += [(match.group(1), args)]
+    return calls
+
+
+class KPP_rate_table:
+    """
+    Class for holding the thermal rate constants of a KPP mechanism
+
+    Notes
+    -----
+     - The rate expressions (e.g. from get_KPP_eqn_file_reaction_table) are
+     parsed once and the parameters are stored as arrays by rate function.
+     calc_rates then evaluates all the reactions for a rate function in one
+     (vectorised) call over fields of temperature, number density, pressure
+     - Reactions with rate functions not in KPP_rate_funcs (e.g. HET, PHOTOL)
+     are listed in "unsupported" and their rates are returned as NaN
+    """
+
+    def __repr__(self):
+        rtn_str = "This is a class to hold KPP rate constants for {} reactions"
+        return rtn_str.format(len(self.rxn_nums))
+
+    def __init__(self, df=None, folder=None, filename=None):
+        if isinstance(df, type(None)):
+            df = get_KPP_eqn_file_reaction_table(folder=folder,
+                                                 filename=filename)
+        self.rxn_nums = list(df.index)
+        self.rxn_strs = list(df['rxn_str'].values)
+        self.unsupported = []
+        # Collect the parameters of the calls to each rate function
+        params = {}
+        for n_rxn, (rxn_num, eqn) in enumerate(zip(df.index, df['eqn'])):
+            calls = split_KPP_rate_expression(eqn)
+            funcs = [i[0] for i in calls] if calls else []
+            if (not calls) or any([i not in KPP_rate_funcs for i in funcs]):
+                self.unsupported += [rxn_num]
+                continue
+            for func, args in calls:
+                args = args + [0.0]*(len(KPP_rate_funcs[func][1])-len(args))
+                params.setdefault(func, ([], []))
+                params[func][0].append(n_rxn)
+                params[func][1].append(args)
+        self.params = dict([(k, (np.array(v[0]), np.array(v[1])))
+                            for k, v in params.items()])
+
+    def calc_rates(self, TEMP=298.0, NUMDEN=2.46E19, PRESS=1013.25):
+        """
+        Calculate the rate constants of all the reactions
+
+        Parameters
+        -------
+        TEMP (array): temperature (K)
+        NUMDEN (array): number density of air (molec cm-3)
+        PRESS (array): pressure (hPa)
+
+        Returns
+        -------
+        (array) with reactions as the first dimension, or (xr.DataArray)
+            with a "rxn" dimension if TEMP is a xr.DataArray
+        """
+        coords = None
+        if isinstance(TEMP, xr.DataArray):
+            coords = TEMP
+        TEMP, NUMDEN, PRESS = [np.asarray(i, dtype=np.float64)
+                               for i in (TEMP, NUMDEN, PRESS)]
+        shape = np.broadcast(TEMP, NUMDEN, PRESS).shape
+        rates = np.full((len(self.rxn_nums),)+shape, np.nan)
+        supported = [(i not in self.unsupported) for i in self.rxn_nums]
+        rates[np.array(supported, dtype=bool)] = 0.0
+        for func, (inds, args) in self.params.items():
+            # Add dimensions for the fields to the parameters
+            args = args.reshape(args.shape+(1,)*len(shape))
+            kwargs = dict(zip(KPP_rate_funcs[func][1],
+                              np.moveaxis(args, 1, 0)))
+            if func != 'GCARR':
+                kwargs.update({'NUMDEN': NUMDEN, 'PRESS': PRESS})
+            vals = KPP_rate_funcs[func][0](TEMP=TEMP, **kwargs)
+            np.add.at(rates, inds, np.broadcast_to(vals, (len(inds),)+shape))
+        if not isinstance(coords, type(None)):
+            rates = xr.DataArray(rates, dims=('rxn',)+coords.dims,
+                                 coords=dict(coords.coords))
+            rates = rates.assign_coords(rxn=self.rxn_nums)
+        return rates
@@ -27,7 +27,8 @@ def pytest_addoption(parser):
                      help="remake ctm.nc tests")
 
 
-def pytest_configure():
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: only run with --slow option")
 
     # Make sure we are in the correct folder for the test.
     dirname = os.path.split(os.getcwd())[1]
@@ -39,3 +40,13 @@ def pytest_configure():
 #    from AC_tools import get_data_files
 
     return
+
+
+def pytest_collection_modifyitems(config, items):
+    # Skip tests marked as slow unless the "--slow" option is given
+    if config.getoption("--slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="need --slow option to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
@@ -1,4 +1,5 @@
 from ..bpch2netCDF import *
+from ..AC_time import *
 import logging
 import pytest
 logging.basicConfig(filename='test.log', level=logging.DEBUG)
@@ -13,4 +14,31 @@ def test_get_folder():
     return
 
 
+def test_decode_CF_times():
+    starttime = datetime.datetime(1985, 1, 1)
+    hrs = np.arange(0, 100, 0.25) + 140256.
+    units = 'hours since 1985-01-01 00:00:00'
+    dates = decode_CF_times(hrs, units, rtn_DatetimeIndex=False)
+    assert dates == [add_hrs(starttime, i) for i in hrs]
+    dates = decode_CF_times(hrs, units)
+    assert isinstance(dates, pd.DatetimeIndex)
+    assert dates[0] == datetime.datetime(2001, 1, 1)
+    # Non-standard calendars
+    units = 'days since 2001-01-01 00:00:00'
+    dates = decode_CF_times([0, 58, 59], units, calendar='noleap')
+    assert isinstance(dates, pd.DatetimeIndex)
+    assert dates[-1] == datetime.datetime(2001, 3, 1)
+    dates = decode_CF_times([0, 58, 59], units, calendar='360_day')
+    assert not isinstance(dates, pd.DatetimeIndex)
+    assert [(i.month, i.day) for i in dates] == [(1, 1), (2, 29), (2, 30)]
+    dates = decode_CF_times([0, 59], units, calendar='360_day',
+                            rtn_DatetimeIndex=False)
+    assert dates[-1].day == 30
+    # Units that are not setup
+    for units in ('months since 2001-01-01', 'hours'):
+        with pytest.raises(ValueError):
+            decode_CF_times([0, 1], units)
+    return
+
+
 logging.info('GEOSChem test complete')
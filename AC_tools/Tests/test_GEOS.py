@@ -0,0 +1,171 @@
+from ..GEOS import *
+import logging
+import pytest
+logging.basicConfig(filename='test.log', level=logging.DEBUG)
+logging.info('Starting GEOS test.')
+
+
+def mk_local_GEOSCF_collection(root_url, collection='met_inst_1hr_g1440x721_p23',
+                               mode='assim', name=None, start='2020-01-01'):
+    """
+    Save a small dataset as a local stand-in for a GEOS-CF OPeNDAP collection
+    """
+    time = pd.date_range(start, periods=72, freq='h').values
+    time = time.astype('datetime64[ns]')
+    lat = np.arange(-10, 10.5, 0.25)
+    lon = np.arange(-20, 20.5, 0.25)
+    lev = np.array(get_GEOSCF_vertical_levels(native_levels=False))
+    shape = (len(time), len(lev), len(lat), len(lon))
+    ds = xr.Dataset(
+        {'T': (('time', 'lev', 'lat', 'lon'), np.random.rand(*shape)),
+         'U': (('time', 'lev', 'lat', 'lon'), np.random.rand(*shape))},
+        coords={'time': time, 'lev': lev, 'lat': lat, 'lon': lon},
+    )
+    if isinstance(name, type(None)):
+        name = collection
+    filename = os.path.join(root_url, mode, name)
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    ds.to_netcdf(filename, format='NETCDF4')
+    return filename
+
+
+def test_get_slice4coord():
+    values = np.arange(-10, 10.5, 0.5)
+    s = get_slice4coord(values, -2.2, 3)
+    assert (values[s] == np.arange(-2, 3.5, 0.5)).all()
+    s = get_slice4coord(values[::-1], -2.2, 3)
+    assert (values[::-1][s] == np.arange(3, -2.5, -0.5)).all()
+    assert get_slice4coord(values) == slice(0, len(values))
+    return
+
+
+def test_get_GEOSCF_subset_ds(tmp_path):
+    root_url = str(tmp_path / 'OPeNDAP')
+    filename = mk_local_GEOSCF_collection(root_url)
+    cache_dir = str(tmp_path / 'cache')
+    kwargs = {
+        'collection': 'met_inst_1hr_g1440x721_p23', 'mode': 'assim',
+        'sdate': datetime.datetime(2020, 1, 2, 3),
+        'edate': datetime.datetime(2020, 1, 2, 9),
+        'lat_min': 0.3, 'lat_max': 2.7, 'lon_min': -5.5, 'lon_max': -1.2,
+        'vars2extract': ['U', 'T'], 'cache_dir': cache_dir,
+        'root_url': root_url,
+    }
+    ds = get_GEOSCF_subset_ds(**kwargs)
+    # Subset is extended to whole days and degrees
+    assert ds.time.values[0] == np.datetime64('2020-01-02T00')
+    assert ds.time.values[-1] == np.datetime64('2020-01-03T00')
+    assert (ds.lat.values[[0, -1]] == [0, 3]).all()
+    assert (ds.lon.values[[0, -1]] == [-6, -1]).all()
+    assert sorted(ds.data_vars) == ['T', 'U']
+    with xr.open_dataset(filename) as dsL:
+        dsL = dsL.sel(time=ds.time, lat=ds.lat, lon=ds.lon)
+        assert np.allclose(dsL['T'].values, ds['T'].values)
+    ds.close()
+    assert len(os.listdir(cache_dir)) == 1
+    assert not [i for i in os.listdir(cache_dir) if i.endswith('.tmp')]
+    # Subsets that end after the last time in the collection are not saved
+    ds = get_GEOSCF_subset_ds(**dict(kwargs, edate=datetime.datetime(
+        2020, 1, 4, 3)))
+    assert ds.time.values[-1] == np.datetime64('2020-01-03T23')
+    assert len(os.listdir(cache_dir)) == 1
+    # Subsets from another root_url are saved separately
+    root_url2 = str(tmp_path / 'OPeNDAP2')
+    mk_local_GEOSCF_collection(root_url2)
+    ds = get_GEOSCF_subset_ds(**dict(kwargs, root_url=root_url2))
+    ds.close()
+    assert len(os.listdir(cache_dir)) == 2
+    # A repeated (nearby) extraction uses the local copy
+    os.remove(filename)
+    kwargs['lat_min'] = 0.1
+    ds = get_GEOSCF_subset_ds(**kwargs)
+    assert len(ds.time) == 25
+    ds.close()
+    return
+
+
+def test_get_GEOSCF_subset_ds_fcast(tmp_path):
+    root_url = str(tmp_path / 'OPeNDAP')
+    collection = 'met_inst_1hr_g1440x721_p23'
+    cache_dir = str(tmp_path / 'cache')
+    kwargs = {
+        'collection': collection, 'mode': 'fcast',
+        'edate': datetime.datetime(2020, 1, 2, 9),
+        'lat_min': 0.3, 'lat_max': 2.7, 'lon_min': -5.5, 'lon_max': -1.2,
+        'cache_dir': cache_dir, 'root_url': root_url,
+    }
+    # Subsets of different forecasts are saved separately
+    for day in (1, 2):
+        name = '{}/{}.202001{:0>2}_12z'.format(collection, collection, day)
+        mk_local_GEOSCF_collection(root_url, mode='fcast', name=name,
+                                   start='2020-01-{:0>2} 12:00'.format(day))
+        date = datetime.datetime(2020, 1, day)
+        ds = get_GEOSCF_subset_ds(date=date, **kwargs)
+        assert ds.time.values[0] == np.datetime64('2020-01-{:0>2}T12'.format(
+            day))
+        ds.close()
+        assert len(os.listdir(cache_dir)) == day
+    # The latest forecast is identified by its first time
+    name = '{}.latest'.format(collection)
+    filename = mk_local_GEOSCF_collection(root_url, mode='fcast', name=name,
+                                          start='2020-01-01 12:00')
+    ds = get_GEOSCF_subset_ds(**kwargs)
+    ds.close()
+    assert len(os.listdir(cache_dir)) == 3
+    ds = get_GEOSCF_subset_ds(**kwargs)
+    ds.close()
+    assert len(os.listdir(cache_dir)) == 3
+    os.remove(filename)
+    mk_local_GEOSCF_collection(root_url, mode='fcast', name=name,
+                               start='2020-01-02 00:00')
+    ds = get_GEOSCF_subset_ds(**kwargs)
+    assert ds.time.values[0] == np.datetime64('2020-01-02T00')
+    ds.close()
+    assert len(os.listdir(cache_dir)) == 4
+    return
+
+
+
+def test_extract_GEOSCF_assim4df(tmp_path, monkeypatch):
+    import AC_tools.GEOS as GEOS
+    from xarray.backends.file_manager import FILE_CACHE
+    root_url = str(tmp_path / 'OPeNDAP')
+    mk_local_GEOSCF_collection(root_url)
+    cache_dir = str(tmp_path / 'cache')
+    index = pd.date_range('2020-01-02 03:10', periods=4, freq='47min')
+    df = pd.DataFrame({'lat': [0.3, 0.8, 1.4, 2.6],
+                       'lon': [-5.4, -4.1, -2.3, -1.2],
+                       'hPa': [990., 700., 480., 260.]}, index=index)
+    kwargs = {'df': df, 'vars2extract': ['T'], 'cache_dir': cache_dir,
+              'root_url': root_url}
+    # Keep the subsets used (so these are not closed when garbage collected)
+    dss = []
+    func = GEOS.get_GEOSCF_subset_ds
+
+    def get_GEOSCF_subset_ds(**kwargs):
+        dss.append(func(**kwargs))
+        return dss[-1]
+    monkeypatch.setattr(GEOS, 'get_GEOSCF_subset_ds', get_GEOSCF_subset_ds)
+    for n in range(2):
+        dfN = extract_GEOSCF_assim4df(**kwargs)
+        assert len(os.listdir(cache_dir)) == 1
+        # The local copy of the subset is closed
+        filename = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+        assert not [i for i in FILE_CACHE.keys() if filename in str(i)]
+        assert dss[-1]['T'].variable._in_memory
+        assert len(dfN) == 4
+        assert (dfN['Datetime'].values == index.values).all()
+    with xr.open_dataset(filename) as ds:
+        for n in range(len(df)):
+            expected = ds['T'].sel(time=dfN['model-time'].values[n],
+                                   lev=dfN['model-alt'].values[n],
+                                   lat=dfN['model-lat'].values[n],
+                                   lon=dfN['model-lon'].values[n])
+            assert dfN['T'].values[n] == expected.values
+    # The temporary NetCDF name is no longer used
+    with pytest.warns(DeprecationWarning):
+        extract_GEOSCF_assim4df(TEMP_nc_name='TEMP.nc', **kwargs)
+    return
+
+
+logging.info('GEOS test complete')
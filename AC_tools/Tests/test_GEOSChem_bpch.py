@@ -4,10 +4,8 @@ import pytest
 
 wd = '../../data'
 
-slow = pytest.mark.skipif(
-    not pytest.config.getoption("--slow"),
-    reason="need --slow option to run"
-)
+# Tests marked as slow are skipped unless "--slow" is given (see conftest.py)
+slow = pytest.mark.slow
 
 
 def test_get_surface_area():
@@ -51,6 +49,335 @@ def test_get_LWI_map():
     return
 
 
+def test_get_static_fields4res():
+    static_fields = get_static_fields4res(res='4x5')
+    for key in ('LWI', 'LWI_monthly', 'DXYP'):
+        assert key in static_fields, '{} not in static fields'.format(key)
+    # Check the bundle values match those from the reference files
+    LWI = get_GC_output(wd=get_LANDMAP_dir4res(res='4x5'),
+                        vars=['LANDMAP__LWI'])
+    assert (get_LWI_map(res='4x5') == LWI).all(), 'LWI map is wrong'
+    return
+
+
+def test_mk_static_fields_bundle4res(tmpdir, monkeypatch):
+    import AC_tools.GEOSChem_bpch as GEOSChem_bpch
+    # Make a small reference file and use it for 0.125x0.125
+    land_dir = str(tmpdir)
+    monkeypatch.setattr(GEOSChem_bpch, 'get_LANDMAP_dir4res',
+                        lambda res=None: land_dir)
+    monkeypatch.setattr(GEOSChem_bpch, '_static_fields4res', {})
+    times = pd.date_range('2010-01-01', periods=3, freq='MS')
+    LWI = np.random.randint(0, 3, size=(3, 4, 5)).astype(np.float64)
+    ds = xr.Dataset({'LWI': (('time', 'lat', 'lon'), LWI)},
+                    coords={'time': times})
+    ds.to_netcdf(os.path.join(land_dir, 'ctm.nc'))
+    # The bundle is saved in the cache folder (not with the reference file)
+    cache_dir = os.path.join(land_dir, 'cache')
+    static_fields = get_static_fields4res(res='0.125x0.125',
+                                          cache_dir=cache_dir)
+    assert (static_fields['LWI_monthly'] == LWI).all()
+    assert (static_fields['months'] == [1, 2, 3]).all()
+    assert sorted(os.listdir(land_dir)) == ['cache', 'ctm.nc']
+    folder = os.path.join(cache_dir, '0.125x0.125')
+    info = get_static_fields_bundle_info(folder, land_dir=land_dir)
+    assert info['fields'] == ['LWI', 'LWI_monthly', 'months']
+    assert not [i for i in os.listdir(folder) if i.endswith('.tmp')]
+    # ... and is read from there in a new session
+    monkeypatch.setattr(GEOSChem_bpch, '_static_fields4res', {})
+    static_fields = get_static_fields4res(res='0.125x0.125',
+                                          cache_dir=cache_dir)
+    assert isinstance(static_fields['LWI'], np.memmap)
+    # A bundle made from another reference file is not used
+    import shutil
+    land_dir2 = os.path.join(land_dir, 'LM2')
+    os.makedirs(land_dir2)
+    shutil.copy2(os.path.join(land_dir, 'ctm.nc'), land_dir2)
+    assert get_static_fields_bundle_info(folder, land_dir=land_dir2) is None
+    # The bundle is out of date once the reference file changes
+    mtime = info['source_mtime']
+    os.utime(os.path.join(land_dir, 'ctm.nc'), (mtime+10, mtime+10))
+    assert get_static_fields_bundle_info(folder, land_dir=land_dir) is None
+    return
+
+
+def test_get_gc_datetime(tmpdir):
+    folder = str(tmpdir)
+    for calendar, units in (('360_day', 'days since 2001-01-01 00:00:00'),
+                            ('standard', 'months since 2001-01-01')):
+        filename = 'ctm_{}.nc'.format(calendar)
+        with Dataset(os.path.join(folder, filename), 'w') as ncfile:
+            ncfile.createDimension('time', None)
+            var = ncfile.createVariable('time', 'f8', ('time',))
+            var.units = units
+            var.calendar = calendar
+            var[:] = [0., 58., 59.]
+    dates = get_gc_datetime(wd=folder, filename='ctm_360_day.nc')
+    assert [(i.month, i.day) for i in dates] == [(1, 1), (2, 29), (2, 30)]
+    # Units that are not setup raise an error (rather than exiting)
+    with pytest.raises(ValueError):
+        get_gc_datetime(wd=folder, filename='ctm_standard.nc')
+    return
+
+
+def test_get_LOCs_df_from_NetCDF(tmpdir):
+    # Make a small synthetic *ts* NetCDF - array shape = (TIME, LON, LAT)
+    folder = str(tmpdir)
+    lon, lat = np.arange(-180, 180, 5.), np.arange(-88, 90, 4.)
+    data = {}
+    with Dataset(os.path.join(folder, 'ts_ctm.nc'), 'w') as ncfile:
+        for dim, values in (('time', np.arange(6.)), ('lon', lon),
+                            ('lat', lat)):
+            ncfile.createDimension(dim, len(values))
+            var = ncfile.createVariable(dim, 'f8', (dim,))
+            var[:] = values
+        ncfile['time'].units = 'hours since 2014-01-01 00:00:00'
+        for spec in ('O3', 'CO'):
+            data[spec] = np.random.rand(6, len(lon), len(lat))
+            var = ncfile.createVariable('IJ_AVG_S__'+spec, 'f8',
+                                        ('time', 'lon', 'lat'))
+            var[:] = data[spec]
+            var.cf_units = 'v/v'
+    # Named sites and locations (inc. two in the same grid box)
+    sites = ['CVO', 'Weybourne']
+    df = get_LOCs_df_from_NetCDF(sites=sites, specs=['O3', 'CO'], wd=folder)
+    assert list(df.columns) == [(i, j) for i in sites for j in ['O3', 'CO']]
+    assert df.index[-1] == datetime.datetime(2014, 1, 1, 5)
+    assert np.allclose(df[('CVO', 'CO')], data['CO'][:, 31, 26])
+    assert np.allclose(df[('Weybourne', 'O3')], data['O3'][:, 36, 35])
+    LONs, LATs = [-24.9, 1.1, 1.2], [16.8, 52.9, 52.8]
+    df2, units = get_LOCs_df_from_NetCDF(LONs=LONs, LATs=LATs, specs=['O3'],
+                                         wd=folder, rtn_units=True,
+                                         rtn_long_form=True)
+    assert units == {'O3': 'v/v'}
+    assert list(df2.columns) == ['datetime', 'site', 'spec', 'value']
+    assert len(df2) == 6*3
+    vals = df2.loc[df2['site'] == '(1.2, 52.8)', 'value'].values
+    assert np.allclose(vals, data['O3'][:, 36, 35])
+    # Locations must be given (and match)
+    with pytest.raises(ValueError):
+        get_LOCs_df_from_NetCDF(wd=folder)
+    with pytest.raises(ValueError):
+        get_LOCs_df_from_NetCDF(LONs=LONs, LATs=LATs[:2], wd=folder)
+    with pytest.raises(ValueError):
+        get_LOCs_df_from_NetCDF(sites=sites, LONs=LONs, LATs=LATs, wd=folder)
+    return
+
+
+def test_scan_geos_log_file(tmpdir, monkeypatch):
+    lines = [
+        ' Start time of run           : 20140101 000000\n',
+        ' End time of run             : 20140102 000000\n',
+        '     ===> SIMULATION START TIME: 2020/03/01 10:00 <===\n',
+        ' Mean OH =    11.5   [1e5 molec/cm3]\n',
+        'CH4 (90N - 30N) :    1822.54 [ppbv]\n',
+        '     ===> SIMULATION END TIME: 2020/03/01 12:30 <===\n',
+    ]
+    fn = os.path.join(str(tmpdir), 'geos.log')
+    with open(fn, 'w') as f:
+        f.writelines(lines)
+    d = scan_geos_log_file(fn)
+    assert list(d['Mean OH']) == [11.5], 'Mean OH is wrong'
+    assert list(d['CH4']) == [1822.54/1E9], 'CH4 is wrong'
+    # Files are scanned serially unless more workers are requested
+    with open(os.path.join(str(tmpdir), 'geos.log.2'), 'w') as f:
+        f.writelines(lines)
+    import concurrent.futures
+
+    def ProcessPoolExecutor(*args, **kwargs):
+        raise AssertionError('A process pool was started')
+    with monkeypatch.context() as m:
+        m.setattr(concurrent.futures, 'ProcessPoolExecutor',
+                  ProcessPoolExecutor)
+        df = get_geos_log_metrics_as_df(wd=str(tmpdir))
+    assert list(df['Model time (days)'].values) == [1, 1]
+    assert list(df['Real time (hours)'].values) == [2.5, 2.5]
+    import AC_tools.GEOSChem_bpch as GEOSChem_bpch
+    monkeypatch.setattr(GEOSChem_bpch, '_geos_log_metrics4file', {})
+    df2 = get_geos_log_metrics_as_df(wd=str(tmpdir), n_workers=2)
+    assert df2.equals(df)
+    return
+
+
+def test_get_bpch_summary4run(monkeypatch):
+    import AC_tools.GEOSChem_bpch as GEOSChem_bpch
+    # Synthetic model output - dims: (lon, lat, alt, time)
+    shape = (4, 3, 5, 2)
+    ars = {
+        'IJ_AVG_S__O3': np.random.rand(*shape) * 1E-7,
+        'IJ_AVG_S__CO': np.random.rand(*shape) * 1E-6,
+        'IJ_AVG_S__NO2': np.random.rand(*shape) * 1E-9,
+    }
+
+    def get_GC_output(wd=None, vars=None, r_list=False, **kwargs):
+        if r_list:
+            return [ars[i] for i in vars]
+        return ars[vars[0]]
+    monkeypatch.setattr(GEOSChem_bpch, 'get_GC_output', get_GC_output)
+    a_m = np.random.rand(*shape) * 1E15
+    t_p = np.random.rand(*shape)
+    s_area = np.random.rand(*shape[:2]) * 1E10
+    kwargs = {'burden_specs': ['O3', 'CO'], 'surface_specs': ['NO2', 'O3'],
+              'a_m': a_m, 't_p': t_p, 's_area': s_area}
+    summary = get_bpch_summary4run(wd='TEST', **kwargs)
+    for spec in ('O3', 'CO'):
+        burden = get_trop_burden(spec=spec, wd='TEST', a_m=a_m, t_p=t_p,
+                                 all_data=False).sum()
+        assert np.isclose(summary['burden'][spec], burden, rtol=1E-12)
+    for spec in ('NO2', 'O3'):
+        val = get_avg_surface_conc_of_X(spec=spec, wd='TEST', s_area=s_area)
+        assert np.isclose(summary['surface'][spec], val, rtol=1E-12)
+    # Runs are processed serially (in this process) by default
+    summaries = get_bpch_summary4runs(['TEST', 'TEST'], **kwargs)
+    assert summaries[1]['burden'] == summary['burden']
+    return
+
+
+def test_MolecWeighting(monkeypatch):
+    import AC_tools.GEOSChem_bpch as GEOSChem_bpch
+    # Synthetic weighting variables - dims: (lon, lat, alt, time)
+    shape = (4, 3, 5, 2)
+    n_air = np.random.rand(*shape) * 1E19
+    vol = np.random.rand(*shape) * 1E15
+    t_p = np.random.choice([0., 0.5, 1., 1.], size=shape)
+    t_p[..., 0, :] = 1.
+    monkeypatch.setattr(GEOSChem_bpch, 'get_GC_output',
+                        lambda *args, **kwargs: t_p)
+    ars = [np.random.rand(*shape[:3]) for i in range(3)]
+    kwargs = {'n_air': n_air, 'vol': vol}
+    for multiply_method in (False, True):
+        weights = MolecWeighting(t_p=t_p, multiply_method=multiply_method,
+                                 **kwargs)
+        vals = weights.weighted_avg(ars)
+        for n, arr in enumerate(ars):
+            # (t_p is read from the run by molec_weighted_avg_BPCH)
+            val = molec_weighted_avg_BPCH(arr, multiply_method=multiply_method,
+                                          **kwargs)
+            assert np.isclose(vals[n], val, rtol=1E-12)
+            val = molec_weighted_avg_BPCH(arr, weights=weights)
+            assert np.isclose(vals[n], val, rtol=1E-12)
+    # Averages over some axes and masked arrays
+    weights = MolecWeighting(t_p=t_p, **kwargs)
+    arr = np.ma.masked_greater(ars[0], 0.8)
+    vals = np.ma.filled(weights.weighted_avg([arr, ars[1]], axis=[0]),
+                        np.nan)
+
+    def get_avg(arr, **kwargs):
+        val = molec_weighted_avg_BPCH(arr, weight_lon=True, **kwargs)
+        return np.ma.filled(val, np.nan)
+    # (boxes with no tropospheric values are NaN)
+    for n, arr_ in enumerate([arr, ars[1]]):
+        val = get_avg(arr_, **kwargs)
+        assert np.allclose(vals[n], val, rtol=1E-12, equal_nan=True)
+    val = get_avg(arr, weights=weights)
+    assert np.allclose(vals[0], val, rtol=1E-12, equal_nan=True)
+    return
+
+
+def test_get_GC_output4fam(monkeypatch):
+    import AC_tools.GEOSChem_bpch as GEOSChem_bpch
+    specs = ['NO', 'NO2', 'N2O5', 'HNO3']
+    shape = (4, 3, 5, 2)
+    ars = dict([('IJ_AVG_S__'+i, np.ma.array(np.random.rand(*shape)))
+                for i in specs])
+    ars['IJ_AVG_S__NO'][0] = np.ma.masked
+    ars['IJ_AVG_S__NO2'][0, 0] = np.ma.masked
+    for spec in ('N2O5', 'HNO3'):
+        ars['IJ_AVG_S__'+spec][0, 0, 0] = np.ma.masked
+
+    def get_GC_output(wd=None, vars=None, r_list=False, **kwargs):
+        return [ars[i].copy() for i in vars]
+    monkeypatch.setattr(GEOSChem_bpch, 'get_GC_output', get_GC_output)
+    stioch4fam = [1., 1., 2., 1.]
+    scale = 1E9
+    # The previous approach - adjust each species to stoichiometry and sum
+    arr = get_GC_output(vars=['IJ_AVG_S__'+i for i in specs], r_list=True)
+    arr = [arr[n]*stioch4fam[n] for n, i in enumerate(specs)]
+    members = [i.copy() for i in arr]
+    arr = np.ma.concatenate([i[..., None] for i in arr], axis=-1)
+    arr = arr.sum(axis=-1) * scale
+    arr2 = get_GC_output4fam(specs=specs, stioch4fam=stioch4fam, scale=scale)
+    assert (np.ma.getmaskarray(arr2) == np.ma.getmaskarray(arr)).all()
+    assert np.ma.getmaskarray(arr2)[0, 0, 0].all()
+    assert not np.ma.getmaskarray(arr2)[0, 0, 1:].any()
+    assert np.ma.allclose(arr2, arr, rtol=1E-12)
+    arr2 = get_GC_output4fam(specs=specs, stioch4fam=stioch4fam, scale=scale,
+                             acc_dtype=np.float32)
+    assert arr2.dtype == np.float32
+    assert np.ma.allclose(arr2, arr, rtol=1E-5)
+    # Members are returned adjusted to stoichiometry (but not scaled)
+    ars2 = get_GC_output4fam(specs=specs, stioch4fam=stioch4fam, scale=scale,
+                             rtn_list=True)
+    for n, arr2 in enumerate(ars2):
+        assert (np.ma.getmaskarray(arr2) ==
+                np.ma.getmaskarray(members[n])).all()
+        assert np.ma.allclose(arr2, members[n], rtol=1E-12)
+    return
+
+
+def split_4D_array_into_seasons_v0(arr, annual_plus_seasons=True):
+    """ Previous (per season) version of split_4D_array_into_seasons """
+    seasons = ['Annual', 'DJF', 'MAM', 'JJA', 'SON']
+    indices = [
+        list(range(0, 12)), [11, 0, 1], [2, 3, 4], [5, 6, 7], [8, 9, 10]
+    ]
+    if not annual_plus_seasons:
+        seasons, indices = seasons[1:], indices[1:]
+    ars = [[arr[..., i] for i in indices[n]] for n, s in enumerate(seasons)]
+    ars = [np.ma.array(i).mean(axis=0) for i in ars]
+    return ars, seasons
+
+
+def test_split_4D_array_into_seasons():
+    # Masked 4D array with more than 12 months of output
+    arr = np.ma.array(np.random.rand(4, 3, 5, 15))
+    arr[0, 0, 0, :] = np.ma.masked
+    arr[1, 0, 0, [11, 0, 1]] = np.ma.masked
+    arr[2] = np.ma.masked_greater(arr[2], 0.7)
+    for annual_plus_seasons in (True, False):
+        ars, seasons = split_4D_array_into_seasons(
+            arr, annual_plus_seasons=annual_plus_seasons)
+        ars0, seasons0 = split_4D_array_into_seasons_v0(
+            arr, annual_plus_seasons=annual_plus_seasons)
+        assert seasons == seasons0
+        for n, arr0 in enumerate(ars0):
+            assert (np.ma.getmaskarray(ars[n]) ==
+                    np.ma.getmaskarray(arr0)).all()
+            assert np.ma.allclose(ars[n], arr0, rtol=1E-12)
+    return
+
+
+def test_prt_seaonal_values(monkeypatch, capsys):
+    import AC_tools.GEOSChem_bpch as GEOSChem_bpch
+    shape = (4, 3, 40, 12)
+    s_area = np.random.rand(4, 3, 1) * 1E10
+    m = np.zeros(shape[:3], dtype=bool)
+    m[0] = True
+    monkeypatch.setattr(GEOSChem_bpch, 'get_surface_area',
+                        lambda res=None, **kwargs: s_area)
+    monkeypatch.setattr(GEOSChem_bpch, 'mask_all_but',
+                        lambda *args, **kwargs: m, raising=False)
+    arr = np.ma.array(np.random.rand(*shape[:2]+(38, 12)))
+    arr[1, 1, 0, :] = np.ma.masked
+    prt_seaonal_values(arr=arr, verbose=False)
+    lines = capsys.readouterr().out.strip().split('\n')[-5:]
+    # Previous area weighting (over the area of the region)
+    arr = np.ma.array(arr, mask=np.ma.mask_or(
+        np.ma.getmaskarray(arr), np.broadcast_to(m[..., :38, None],
+                                                 arr.shape)))
+    s_area = np.ma.array(s_area[..., 0], mask=m[..., 0])
+    ars, seasons = split_4D_array_into_seasons_v0(arr)
+    npstr = '{:<15}'+'{:<15,.4f}'*7
+    for n, i in enumerate(ars):
+        i = np.ma.array(i[..., 0], mask=m[..., 0])
+        vars = (i.min(), i.max(), np.percentile(i.compressed(), 5),
+                np.percentile(i.compressed(), 95), i.mean(),
+                np.median(i.compressed()), (i*s_area).sum()/s_area.sum())
+        expected = npstr.format(seasons[n], *[float(j) for j in vars])
+        assert lines[n].strip() == expected.strip()
+    return
+
+
 def test_get_O3_burden_bpch():
     var = get_O3_burden_bpch(wd=wd)
     assert (round(var.sum(), 0) == round(376875.15625, 0)
@@ -0,0 +1,345 @@
+from ..KPP import *
+import logging
+import pytest
+logging.basicConfig(filename='test.log', level=logging.DEBUG)
+logging.info('Starting KPP test.')
+
+# Small KPP *.eqn and compiled mechanism (gckpp_Monitor.F90) files
+KPP_files = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'KPP_files')
+
+
+def test_get_KPP_eqn_file_reaction_table():
+    df = get_KPP_eqn_file_reaction_table(folder=KPP_files,
+                                         filename='test.eqn')
+    assert list(df.index) == list(range(1, 15))
+    assert list(df['Type'].value_counts().sort_index()) == [6, 4, 4]
+    assert df.loc[1, 'rxn_str'] == 'O3 + NO = NO2 + O2'
+    assert df.loc[1, 'eqn'] == 'GCARR(3.00E-12, 0.0E+00, -1500.0)'
+    assert df.loc[1, 'line'] == 5
+    # Third bodies and photons are not species
+    assert df.loc[4, 'reactants'] == ['NO2', 'OH']
+    assert df.loc[11, 'reactants'] == ['O3']
+    # Coefficients and reactions over more than one line
+    assert df.loc[8, 'prod_coefs'] == [0.5, 0.5]
+    assert df.loc[10, 'products'] == ['HNO3']
+    assert df.loc[10, 'prod_coefs'] == [2.0]
+    assert df.loc[6, 'products'] == ['CH2O', 'HO2', 'NO2']
+    # The table is only made once per file
+    df2 = get_KPP_eqn_file_reaction_table(folder=KPP_files,
+                                          filename='test.eqn')
+    assert df2 is df
+    rxns_dict = get_dicts_of_KPP_eqn_file_reactions(folder=KPP_files,
+                                                    filename='test.eqn')
+    assert [len(rxns_dict[i]) for i in rxns_dict] == [6, 4, 4]
+    return
+
+
+def test_get_KPP_mechanism(tmpdir, monkeypatch):
+    import AC_tools.KPP as KPP
+    cache_dir = str(tmpdir)
+    monkeypatch.setattr(KPP, '_KPP_mechanism4file', {})
+    mech = get_KPP_mechanism(wd=KPP_files, cache_dir=cache_dir)
+    assert len(mech.RR_dict) == 14
+    assert mech.RR_dict[2].strip() == 'O3 + OH --> HO2 + O2 + LOx'
+    assert mech.products[10] == ['HNO3', 'T002']
+    assert mech.prod_coefs[10] == [2.0, 1.0]
+    assert mech.rxns_with_str('LOx') == [2, 11]
+    # The cache file is saved in the cache folder (not with the KPP files)
+    assert len(os.listdir(cache_dir)) == 1
+    assert sorted(os.listdir(KPP_files)) == ['gckpp_Monitor.F90', 'test.eqn']
+    # The mechanism is kept for the session...
+    assert get_KPP_mechanism(wd=KPP_files, cache_dir=cache_dir) is mech
+    # ... and read from the cache file in a new session
+    monkeypatch.setattr(KPP, '_KPP_mechanism4file', {})
+
+    def read_KPP_Monitor_file_rxns(*args, **kwargs):
+        raise AssertionError('The KPP cache file was not used')
+    monkeypatch.setattr(KPP, 'read_KPP_Monitor_file_rxns',
+                        read_KPP_Monitor_file_rxns)
+    mech2 = get_KPP_mechanism(wd=KPP_files, cache_dir=cache_dir)
+    assert mech2 is not mech
+    assert mech2.RR_dict == mech.RR_dict
+    return
+
+
+def test_KPP_species_index():
+    df = get_KPP_eqn_file_reaction_table(folder=KPP_files,
+                                         filename='test.eqn')
+    RR_dict = dict(zip(df.index, df['rxn_str'].values))
+    rxn_index = get_KPP_species_index(RR_dict=RR_dict)
+    assert 'M' not in rxn_index.species
+    assert 'hv' not in rxn_index.species
+    assert rxn_index.other_terms == set(['{+M}', 'hv'])
+    assert rxn_index.rxns4spec('NO2', as_product=False) == [4, 8, 13]
+    assert rxn_index.rxns4spec('NO2', as_reactant=False) == [1, 6]
+    assert rxn_index.rxns4spec('HNO3', coef=2.0) == [10]
+    assert rxn_index.as_reactant['N2'] == {5: 1.0}
+    assert rxn_index.as_product['OH'] == {14: 2.0}
+    # Reactions with species containing the string (inc. coefficients)
+    assert rxn_index.rxns4search_str('HNO') == [4, 8, 9, 10]
+    assert rxn_index.rxns4search_str('0.500HNO2 ') == [8]
+    # Strings that are not (just) part of species names use all reactions
+    for search_str in ('hv', 'M', 'NO + O3', 'BrO'):
+        assert rxn_index.rxns4search_str(search_str) is None
+    return
+
+
+def test_add_tags4strs2mech():
+    rxn_dicts = get_dicts_of_KPP_eqn_file_reactions(folder=KPP_files,
+                                                    filename='test.eqn')
+    rxn_dicts = process_KPP_rxn_dicts2dfs(rxn_dicts=rxn_dicts)
+    rxn_index = get_KPP_species_index(rxn_dicts=rxn_dicts)
+    search_strs = ['NO2', '0.500HNO3', 'hv', 'M}', 'O3 + NO', 'O1D ']
+    for kwargs in ({'search_reactants': True}, {'search_products': True},
+                   {}):
+        tagged = []
+        for use_index in (True, False):
+            rxn_dicts_ = dict([(k, v.copy()) for k, v in rxn_dicts.items()])
+            tagged += [add_tags4strs2mech(rxn_dicts_, tagged_rxns={},
+                                          search_strs=search_strs,
+                                          rxn_index=rxn_index,
+                                          use_index=use_index, **kwargs)]
+        assert tagged[0][1] == tagged[1][1]
+        for key_ in rxn_dicts:
+            assert tagged[0][0][key_].equals(tagged[1][0][key_])
+    # Check the reactions tagged for photolysis and third bodies
+    rxn_dicts, tagged_rxns = tagged[0]
+    search_strs = [tagged_rxns[i]['search_str'] for i in tagged_rxns]
+    assert search_strs.count('NO2') == 5
+    assert search_strs.count('hv') == 4
+    assert search_strs.count('M}') == 1
+    return
+
+
+def test_get_tags_in_rxn_numbers():
+    mech = get_KPP_mechanism(wd=KPP_files, use_cache_file=False)
+    tags = get_tags_in_rxn_numbers(rxn_nums=list(range(1, 15)),
+                                   RR_dict=mech.RR_dict,
+                                   rxn_index=mech.rxn_index)
+    assert tags == {5: 'T001', 6: 'T002', 10: 'T002'}
+    df = get_reactants_and_products4tagged_fam(fam='LOx', folder=KPP_files)
+    assert list(df.index) == [2, 11]
+    assert list(df['react']) == ['O3 + OH', 'O3 + hv']
+    return
+
+
+def test_get_KPP_stoich_matrix():
+    stoich = get_KPP_stoich_matrix(folder=KPP_files, filename='test.eqn')
+    assert stoich.rxns == list(range(1, 15))
+    assert 'M' not in stoich.species
+    assert 'hv' not in stoich.species
+    matrix = stoich.matrix.toarray()
+
+    def get_col(rxn):
+        col = matrix[:, stoich.rxns.index(rxn)]
+        return dict([(stoich.species[n], i) for n, i in enumerate(col)
+                     if i != 0])
+    assert get_col(1) == {'O3': -1, 'NO': -1, 'NO2': 1, 'O2': 1}
+    # Third bodies and photons are dropped and catalysts net to zero
+    assert get_col(4) == {'NO2': -1, 'OH': -1, 'HNO3': 1}
+    assert get_col(5) == {'O1D': -1, 'O': 1}
+    assert get_col(8) == {'NO2': -1, 'HNO3': 0.5, 'HNO2': 0.5}
+    assert get_col(11) == {'O3': -1, 'O': 1, 'O2': 1}
+    assert get_col(14) == {'H2O2': -1, 'OH': 2}
+    # Net tendency for species and families
+    rates = np.arange(1., 15.)
+    tend = stoich.calc_net_tendency(rates, species=['NO2', 'N2'])
+    assert list(tend) == [1+6-4-8-13, 0]
+    fams = {'NOy': {'NO': 1, 'NO2': 1, 'NO3': 1, 'HNO3': 1, 'HNO2': 1,
+                    'N2O5': 2}}
+    assert list(stoich.calc_net_tendency(rates, fams=fams)) == [0]
+    # Tagged rates (a reaction with more than one tag is only used once)
+    dsPL = xr.Dataset(dict([('Prod_T{:0>3}'.format(i),
+                             (('lev',), [float(i), 2.*i])) for i in (1, 2, 3)]))
+    tags2_rxn_num = {'PT001': 1, 'PT002': 13, 'PT003': 13}
+    da = get_rxn_rates4tags(dsPL, tags2_rxn_num)
+    assert list(da['rxn'].values) == [1, 13]
+    tend = stoich.calc_net_tendency(da, species=['NO2', 'NO'])
+    assert tend.dims == ('species', 'lev')
+    assert (tend.sel(species='NO2').values == [1-2, 2-4]).all()
+    assert (tend.sel(species='NO').values == [-1+2, -2+4]).all()
+    return
+
+
+def test_KPP_rate_table():
+    table = KPP_rate_table(folder=KPP_files, filename='test.eqn')
+    assert table.unsupported == list(range(7, 15))
+    TEMP = np.array([220., 260., 298., 310.])
+    NUMDEN = np.array([5E18, 1E19, 2E19, 2.5E19])
+    PRESS = np.array([250., 500., 900., 1013.25])
+    rates = table.calc_rates(TEMP=TEMP, NUMDEN=NUMDEN, PRESS=PRESS)
+    assert rates.shape == (14, 4)
+    assert np.isnan(rates[6:]).all()
+    # Compare against the rate functions for each location
+    for n, (T, M, P) in enumerate(zip(TEMP, NUMDEN, PRESS)):
+        expected = [
+            GCARR(3.00E-12, 0.0, -1500.0, TEMP=T),
+            GCARR(1.70E-12, 0.0, -940.0, TEMP=T),
+            GC_OHCO(1.50E-13, 0.0, 0.0, NUMDEN=M, TEMP=T, PRESS=P),
+            GCJPLPR(1.80E-30, 3.0, 0.0, 2.8E-11, 0.0, 0.0, 0.6, 0.0, 0.0,
+                    NUMDEN=M, TEMP=T, PRESS=P),
+            GCARR(2.15E-11, 0.0, 110.0, TEMP=T),
+            GCARR(2.80E-12, 0.0, 300.0, TEMP=T) + GCARR(1.00E-14, 0.0, 0.0,
+                                                        TEMP=T),
+        ]
+        assert np.allclose(rates[:6, n], expected, rtol=1E-12, atol=0)
+    # Fields as xr.DataArrays
+    TEMP = xr.DataArray(TEMP, dims=('lev',), coords={'lev': [4, 3, 2, 1]})
+    da = table.calc_rates(TEMP=TEMP, NUMDEN=NUMDEN, PRESS=PRESS)
+    assert da.dims == ('rxn', 'lev')
+    assert list(da['rxn'].values) == list(range(1, 15))
+    assert np.allclose(da.values[:6], rates[:6])
+    return
+
+
+
+def mk_test_dsPL_and_StateMet(tags=('PT001', 'PT002', 'PT003'), nlev=4):
+    """
+    Make small prod/loss and StateMet datasets (and an Ox_fam_dict for these)
+    """
+    time = pd.date_range('2019-01-01', periods=3, freq='MS').values
+    coords = {'time': time.astype('datetime64[ns]'),
+              'lev': np.arange(1, nlev+1), 'lat': [-45., 0., 45.],
+              'lon': [-120., 0., 120., 180.]}
+    dims = ('time', 'lev', 'lat', 'lon')
+    shape = tuple(len(coords[i]) for i in dims)
+    dsPL = xr.Dataset(dict([(i.replace('PT', 'Prod_T'),
+                             (dims, np.random.rand(*shape)*1E5))
+                            for i in tags]), coords=coords)
+    StateMet = xr.Dataset({
+        'Met_AIRVOL': (dims, np.random.rand(*shape)*1E12),
+        'Met_AIRDEN': (dims, np.random.rand(*shape)),
+        'FracOfTimeInTrop': (dims, np.random.rand(*shape)),
+    }, coords=coords)
+    tags2_rxn_num = dict([(i, n+1) for n, i in enumerate(tags)])
+    Ox_fam_dict = {
+        'tags': list(tags), 'tags2_rxn_num': tags2_rxn_num,
+        'RR_dict_fam_stioch': dict([(n+1, float(n+1))
+                                    for n, i in enumerate(tags)]),
+        'fam_dict': dict(zip(tags, ['Photolysis', 'Photolysis', 'Iodine'])),
+    }
+    return dsPL, StateMet, Ox_fam_dict
+
+
+def test_get_PL_ars4mech_NetCDF(tmpdir, monkeypatch):
+    import AC_tools.KPP as KPP
+    dsPL, StateMet, Ox_fam_dict = mk_test_dsPL_and_StateMet()
+    monkeypatch.setattr(KPP, 'get_ProdLoss_ds', lambda **kwargs: dsPL)
+    # Convert each tag (molec/cm3/s => g/month) in turn
+    secs = secs_in_month(years=[2019]*3, months=[1, 2, 3])
+    expected = []
+    for tag in Ox_fam_dict['tags']:
+        arr = dsPL[tag.replace('PT', 'Prod_T')].values
+        arr = arr * StateMet['Met_AIRVOL'].values * 1E6
+        stioch = Ox_fam_dict['RR_dict_fam_stioch'][
+            Ox_fam_dict['tags2_rxn_num'][tag]]
+        arr = arr * stioch / constants('AVG') * species_mass('O3')
+        expected += [arr * secs[:, None, None, None]]
+    expected = np.stack(expected)
+    kwargs = {'Ox_fam_dict': Ox_fam_dict, 'StateMet': StateMet,
+              'verbose': False}
+    for rm_strat in (True, False):
+        expected_ = expected
+        if rm_strat:
+            expected_ = expected * StateMet['FracOfTimeInTrop'].values
+        ars = get_PL_ars4mech_NetCDF(rm_strat=rm_strat, **kwargs)
+        assert np.allclose(np.stack(ars), expected_, rtol=1E-12, atol=0)
+        totals = get_PL_ars4mech_NetCDF(rm_strat=rm_strat, rtn_totals=True,
+                                        **kwargs)
+        assert np.allclose(totals, expected_.sum(axis=(1, 2, 3, 4)),
+                           rtol=1E-12, atol=0)
+    # Weighted by the number of molecules (the totals are weighted once)
+    molecs = StateMet['Met_AIRDEN'].values / constants('RMM_air') / 1E6
+    wtd = (expected * molecs).sum(axis=(1, 3, 4))
+    wtd = wtd / molecs.sum(axis=(0, 2, 3))
+    ars = get_PL_ars4mech_NetCDF(weight_by_molecs=True, **kwargs)
+    assert np.allclose(np.stack(ars), wtd, rtol=1E-12, atol=0)
+    totals = get_PL_ars4mech_NetCDF(weight_by_molecs=True, rtn_totals=True,
+                                    **kwargs)
+    assert np.allclose(totals, wtd.sum(axis=1), rtol=1E-12, atol=0)
+    # The lazy conversion of output read from file gives the same values
+    filename = os.path.join(str(tmpdir), 'ProdLoss.nc')
+    dsPL.to_netcdf(filename)
+    with xr.open_dataset(filename) as dsPL_lazy:
+        da = get_PL_da4mech_NetCDF(Ox_fam_dict=Ox_fam_dict, rm_strat=True,
+                                   StateMet=StateMet, dsPL=dsPL_lazy)
+        assert da.dims == ('tag', 'time', 'lev', 'lat', 'lon')
+        assert list(da['tag'].values) == Ox_fam_dict['tags']
+        da_eager = get_PL_da4mech_NetCDF(Ox_fam_dict=Ox_fam_dict,
+                                         rm_strat=True, StateMet=StateMet,
+                                         dsPL=dsPL.load())
+        assert np.allclose(da.values, da_eager.values, rtol=1E-12, atol=0)
+    return
+
+
+
+def test_calc_fam_loss_by_route_and_region():
+    dsPL, StateMet, Ox_fam_dict = mk_test_dsPL_and_StateMet()
+    kwargs = {'Ox_fam_dict': Ox_fam_dict, 'StateMet': StateMet,
+              'dsPL': dsPL, 'verbose': False}
+    da = get_PL_da4mech_NetCDF(Ox_fam_dict=Ox_fam_dict, rm_strat=True,
+                               StateMet=StateMet, dsPL=dsPL)
+    da = da.sum(dim='time').transpose('tag', 'lon', 'lat', 'lev').values
+    # Masks (lon, lat, lev) with fewer, the same and more levels than the
+    # model output
+    masks = [np.zeros((4, 3, nlev)) for nlev in (2, 4, 6)]
+    masks[0][:, 0, :] = 1
+    masks[1][1, :, :] = 1
+    masks[2][:, 2, 1:] = 1
+    mtitles = ['South', 'Lon0', 'North']
+    df = calc_fam_loss_by_route_and_region(masks=masks, mtitles=mtitles,
+                                           **kwargs)
+    assert list(df.index) == Ox_fam_dict['tags']
+    assert list(df.columns) == mtitles
+    for n, mask in enumerate(masks):
+        mask = mask[..., :4]
+        mask = np.pad(mask, [(0, 0), (0, 0), (0, 4-mask.shape[-1])])
+        expected = (da * mask).sum(axis=(1, 2, 3)) / 1E12
+        assert np.allclose(df[mtitles[n]].values, expected, rtol=1E-12)
+    # Masks as an array of region numbers, and summed by family
+    labels = np.full((4, 3, 4), -1)
+    labels[:, 0, :2] = 0
+    labels[1, 1:, :] = 1
+    df = calc_fam_loss_by_route_and_region(
+        masks=[labels == n for n in range(3)], mtitles=mtitles, **kwargs)
+    df2 = calc_fam_loss_by_route_and_region(masks=labels, mtitles=mtitles,
+                                            rtn_by_fam=True, **kwargs)
+    assert list(df2.index) == ['Iodine', 'Photolysis']
+    assert np.allclose(df2.loc['Photolysis'].values,
+                       df.values[:2].sum(axis=0), rtol=1E-12)
+    assert np.allclose(df2.loc['Iodine'].values, df.values[2], rtol=1E-12)
+    assert (df2[mtitles[0]] > 0).all()
+    assert (df2[mtitles[2]] == 0).all()
+    return
+
+
+def test_get_Ox_fam_dicts(monkeypatch):
+    import AC_tools.KPP as KPP
+    monkeypatch.setattr(KPP, 'get_Ox_fam_based_on_reactants',
+                        lambda tags=None, **kwargs:
+                        dict([(i, 'Photolysis') for i in tags.values()]))
+    calls = []
+
+    def get_PL_ars4mech_NetCDF(**kwargs):
+        calls.append(kwargs)
+        return ['ars']
+    monkeypatch.setattr(KPP, 'get_PL_ars4mech_NetCDF',
+                        get_PL_ars4mech_NetCDF)
+    kwargs = {'CODE_wd': KPP_files, 'Mechanism': 'test', 'verbose': False}
+    # Just the tags and their families (the model output is not read)
+    Ox_fam_dict = get_Ox_fam_dicts(extract_ars=False, **kwargs)
+    assert Ox_fam_dict['ars'] is None
+    assert calls == []
+    assert sorted(Ox_fam_dict['tags_dict']) == [2, 11]
+    assert sorted(Ox_fam_dict['fam_dict']) == sorted(Ox_fam_dict['tags'])
+    assert Ox_fam_dict['RR_dict_fam_stioch'] == {2: 1.0, 11: 1.0}
+    # The model output is extracted by default
+    Ox_fam_dict = get_Ox_fam_dicts(rm_strat=True, **kwargs)
+    assert Ox_fam_dict['ars'] == ['ars']
+    assert len(calls) == 1
+    assert calls[0]['rm_strat']
+    return
+
+
+logging.info('KPP test complete')
@@ -13,10 +13,8 @@ except ImportError:
     import urllib.error
     import urllib.parse
 
-slow = pytest.mark.skipif(
-    not pytest.config.getoption("--slow"),
-    reason="need --slow option to run"
-)
+# Tests marked as slow are skipped unless "--slow" is given (see conftest.py)
+slow = pytest.mark.slow
 
 test_file_dir = '../data'
 
@@ -85,3 +83,29 @@ def test_get_folder():
     assert os.path.exists(folder), "Cannot find the test folder"
     logging.info("test complete")
     return
+
+
+def test_combine_NetCDFs_along_record_dim(tmpdir):
+    import numpy as np
+    # Make some small files to combine
+    nc_files = []
+    for n_file in range(3):
+        nc_file = os.path.join(str(tmpdir), 'TEMP_{}_ctm.nc'.format(n_file))
+        with netCDF4.Dataset(nc_file, 'w') as ds:
+            ds.createDimension('time', None)
+            ds.createDimension('lat', 2)
+            time = ds.createVariable('time', 'f8', ('time',))
+            time[:] = [n_file*2, n_file*2+1]
+            O3 = ds.createVariable('O3', 'f4', ('time', 'lat'))
+            O3[:] = np.arange(4).reshape(2, 2) + n_file*4
+            area = ds.createVariable('area', 'f4', ('lat',))
+            area[:] = [1, 2]
+        nc_files += [nc_file]
+    output_file = os.path.join(str(tmpdir), 'ctm.nc')
+    combine_NetCDFs_along_record_dim(nc_files, output_file)
+    with netCDF4.Dataset(output_file, 'r') as ds:
+        assert ds.dimensions['time'].isunlimited()
+        assert (ds.variables['time'][:] == np.arange(6)).all()
+        assert (ds.variables['O3'][:].ravel() == np.arange(12)).all()
+        assert (ds.variables['area'][:] == [1, 2]).all()
+    return
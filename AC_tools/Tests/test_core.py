@@ -86,3 +86,32 @@ def test_get_latlonalt4res_default():
     assert len(lat) == 46, 'The default latitude is wrong'
     assert len(lon) == 72, 'The default longitude is wrong'
     assert len(alt) == 47, 'The default altidure is wrong'
+
+
+def test_calc_surface_area4grid():
+    # The areas of a global grid should sum to the surface of the Earth
+    Re = 6.375E6
+    for res in ('4x5', '2x2.5', '0.083x0.083'):
+        arr = calc_surface_area4grid(res=res, Re=Re)
+        assert arr.shape == get_dims4res(res, just2D=True)
+        assert np.isclose(arr.sum(), 4*np.pi*Re*Re), 'Global area is wrong'
+    # A nested grid should match the same boxes of the global grid
+    lon_e, lat_e = get_global_grid_edges4res(res='4x5')
+    arr = calc_surface_area4grid(lon_e=lon_e, lat_e=lat_e, Re=Re)
+    nested = calc_surface_area4grid(lon_e=lon_e[10:20], lat_e=lat_e[5:15],
+                                    Re=Re)
+    assert np.allclose(nested, arr[10:19, 5:14]), 'Nested area is wrong'
+
+
+def test_get_grouped_reductions():
+    arr = np.ma.array(np.arange(24.).reshape((2, 12)))
+    arr[1, 0] = np.ma.masked
+    labels = [0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, -1]
+    means = get_grouped_reductions(arr, labels, axis=-1)
+    assert means.shape == (2, 4)
+    assert np.allclose(means[0], [0.5, 3., 6., 9.])
+    assert np.allclose(means[1, 0], 13.), 'Masked values should be ignored'
+    # Overlapping groups can be given as a stack of memberships
+    members = np.array([[1, 1, 0], [0, 1, 1]])
+    sums = get_grouped_reductions(np.arange(3.), members, how='sum')
+    assert np.allclose(sums, [1., 3.])
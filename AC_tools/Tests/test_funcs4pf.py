@@ -1,4 +1,5 @@
 from ..bpch2netCDF import *
+from ..planeflight import *
 import logging
 import pytest
 logging.basicConfig(filename='test.log', level=logging.DEBUG)
@@ -9,4 +10,160 @@ def test_get_folder():
     return
 
 
+def test_pf_csv2pandas(tmp_path):
+    file = tmp_path / 'plane.log.20150101'
+    lines = ['POINT TYPE YYYYMMDD HHMM LAT LON TRA_001 TRA_002',
+             '00001 CVO 20150101 0930 16.85 -24.87 1.5E-09 2.0E+01',
+             '00002 CVO 20150101 1000 16.85 -24.87 2.5E-09 3.0E+01']
+    file.write_text('\n'.join(lines)+'\n')
+    df = pf_csv2pandas(str(file), usecols=['TRA_002'], dtype=np.float32)
+    assert list(df.columns) == ['YYYYMMDD', 'HHMM', 'TRA_002', 'Datetime']
+    assert df['TRA_002'].dtype == np.float32
+    assert list(df['HHMM']) == ['0930', '1000']
+    assert df.index[0] == pd.Timestamp('2015-01-01 09:30')
+    df = pf_csv2pandas(str(file), epoch=True)
+    assert list(df['POINT']) == ['00001', '00002']
+    assert df['Epoch'].iloc[1] == 1420106400
+    return
+
+
+def test_get_pf_selection4file(tmp_path):
+    file = tmp_path / 'plane.log.20150101'
+    lines = ['POINT TYPE YYYYMMDD HHMM LAT LON TRA_001 TRA_002',
+             '00001 CVO 20150101 0930 16.85 -24.87 1.5E-09 2.0E+01',
+             '00002 BAE 20150101 0930 52.00 -1.00 2.5E-09 3.0E+01',
+             '00003 CVO 20150101 1000 16.85 -24.87 3.5E-09 4.0E+01',
+             '00004 BAE 20150101 1000 52.10 -1.10 4.5E-09 5.0E+01']
+    file.write_text('\n'.join(lines)+'\n')
+    df = get_pf_selection4file(str(file), sites=['CVO'])
+    assert list(df['POINT']) == ['00001', '00003']
+    df = get_pf_selection4file(str(file), points=['00002', '00003'],
+                               usecols=['TRA_001'])
+    assert list(df.columns) == ['POINT', 'YYYYMMDD', 'HHMM', 'TRA_001',
+                                'Datetime']
+    assert list(df['TRA_001']) == [2.5E-09, 3.5E-09]
+    sdate = datetime.datetime(2015, 1, 1, 9, 45)
+    df = get_pf_selection4file(str(file), sites=['BAE'], sdate=sdate)
+    assert list(df['POINT']) == ['00004']
+    edate = datetime.datetime(2015, 1, 1, 9, 30)
+    df = get_pf_selection4file(str(file), edate=edate, points=['00003'])
+    assert len(df) == 0
+    # Selections are the same for a folder of files
+    file2 = tmp_path / 'plane.log.20150102'
+    file2.write_text('\n'.join(lines).replace('20150101', '20150102')+'\n')
+    df = get_pf_from_folder(str(tmp_path), sites=['BAE'], sdate=sdate)
+    assert list(df['POINT']) == ['00004', '00002', '00004']
+    return
+
+
+def test_mk_NetCDF_of_pf_files(tmp_path):
+    from netCDF4 import Dataset
+    lines = ['POINT TYPE YYYYMMDD HHMM LAT LON TRA_001 TRA_002',
+             '00001 CVO {} 0930 16.85 -24.87 1.5E-09 2.0E+01',
+             '00002 BAE {} 0930 52.00 -1.00 2.5E-09 3.0E+01',
+             '00003 CVO {} 1000 16.85 -24.87 3.5E-09 4.0E+01']
+    files = []
+    for day in ('20150101', '20150102', '20150103'):
+        file = tmp_path / 'plane.log.{}'.format(day)
+        file.write_text('\n'.join(lines).format(day, day, day)+'\n')
+        files += [str(file)]
+    for n_workers in (1, 2):
+        filename = str(tmp_path / 'pf_{}.nc'.format(n_workers))
+        mk_NetCDF_of_pf_files(files, filename=filename, batch_size=4,
+                              n_workers=n_workers, verbose=False)
+        with Dataset(filename, 'r') as ncfile:
+            assert len(ncfile.dimensions['POINT']) == 9
+            assert list(ncfile['POINT'][:3]) == ['00001', '00002', '00003']
+            assert list(ncfile['HHMM'][:3]) == [930, 930, 1000]
+            assert ncfile['TRA_002'].dtype == np.float32
+            assert ncfile['Epoch'][3] == 1420104600+86400
+    filename = str(tmp_path / 'pf_by_site.nc')
+    mk_NetCDF_of_pf_files(files, filename=filename, by_site=True,
+                          usecols=['TRA_001'], verbose=False)
+    with Dataset(filename, 'r') as ncfile:
+        assert sorted(ncfile.groups) == ['BAE', 'CVO']
+        group = ncfile.groups['CVO']
+        assert len(group.dimensions['time']) == 6
+        assert 'TRA_002' not in group.variables
+        assert np.allclose(group['TRA_001'][:2], [1.5E-09, 3.5E-09])
+    return
+
+
+
+def test_prt_PlaneFlight_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dates = ['2015-01-01 09:30', '2015-01-01 23:59', '2015-01-02 00:00',
+             '2015-01-03 12:05']
+    df = pd.DataFrame({
+        'datetime': pd.to_datetime(dates),
+        'TYPE': ['CVO', 'BAE', 'CVO', 'CVO'],
+        'LAT': [16.85, 52.0, 16.85, -5.5],
+        'LON': [-24.87, -1.0, -24.87, 120.25],
+        'PRESS': [1013.25, 500.0, 1000.0, 85.125],
+    })
+    header = [
+        '-------------------------------------------------',
+        'Now give the times and locations of the flight',
+        '-------------------------------------------------',
+    ]
+    expected = {
+        'Planeflight.dat.20150101': [
+            '    1   CVO 01-01-2015 09:30   16.85  -24.87 1013.25',
+            '    2   BAE 01-01-2015 23:59   52.00   -1.00  500.00',
+        ],
+        'Planeflight.dat.20150102': [
+            '    1   CVO 02-01-2015 00:00   16.85  -24.87 1000.00',
+        ],
+        'Planeflight.dat.20150103': [
+            '    1   CVO 03-01-2015 12:05   -5.50  120.25   85.12',
+        ],
+    }
+    expected_v12 = {
+        'Planeflight.dat.20150101': [
+            '    1    CVO 01-01-2015 09:30   16.85  -24.87 1013.25  99999.000',
+            '    2    BAE 01-01-2015 23:59   52.00   -1.00  500.00  99999.000',
+        ],
+        'Planeflight.dat.20150102': [
+            '    1    CVO 02-01-2015 00:00   16.85  -24.87 1000.00  99999.000',
+        ],
+        'Planeflight.dat.20150103': [
+            '    1    CVO 03-01-2015 12:05   -5.50  120.25   85.12  99999.000',
+        ],
+    }
+    for n_workers in (1, 2):
+        for func, expected_, endstr in (
+            (prt_PlaneFlight_files, expected,
+             '99999   END 00-00-0000 00:00    0.00    0.00    0.00'),
+            (prt_PlaneFlight_files_v12_plus, expected_v12,
+             '99999   END  00-00-0000 00:00   0.00     0.00    0.00' +
+             '      0.00'),
+        ):
+            func(df=df.copy(), slist=['TRA_001', 'TRA_002'], Username='user',
+                 n_workers=n_workers)
+            assert sorted(os.listdir(str(tmp_path))) == sorted(expected_)
+            for filename, points in expected_.items():
+                with open(filename, 'r') as file_:
+                    lines = file_.read().split('\n')
+                os.remove(filename)
+                # (The 3rd line is the date the file was made)
+                datetime.datetime.strptime(lines[2], '%B %d %Y')
+                assert lines[:2] == [
+                    'Planeflight.dat -- input file for ND40 diagnostic ' +
+                    'GEOS_FP', 'user']
+                assert lines[3:12] == [
+                    '-----------------------------------------------',
+                    '2    ! Number of variables to be output',
+                    '-----------------------------------------------',
+                    'TRA_001', 'TRA_002'] + header + [lines[11]]
+                assert lines[12:] == points + [endstr, '']
+            if func == prt_PlaneFlight_files:
+                assert lines[11] == \
+                    'Point  Type DD-MM-YYYY HH:MM     LAT     LON   PRESS'
+            else:
+                assert lines[11] == \
+                    'Point   Type DD-MM-YYYY HH:MM     LAT     LON   PRESS' + \
+                    '        OBS'
+    return
+
+
 logging.info('GEOSChem test complete')
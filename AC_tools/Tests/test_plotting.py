@@ -8,10 +8,8 @@ logging.basicConfig(filename='test.log', level=logging.DEBUG)
 wd = '../data'
 out_dir = 'test_output'
 
-slow = pytest.mark.skipif(
-    not pytest.config.getoption("--slow"),
-    reason="need --slow option to run"
-)
+# Tests marked as slow are skipped unless "--slow" is given (see conftest.py)
+slow = pytest.mark.slow
 
 if not os.path.exists(out_dir):
     os.mkdir(out_dir)
@@ -0,0 +1,202 @@
+from ..utils import *
+import logging
+import pytest
+logging.basicConfig(filename='test.log', level=logging.DEBUG)
+logging.info('Starting utils test.')
+
+
+def mk_test_ds4locs():
+    """
+    Make a small global dataset (with pressure as a variable) to extract from
+    """
+    time = pd.date_range('2020-01-01', periods=6, freq='3h').values
+    time = time.astype('datetime64[ns]')
+    lat = np.arange(-89., 90., 2.)
+    lon = np.arange(-180., 180., 2.5)
+    lev = np.arange(1, 6)
+    shape = (len(time), len(lev), len(lat), len(lon))
+    ds = xr.Dataset(
+        {'O3': (('time', 'lev', 'lat', 'lon'), np.random.rand(*shape)),
+         'CO': (('time', 'lev', 'lat', 'lon'), np.random.rand(*shape)),
+         'hPa': (('lev',), [1000., 850., 500., 250., 100.])},
+        coords={'time': time, 'lev': lev, 'lat': lat, 'lon': lon},
+    )
+    return ds
+
+
+def mk_test_df4locs(ds, N=200):
+    """
+    Make a dataframe of random locations within a dataset
+    """
+    time = ds['time'].values
+    secs = np.random.rand(N) * (time[-1] - time[0]) / np.timedelta64(1, 's')
+    index = time[0] + (secs * 1E9).astype('timedelta64[ns]')
+    df = pd.DataFrame({
+        'lat': np.random.uniform(-89., 89., N),
+        'lon': np.random.uniform(-180., 177.5, N),
+        'hPa': np.exp(np.random.uniform(np.log(100.), np.log(1000.), N)),
+    }, index=pd.DatetimeIndex(index))
+    return df
+
+
+def test_find_nearest4values():
+    # Sorted, unsorted and repeated values
+    arrays = [np.arange(-180., 180., 2.5), np.array([3., -1., 7., 1., 5.]),
+              np.array([2., 0., 2., 4., 0.]), np.array([10., 5., 0.])]
+    values = np.array([-181., -1.25, 0., 1., 2., 3., 4.5, 6., 7.5, 181.])
+    for array in arrays:
+        idx = find_nearest4values(array, values)
+        assert list(idx) == [find_nearest(array, i) for i in values]
+    # (ties are given the first index, as for find_nearest)
+    idx = find_nearest4values(arrays[1], [0., 2., 4., 6.])
+    assert list(idx) == [1, 0, 0, 2]
+    # Arrays of datetimes
+    ds = mk_test_ds4locs()
+    array = ds['time'].values
+    values = mk_test_df4locs(ds, N=50).index.values
+    values = np.append(values, array[:-1] + (array[1:]-array[:-1])/2)
+    idx = find_nearest4values(array, values)
+    assert list(idx) == [find_nearest(array, i) for i in values]
+    idx = find_nearest4values(array[::-1], values)
+    assert list(idx) == [find_nearest(array[::-1], i) for i in values]
+    return
+
+
+def test_extract_ds4df_locs_nearest():
+    ds = mk_test_ds4locs()
+    df = mk_test_df4locs(ds)
+    kwargs = {'dsAltVar': 'hPa', 'vars2extract': ['O3', 'CO']}
+    dfN = extract_ds4df_locs(ds=ds, df=df, **kwargs)
+    # One row for each location (in the same order as df)
+    assert dfN.shape[0] == df.shape[0]
+    assert (dfN.index == df.index).all()
+    assert np.issubdtype(dfN['ds-time'].dtype, np.datetime64)
+    assert (dfN['Datetime'].values == df.index.values).all()
+    # Compare with the values of the nearest box for each location
+    for n in range(df.shape[0]):
+        lev = find_nearest(ds['hPa'].values, df['hPa'].values[n])
+        da = ds['O3'].isel(lev=lev).sel(
+            lat=df['lat'].values[n], lon=df['lon'].values[n],
+            time=df.index.values[n], method='nearest')
+        assert dfN['O3'].values[n] == da.values
+        assert dfN['ds-time'].values[n] == da['time'].values
+        assert dfN['ds-lev'].values[n] == da['lev'].values
+    # Extracting in chunks of model times gives the same values
+    for n_times4chunk in (1, 4):
+        dfN2 = extract_ds4df_locs(ds=ds, df=df, n_times4chunk=n_times4chunk,
+                                  **kwargs)
+        assert dfN2.shape[0] == df.shape[0]
+        assert dfN2.equals(dfN)
+    return
+
+
+def test_get_linear_idx_and_weights():
+    array = np.arange(-180., 180., 2.5)
+    values = [-179., 177.5, 179., 181., -181.]
+    idx, w = get_linear_idx_and_weights(array, values)
+    assert (idx[2:] == [[142, 143], [142, 143], [0, 1]]).all()
+    assert np.allclose(w[2:], [[0., 1.], [0., 1.], [1., 0.]])
+    # Values between the last and first elements of a periodic array wrap
+    idx, w = get_linear_idx_and_weights(array, values, period=360.)
+    assert (idx == [[0, 1], [143, 0], [143, 0], [0, 1], [143, 0]]).all()
+    assert np.allclose(w, [[0.6, 0.4], [1., 0.], [0.4, 0.6], [0.6, 0.4],
+                           [0.4, 0.6]])
+    idx_r, w_r = get_linear_idx_and_weights(array[::-1], values, period=360.)
+    assert (143 - idx_r == idx).all()
+    assert np.allclose(w_r, w)
+    return
+
+
+def test_extract_ds4df_locs_linear():
+    ds = mk_test_ds4locs()
+    df = mk_test_df4locs(ds)
+    kwargs = {'dsAltVar': 'hPa', 'method': 'linear'}
+    dfN = extract_ds4df_locs(ds=ds, df=df, vars2extract=['O3'], **kwargs)
+    assert list(dfN.columns) == ['O3', 'Datetime']
+    # Compare with xr.interp (with the vertical as log(pressure))
+    dsL = ds[['O3']].assign_coords(lev=np.log(ds['hPa'].values))
+    dsL = dsL.sortby('lev')
+    points = {
+        'time': xr.DataArray(df.index.values, dims='point'),
+        'lev': xr.DataArray(np.log(df['hPa'].values), dims='point'),
+        'lat': xr.DataArray(df['lat'].values, dims='point'),
+        'lon': xr.DataArray(df['lon'].values, dims='point'),
+    }
+    expected = dsL['O3'].interp(points).values
+    assert np.allclose(dfN['O3'].values, expected, rtol=1E-9, atol=0)
+    # Extracting in chunks of model times gives the same values
+    dfN2 = extract_ds4df_locs(ds=ds, df=df, n_times4chunk=2, **kwargs)
+    assert np.allclose(dfN2['O3'].values, dfN['O3'].values)
+    # Longitudes between the last and first of a global grid wrap around
+    df = df.iloc[:1].copy()
+    df.loc[:, ['lat', 'lon', 'hPa']] = [1., 179., 500.]
+    dfN = extract_ds4df_locs(ds=ds, df=df, **kwargs)
+    ds_tmp = ds['O3'].sel(lat=1., lev=3).interp(time=df.index.values[0])
+    expected = 0.4*ds_tmp.sel(lon=177.5) + 0.6*ds_tmp.sel(lon=-180.)
+    assert np.isclose(dfN['O3'].values[0], expected)
+    return
+
+
+def test_extract_ds4df_locs_linear_NaN():
+    ds = mk_test_ds4locs()
+    df = mk_test_df4locs(ds, N=3)
+    kwargs = {'dsAltVar': 'hPa', 'method': 'linear',
+              'vars2extract': ['O3']}
+    # Locations on the grid (only one box has any weight)...
+    df.index = pd.DatetimeIndex(ds['time'].values[[1, 2, 3]])
+    df['lat'], df['lon'], df['hPa'] = [1., 3., 5.], [0., 5., 10.], 500.
+    ds['O3'][2, :, 46, :] = np.nan
+    dfN = extract_ds4df_locs(ds=ds, df=df, **kwargs)
+    expected = ds['O3'].sel(lev=3).isel(time=[1, 2, 3], lat=[45, 46, 47],
+                                        lon=[72, 74, 76])
+    expected = np.diagonal(np.diagonal(expected.values))
+    assert np.isnan(dfN['O3'].values[1])
+    assert np.allclose(dfN['O3'].values[[0, 2]], expected[[0, 2]])
+    # ... and between grid boxes (with one of the boxes masked)
+    df['lat'] = [2., 4., 6.]
+    dfN = extract_ds4df_locs(ds=ds, df=df, **kwargs)
+    assert (np.isnan(dfN['O3'].values) == [False, True, False]).all()
+    return
+
+
+def test_extract_ds4df_locs2NetCDF(tmp_path, monkeypatch):
+    from netCDF4 import Dataset
+    import AC_tools.utils as utils
+    ds = mk_test_ds4locs()
+    df = mk_test_df4locs(ds, N=50)
+    filename = str(tmp_path / 'ds4df_locs.nc')
+    # Record the number of locations the indexes are calculated for at once
+    sizes = []
+    func = utils.get_ds_idx4df_locs
+
+    def get_ds_idx4df_locs(df=None, **kwargs):
+        sizes.append(df.shape[0])
+        return func(df=df, **kwargs)
+    for method in ('nearest', 'linear'):
+        # (The pressure variable is not one of the variables to extract)
+        kwargs = {'dsAltVar': 'hPa', 'method': method,
+                  'vars2extract': ['O3']}
+        with monkeypatch.context() as m:
+            m.setattr(utils, 'get_ds_idx4df_locs', get_ds_idx4df_locs)
+            extract_ds4df_locs2NetCDF(ds=ds, df=df, filename=filename,
+                                      n_times4chunk=2, verbose=False,
+                                      **kwargs)
+        # (The indexes are only calculated for the locations of each chunk)
+        assert sum(sizes) == 50
+        assert max(sizes) < 50
+        del sizes[:]
+        dfN = extract_ds4df_locs(ds=ds, df=df, **kwargs)
+        with Dataset(filename, 'r') as ncfile:
+            assert ncfile.dimensions['point'].size == 50
+            points = ncfile['point'][:]
+            # Rows are in time order
+            assert (np.diff(ncfile['Epoch'][:]) >= 0).all()
+            assert np.allclose(ncfile['O3'][:], dfN['O3'].values[points])
+            assert 'CO' not in ncfile.variables
+            if method == 'nearest':
+                assert (ncfile['ds-lev'][:] ==
+                        dfN['ds-lev'].values[points]).all()
+    return
+
+
+logging.info('utils test complete')
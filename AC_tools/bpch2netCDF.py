@@ -12,6 +12,7 @@ import logging
 import sys
 import glob
 import os
+import numpy as np
 import netCDF4
 if sys.version_info.major < 3:
     try:
@@ -174,12 +175,12 @@ def bpch_to_netCDF(folder=None, filename='ctm.nc', bpch_file_list=None,
     if isinstance(bpch_file_list, type(None)):
         logging.debug("Searching for the following bpch filetype: {filetype}"
                       .format(filetype=filetype))
-        bpch_files = glob.glob(folder + '/' + filetype)
+        bpch_files = sorted(glob.glob(folder + '/' + filetype))
         # Also check if directory contains *trac_avg* files, if no ctm.bpch
         if (len(bpch_files) == 0) and check4_trac_avg_if_no_ctm_bpch:
             filetype = '*trac_avg*'
             logging.info('WARNING! - now trying filetype={}'.format(filetype))
-            bpch_files = glob.glob(folder + '/' + filetype)
+            bpch_files = sorted(glob.glob(folder + '/' + filetype))
         # Raise error if no files matching filetype
         if len(bpch_files) == 0:
             logging.error("No bpch files ({}) found in {}".format(filetype,
@@ -220,26 +221,23 @@ def bpch_to_netCDF(folder=None, filename='ctm.nc', bpch_file_list=None,
         print('WARNING NetCDF made by iris is non CF-compliant')
     elif backend == 'PNC':
         import PseudoNetCDF as pnc
-        import xarray as xr
         if len(bpch_files) == 1:
             bpch_to_netCDF_via_PNC(filename=filename,
                                    output_file=output_file, bpch_file=bpch_files[0])
         # Individually convert bpch files if more than one file
         if len(bpch_files) > 1:
+            TEMP_ncfiles = []
             for n_bpch_file, bpch_file in enumerate(bpch_files):
+                TEMP_ncfile = os.path.join(folder,
+                                           'TEMP_{}_'.format(n_bpch_file)+filename)
                 bpch_to_netCDF_via_PNC(filename=filename,
-                                       output_file='TEMP_{}_'.format(
-                                           n_bpch_file)+filename,
+                                       output_file=TEMP_ncfile,
                                        bpch_file=bpch_file)
-            # - Combine the NetCDF files with xarray
-            TEMP_ncfiles = glob.glob(folder+'TEMP_*_'+filename)
-            # Open files with xarray
-            ds_l = [xr.open_dataset(i) for i in TEMP_ncfiles]
-            # Make sure the time dimension is unlimitetd
-            ds = xr.concat(ds_l, dim='time')
-            # Now save the combined file
-            ds.to_netcdf(folder+filename,
-                         unlimited_dims={'time_counter': True})
+                TEMP_ncfiles += [TEMP_ncfile]
+            # - Stream the NetCDF files into a single file along time
+            combine_NetCDFs_along_record_dim(TEMP_ncfiles, output_file,
+                                             record_dim='time',
+                                             verbose=verbose)
             # Remove the temporary files
             for TEMP_ncfile in TEMP_ncfiles:
                 os.remove(TEMP_ncfile)
@@ -266,6 +264,89 @@ def bpch_to_netCDF_via_PNC(format='bpch2', filename='ctm.nc',
     pnc.pncwrite(infile, output_file)
 
 
+def combine_NetCDFs_along_record_dim(nc_files, output_file, record_dim='time',
+                                     verbose=False):
+    """
+    Stream NetCDF files into a single file along an unlimited record dimension
+
+    Parameters
+    ----------
+    nc_files (list): NetCDF files to combine (in the order to write them)
+    output_file (str): name (inc. path) of the NetCDF file to create
+    record_dim (str): name of the dimension to combine the files along
+    verbose (bool): print (minor) logging to screen
+
+    Returns
+    -------
+    (None) saves a NetCDF file to disk
+
+    Notes
+    -----
+     - The output file is pre-allocated from the file headers and then filled
+     one variable of one input file at a time, so memory use is bounded by
+     the largest single variable, not the number of files.
+     - Variables without the record dimension are taken from the first file.
+     - The record coordinate is copied as stored, so all files should share
+     the same units for it (e.g. "hours since 1985-01-01 00:00:00").
+    """
+    # Get the record dimension (and its coordinate, if present) of each file
+    len4files = []
+    record_coords = []
+    for nc_file in nc_files:
+        with netCDF4.Dataset(nc_file, 'r') as src:
+            src.set_auto_maskandscale(False)
+            len4files += [len(src.dimensions[record_dim])]
+            if record_dim in src.variables:
+                record_coords += [src.variables[record_dim][:]]
+    offsets = np.cumsum([0] + len4files)
+    if verbose:
+        print('Combining {} files ({}={})'.format(len(nc_files), record_dim,
+                                                  offsets[-1]))
+    # Use the first file as a template for the output file
+    with netCDF4.Dataset(nc_files[0], 'r') as src, \
+            netCDF4.Dataset(output_file, 'w', format=src.data_model) as dst:
+        src.set_auto_maskandscale(False)
+        dst.set_auto_maskandscale(False)
+        dst.setncatts({k: src.getncattr(k) for k in src.ncattrs()})
+        for dim_name, dim in src.dimensions.items():
+            if dim_name == record_dim:
+                dst.createDimension(dim_name, None)
+            else:
+                dst.createDimension(dim_name, len(dim))
+        for var_name, var in src.variables.items():
+            attrs = {k: var.getncattr(k) for k in var.ncattrs()}
+            fill_value = attrs.pop('_FillValue', None)
+            new_var = dst.createVariable(var_name, var.datatype,
+                                         var.dimensions,
+                                         fill_value=fill_value)
+            new_var.setncatts(attrs)
+            # Copy across the variables that are not along the record dim
+            if record_dim not in var.dimensions:
+                new_var[:] = var[:]
+        # Pre-allocate the record dimension by writing its coordinate in full
+        if len(record_coords) == len(nc_files):
+            dst.variables[record_dim][:] = np.concatenate(record_coords)
+        # Now write the records of each file into its slice of the output
+        for n_file, nc_file in enumerate(nc_files):
+            logging.debug('Adding {} to {}'.format(nc_file, output_file))
+            with netCDF4.Dataset(nc_file, 'r') as src:
+                src.set_auto_maskandscale(False)
+                for var_name, var in src.variables.items():
+                    if (record_dim not in var.dimensions) or \
+                            (var_name == record_dim):
+                        continue
+                    if var_name not in dst.variables:
+                        logging.warning('{} not in {}, skipping'.format(
+                            var_name, nc_files[0]))
+                        continue
+                    idx = [slice(None)] * len(var.dimensions)
+                    idx[var.dimensions.index(record_dim)] = slice(
+                        offsets[n_file], offsets[n_file+1])
+                    dst.variables[var_name][tuple(idx)] = var[:]
+    logging.info('Combined {} files into {}'.format(len(nc_files),
+                                                    output_file))
+
+
 def get_folder(folder):
     """
     Get name of folder that contains ctm.bpch data from command line
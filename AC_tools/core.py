@@ -458,6 +458,227 @@ def get_latlonalt4res(res=None, centre=True, hPa=False, nest=None,
         return rtn_list
 
 
+def get_global_grid_edges4res(res='4x5'):
+    """
+    Get lon and lat edges of a global model grid (without any file I/O)
+
+    Parameters
+    ----------
+    res (str): resolution of the global model grid (e.g. '4x5')
+
+    Returns
+    -------
+    (tuple) of arrays for the edges of the lon and lat boxes
+
+    Notes
+    -----
+     - Grids with an extra latitude (e.g. 46 lats for 4x5) are taken to have
+     half-sized boxes at the poles (as GEOS-Chem's global grids)
+     - Nested grids cannot be inferred from the resolution alone, so their
+     edges must be provided explicitly (e.g. from get_latlonalt4res)
+    """
+    lon_dim, lat_dim = get_dims4res(res=res, just2D=True)
+    dlat, dlon = [float(i) for i in res.split('_')[0].split('x')]
+    err_msg = "Grid for res={} is not global, please provide its edges"
+    if abs((360. / lon_dim) - dlon) > 0.01:
+        logging.error(err_msg.format(res))
+        raise ValueError(err_msg.format(res))
+    dlon = 360. / lon_dim
+    # Regular grid (e.g. 0.083x0.083)
+    if abs((180. / lat_dim) - dlat) < 0.01:
+        dlat = 180. / lat_dim
+        lat_e = -90. + np.arange(lat_dim+1)*dlat
+        lon_e = -180. + np.arange(lon_dim+1)*dlon
+    # Grid with half-sized boxes at the poles (e.g. 4x5)
+    elif abs((180. / (lat_dim-1)) - dlat) < 0.01:
+        dlat = 180. / (lat_dim-1)
+        lat_e = -90. + (dlat/2) + np.arange(lat_dim-1)*dlat
+        lat_e = np.concatenate(([-90.], lat_e, [90.]))
+        lon_e = -180. - (dlon/2) + np.arange(lon_dim+1)*dlon
+    else:
+        logging.error(err_msg.format(res))
+        raise ValueError(err_msg.format(res))
+    return lon_e, lat_e
+
+
+# Grid box surface areas already calculated in this session (keyed by grid)
+_surface_area4grid = {}
+
+
+def calc_surface_area4grid(lon_e=None, lat_e=None, lon_c=None, lat_c=None,
+                           res=None, Re=6.375E6):
+    """
+    Calculate grid box surface areas (m2) for any regular or nested grid
+
+    Parameters
+    ----------
+    lon_e, lat_e (array): edges of lon and lat boxes, either 1D or 2D bounds
+        with dims of (lat, lon) (e.g. 'lon_b' and 'lat_b' of a xESMF grid)
+    lon_c, lat_c (array): centres of lon and lat boxes (used to estimate the
+        edges, if these are not provided)
+    res (str): resolution of a global model grid (used if no edges/centres
+        are provided, e.g. '4x5')
+    Re (float): radius of the Earth (m)
+
+    Returns
+    -------
+    (array) 2D array of surface areas with dims of (lon, lat), or (lat, lon)
+        if 2D bounds were provided
+
+    Notes
+    -----
+     - Uses the difference of sines approach of GEOS-Chem's grid_mod.F
+     (see calc_surface_area_in_grid), with the actual longitude extent of
+     each box, so nested grids are also supported.
+     - Areas are cached for each grid for the rest of the session
+    """
+    # Get the edges of the grid
+    if any([isinstance(i, type(None)) for i in (lon_e, lat_e)]):
+        if any([isinstance(i, type(None)) for i in (lon_c, lat_c)]):
+            lon_e, lat_e = get_global_grid_edges4res(res=res)
+        else:
+            lon_e, lat_e = [get_edges4centres(i) for i in (lon_c, lat_c)]
+    lon_e = np.asarray(lon_e, dtype=np.float64)
+    lat_e = np.clip(np.asarray(lat_e, dtype=np.float64), -90., 90.)
+    # Use previously calculated values for the grid
+    key = (lon_e.shape, lat_e.shape, lon_e.tobytes(), lat_e.tobytes(), Re)
+    if key in _surface_area4grid:
+        return _surface_area4grid[key].copy()
+    # Get the extent of the boxes in longitude (radians) and sin(latitude)
+    dlon = np.deg2rad(np.mod(np.diff(lon_e, axis=-1), 360.))
+    dsin_lat = np.abs(np.diff(np.sin(np.deg2rad(lat_e)), axis=0))
+    if lon_e.ndim == 1:
+        AREA = Re * Re * dlon[:, None] * dsin_lat[None, :]
+    else:
+        # Average the extents over the bounds of each box
+        dlon = (dlon[:-1, :] + dlon[1:, :]) / 2
+        dsin_lat = (dsin_lat[:, :-1] + dsin_lat[:, 1:]) / 2
+        AREA = Re * Re * dlon * dsin_lat
+    _surface_area4grid[key] = AREA
+    return AREA.copy()
+
+
+def get_edges4centres(centres):
+    """
+    Estimate the edges of grid boxes from their centres (mid-points)
+
+    Parameters
+    ----------
+    centres (array): 1D array of the centres of grid boxes
+
+    Returns
+    -------
+    (array)
+    """
+    centres = np.asarray(centres, dtype=np.float64)
+    mid_points = (centres[:-1] + centres[1:]) / 2
+    first = centres[0] - (mid_points[0] - centres[0])
+    last = centres[-1] + (centres[-1] - mid_points[-1])
+    return np.concatenate(([first], mid_points, [last]))
+
+
+def get_grouped_sums_and_weights(arr, labels, axis=-1, weights=None,
+                                 n_groups=None):
+    """
+    Get weighted sums (and sums of weights) for groups of an array in one pass
+
+    Parameters
+    ----------
+    arr (array): array (or masked array) of values to reduce
+    labels (array): integer group labels for the axes to reduce over (e.g. a
+        season number for each month, or a region number for each lon/lat
+        box). Negative labels are excluded from all groups. For groups that
+        overlap (e.g. 'Tropics' and 'NH'), provide a stack of 1/0 (or
+        boolean) memberships with the groups as the first dimension instead.
+    axis (int or tuple): axis (or axes) of arr that the labels are for
+    weights (array): weights (e.g. surface area) for the axes in "axis"
+    n_groups (int): number of groups (default = maximum label + 1)
+
+    Returns
+    -------
+    (tuple) of arrays of sums and sums of weights with dims of the remaining
+        axes of arr, plus the groups as the final dimension
+
+    Notes
+    -----
+     - masked values are given zero weight
+     - sums for integer labels are calculated with np.add.reduceat over the
+     data sorted by label, and for memberships via a single dot product
+    """
+    axis = np.atleast_1d(axis) % np.ndim(arr)
+    labels = np.asarray(labels)
+    # Move the axes to reduce over to the end and flatten them
+    other_axes = [i for i in range(np.ndim(arr)) if i not in axis]
+    shape = [np.shape(arr)[i] for i in other_axes]
+    group_shape = [np.shape(arr)[i] for i in axis]
+    N = int(np.prod(group_shape))
+    mask = np.ma.getmaskarray(arr).transpose(other_axes+list(axis))
+    data = np.ma.filled(arr, 0).transpose(other_axes+list(axis))
+    data = data.reshape((-1, N))
+    if isinstance(weights, type(None)):
+        weights = np.ones(group_shape)
+    weights = np.broadcast_to(weights, group_shape).reshape(N)
+    # Only give weight to the unmasked values
+    weights = ~mask.reshape((-1, N)) * weights[None, :]
+    data = data * weights
+    if labels.ndim == len(axis)+1:
+        # Overlapping groups - reduce via the membership matrix
+        members = labels.reshape((labels.shape[0], N)).astype(np.float64)
+        sums = np.dot(data, members.T)
+        wsums = np.dot(weights, members.T)
+    else:
+        labels = labels.reshape(N)
+        if isinstance(n_groups, type(None)):
+            n_groups = int(labels.max()) + 1
+        # Sort the data by group, then sum each contiguous group
+        order = np.argsort(labels, kind='stable')
+        order = order[labels[order] >= 0]
+        counts = np.bincount(labels[order], minlength=n_groups)[:n_groups]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        present = counts > 0
+        sums = np.zeros((data.shape[0], n_groups))
+        wsums = np.zeros((data.shape[0], n_groups))
+        if present.any():
+            sums[:, present] = np.add.reduceat(data[:, order],
+                                               starts[present], axis=1)
+            wsums[:, present] = np.add.reduceat(weights[:, order],
+                                                starts[present], axis=1)
+    shape = tuple(shape) + (sums.shape[-1],)
+    return sums.reshape(shape), wsums.reshape(shape)
+
+
+def get_grouped_reductions(arr, labels, axis=-1, weights=None, n_groups=None,
+                           how='mean'):
+    """
+    Get the (weighted) mean or sum for all groups of an array in one pass
+
+    Parameters
+    ----------
+    arr (array): array (or masked array) of values to reduce
+    labels (array): integer group labels, or a stack of group memberships
+        (see get_grouped_sums_and_weights)
+    axis (int or tuple): axis (or axes) of arr that the labels are for
+    weights (array): weights (e.g. surface area) for the axes in "axis"
+    n_groups (int): number of groups (default = maximum label + 1)
+    how (str): reduction to return ('mean' or 'sum')
+
+    Returns
+    -------
+    (np.ma.array) with dims of the remaining axes of arr, plus the groups as
+        the final dimension (groups without any unmasked values are masked)
+    """
+    sums, wsums = get_grouped_sums_and_weights(arr, labels, axis=axis,
+                                               weights=weights,
+                                               n_groups=n_groups)
+    empty = wsums == 0
+    if how == 'mean':
+        return np.ma.array(sums / np.where(empty, 1, wsums), mask=empty)
+    elif how == 'sum':
+        return np.ma.array(sums, mask=empty)
+    else:
+        raise ValueError("how must be 'mean' or 'sum' (not '{}')".format(how))
+
+
 def hPa_to_Km(input, reverse=False, debug=False):
     """
     convert hPa to km
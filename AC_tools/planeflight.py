@@ -109,7 +109,7 @@ def prt_PlaneFlight_files(df=None, LAT_var='LAT', LON_var='LON',
                           PRESS_var='PRESS', loc_var='TYPE',
                           Username='Tomas Sherwen',
                           Date_var='datetime', slist=None, num_tracers=85,
-                          Extra_spacings=False,
+                          Extra_spacings=False, n_workers=1,
                           verbose=False, debug=False):
     """
     Takes a dataframe of lats, lons, alts, and times and makes Planeflight.dat.*
@@ -126,6 +126,8 @@ def prt_PlaneFlight_files(df=None, LAT_var='LAT', LON_var='LON',
     Extra_spacings (bool): add extra spacing? (needed for large amounts of
         output, like nested grids)
     slist (list): list of tracers/species to output
+    n_workers (int): number of processes to use to write the files for each
+        day (default=1, serial; None=n CPUs)
 
     Notes
     -----
@@ -158,53 +160,28 @@ def prt_PlaneFlight_files(df=None, LAT_var='LAT', LON_var='LON',
         slist = slist + species + met_vars
     # Number of variables to output (needed for fortran read of *dat files)
     nvar = len(slist)
-    # --- work out how many (UTC) days in the output
-    # Get list of unique dates & remove mean from dates
-    dates = [datetime.datetime(*i.timetuple()[:3]) for i in df[Date_var]]
-    # Add list of just YYYYMMDD strings to dataframe
-    df['YYYYMMDD'] = [i.strftime('%Y%m%d') for i in dates]
-    # Get list of unique days
-    dates = np.ma.array(sorted(set(dates)))
-    # --- loop days and create the files
-    for date_ in dates:
-        # Get data for date
-        sub_df = df[df['YYYYMMDD'].values == date_.strftime('%Y%m%d')]
-        if verbose:
-            print('Entries for day ({}): '.format(date_), sub_df.shape)
-        # Create/Open up pf.dat setup
-        a = open('Planeflight.dat.'+date_.strftime('%Y%m%d'), 'w')
-        # Print out file headers to pf.dat file
-        print('Planeflight.dat -- input file for ND40 diagnostic GEOS_FP',
-              file=a)
-        print(Username, file=a)
-        print(strftime("%B %d %Y", gmtime()), file=a)
-        print('-----------------------------------------------', file=a)
-        print('{:<4}'.format(nvar), '! Number of variables to be output',
-              file=a)
-        print('-----------------------------------------------', file=a)
-        # Print out species for GEOS-Chem to output to pf.dat file
-        for n in range(0, len(slist)):
-            print(slist[n], file=a)
-        # Print out species for GEOS-Chem to output to pf.dat file
-        print('-------------------------------------------------', file=a)
-        print('Now give the times and locations of the flight', file=a)
-        print('-------------------------------------------------', file=a)
-        print('Point  Type DD-MM-YYYY HH:MM     LAT     LON   PRESS', file=a)
-        # Loop requested times
-        for n, time_ in enumerate(sub_df[Date_var]):
-            # Setup variable list to print
-            vars_ = [n+1, sub_df[loc_var].values[n], time_.day, time_.month]
-            vars_ += [time_.year, time_.hour, time_.minute]
-            # Extract lat, lon, and pressure for time
-            coord_vars = LAT_var, LON_var, PRESS_var
-            vars_ += [float(sub_df[i].values[n]) for i in coord_vars]
-            # Set formating
-            vars_ = pstr.format(*vars_)
-            # Print to file
-            print(vars_, file=a)
-        # Add footer to pf.dat file
-        print(endstr, file=a)
-        a.close()
+    # --- Setup the file headers
+    lines = [
+        'Planeflight.dat -- input file for ND40 diagnostic GEOS_FP', Username,
+        strftime("%B %d %Y", gmtime()),
+        '-----------------------------------------------',
+        '{:<4} ! Number of variables to be output'.format(nvar),
+        '-----------------------------------------------',
+    ]
+    # Species for GEOS-Chem to output to pf.dat file
+    lines += list(slist)
+    lines += [
+        '-------------------------------------------------',
+        'Now give the times and locations of the flight',
+        '-------------------------------------------------',
+        'Point  Type DD-MM-YYYY HH:MM     LAT     LON   PRESS',
+    ]
+    # --- Create the files for each (UTC) day
+    coord_vars = LAT_var, LON_var, PRESS_var
+    write_PlaneFlight_files4days(df=df, header_lines=lines, pstr=pstr,
+                                 endstr=endstr, loc_var=loc_var,
+                                 coord_vars=coord_vars, Date_var=Date_var,
+                                 n_workers=n_workers, verbose=verbose)
 
 
 def prt_PlaneFlight_files_v12_plus(df=None, LAT_var='LAT', LON_var='LON',
@@ -212,7 +189,7 @@ def prt_PlaneFlight_files_v12_plus(df=None, LAT_var='LAT', LON_var='LON',
                                    OBS_var='OBS',
                                    Date_var='datetime', slist=None,
                                    num_tracers=85, rxn_nums=[],
-                                   Extra_spacings=False,
+                                   Extra_spacings=False, n_workers=1,
                                    Username='Tomas Sherwen', verbose=False,
                                    debug=False):
     """
@@ -230,6 +207,8 @@ def prt_PlaneFlight_files_v12_plus(df=None, LAT_var='LAT', LON_var='LON',
     Extra_spacings (bool): add extra spacing? (needed for large amounts of
         output, like nested grids)
     slist (list): list of tracers/species to output
+    n_workers (int): number of processes to use to write the files for each
+        day (default=1, serial; None=n CPUs)
 
     Notes
     -----
@@ -276,136 +255,207 @@ def prt_PlaneFlight_files_v12_plus(df=None, LAT_var='LAT', LON_var='LON',
     except KeyError:
         fill_ALT_obs = 99999.00
         df[OBS_var] = fill_ALT_obs
-    # --- work out how many (UTC) days in the output
-    # Get list of unique dates & remove mean from dates
-    dates = [datetime.datetime(*i.timetuple()[:3]) for i in df[Date_var]]
+    # --- Setup the file headers
+    lines = [
+        'Planeflight.dat -- input file for ND40 diagnostic GEOS_FP', Username,
+        strftime("%B %d %Y", gmtime()),
+        '-----------------------------------------------',
+        '{:<4} ! Number of variables to be output'.format(nvar),
+        '-----------------------------------------------',
+    ]
+    # Species for GEOS-Chem to output to pf.dat file
+    lines += list(slist)
+    lines += [
+        '-------------------------------------------------',
+        'Now give the times and locations of the flight',
+        '-------------------------------------------------',
+    ]
+    header = [
+        'Point', 'Type', 'DD-MM-YYYY', 'HH:MM', 'LAT', 'LON', 'PRESS',
+        'OBS'
+    ]
+    h_pstr = '{:>5}{:>7} {:>10} {:>5}  {:>6} {:>7} {:>7} {:>10}'
+    lines += [h_pstr.format(*header)]
+    # --- Create the files for each (UTC) day
+    coord_vars = LAT_var, LON_var, PRESS_var, OBS_var
+    write_PlaneFlight_files4days(df=df, header_lines=lines, pstr=pstr,
+                                 endstr=endstr, loc_var=loc_var,
+                                 coord_vars=coord_vars, Date_var=Date_var,
+                                 n_workers=n_workers, verbose=verbose)
+
+
+def write_PlaneFlight_files4days(df=None, header_lines=None, pstr=None,
+                                 endstr=None, loc_var='TYPE',
+                                 coord_vars=('LAT', 'LON', 'PRESS'),
+                                 Date_var='datetime', n_workers=1,
+                                 verbose=False):
+    """
+    Write a Planeflight.dat.* file for each (UTC) day of locations in df
+
+    Parameters
+    -------
+    df (pd.DataFrame): dataframe of locations (see prt_PlaneFlight_files)
+    header_lines (list): lines to write at the top of each file (default=no
+        header lines)
+    pstr (str): format string for each point (number, location, day, month,
+        year, hour, minute, then the coord_vars)
+    endstr (str): line to write at the end of each file
+    loc_var (str): name for (e.g. plane name), could be more than one.
+    coord_vars (list): names of the coordinate variables (e.g. lat, lon)
+    Date_var (str): column name of df containing datetime (UTC) variables
+    n_workers (int): number of processes to use (default=1, serial; None=n
+        CPUs)
+
+    Returns
+    -------
+    (None)
+
+    Notes
+    -----
+     - The points are split into days with one groupby and the columns are
+     extracted once for each day, then all the lines for a day are formatted
+     (with pstr) in a single pass and written at once
+    """
+    if isinstance(header_lines, type(None)):
+        header_lines = []
+    times = pd.DatetimeIndex(df[Date_var])
     # Add list of just YYYYMMDD strings to dataframe
-    df['YYYYMMDD'] = [i.strftime('%Y%m%d') for i in dates]
-    # Get list of unique days
-    dates = np.ma.array(sorted(set(dates)))
-    # --- loop days and create the files
-    for date_ in dates:
-        # Get data for date
-        sub_df = df[df['YYYYMMDD'].values == date_.strftime('%Y%m%d')]
+    df['YYYYMMDD'] = times.strftime('%Y%m%d')
+    # Get the columns to print for each day
+    days = []
+    for day, inds in pd.Series(np.arange(df.shape[0])).groupby(
+            times.normalize()).indices.items():
+        times4day = times[inds]
+        columns = [list(range(1, len(inds)+1))]
+        columns += [df[loc_var].values[inds].tolist()]
+        columns += [times4day.day.tolist(), times4day.month.tolist(),
+                    times4day.year.tolist(), times4day.hour.tolist(),
+                    times4day.minute.tolist()]
+        columns += [df[i].values[inds].astype(float).tolist()
+                    for i in coord_vars]
+        filename = 'Planeflight.dat.'+day.strftime('%Y%m%d')
         if verbose:
-            print('Entries for day ({}): '.format(date_), sub_df.shape)
-        # Create/Open up pf.dat setup
-        a = open('Planeflight.dat.'+date_.strftime('%Y%m%d'), 'w')
-        # Print out file headers to pf.dat file
-        print('Planeflight.dat -- input file for ND40 diagnostic GEOS_FP',
-              file=a)
-        print(Username, file=a)
-        print(strftime("%B %d %Y", gmtime()), file=a)
-        print('-----------------------------------------------', file=a)
-        print('{:<4}'.format(nvar), '! Number of variables to be output',
-              file=a)
-        print('-----------------------------------------------', file=a)
-        # Print out species for GEOS-Chem to output to pf.dat file
-        for n in range(0, len(slist)):
-            print(slist[n], file=a)
-        # Print out species for GEOS-Chem to output to pf.dat file
-        print('-------------------------------------------------', file=a)
-        print('Now give the times and locations of the flight', file=a)
-        print('-------------------------------------------------', file=a)
-        header = [
-            'Point', 'Type', 'DD-MM-YYYY', 'HH:MM', 'LAT', 'LON', 'PRESS',
-            'OBS'
-        ]
-        h_pstr = '{:>5}{:>7} {:>10} {:>5}  {:>6} {:>7} {:>7} {:>10}'
-
-        print(h_pstr.format(*header), file=a)
-        # Loop requested times
-        for n, time_ in enumerate(sub_df[Date_var]):
-            # Setup variable list to print
-            vars_ = [n+1, sub_df[loc_var].values[n], time_.day, time_.month]
-            vars_ += [time_.year, time_.hour, time_.minute]
-            # Extract lat, lon, and pressure for time
-            coord_vars = LAT_var, LON_var, PRESS_var, OBS_var
-            vars_ += [float(sub_df[i].values[n]) for i in coord_vars]
-            # Set formating
-            vars_ = pstr.format(*vars_)
-            # Print to file
-            print(vars_, file=a)
-        # Add footer to pf.dat file
-        print(endstr, file=a)
-        a.close()
+            print('Entries for day ({}): '.format(day), len(inds))
+        days += [(filename, header_lines, columns, pstr, endstr)]
+    # Write the files
+    if len(days) > 1 and (n_workers != 1):
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            list(executor.map(write_PlaneFlight_file, *zip(*days)))
+    else:
+        [write_PlaneFlight_file(*i) for i in days]
 
 
-def get_pf_headers(file, debug=False):
+def write_PlaneFlight_file(filename, header_lines, columns, pstr, endstr):
+    """
+    Write a Planeflight.dat.* file from columns of values for its points
+
+    Parameters
+    -------
+    filename (str): name of file to write
+    header_lines (list): lines to write at the top of the file
+    columns (list): lists of values for each variable in pstr
+    pstr (str): format string for each point
+    endstr (str): line to write at the end of the file
+
+    Returns
+    -------
+    (None)
+    """
+    lines = list(header_lines) + list(map(pstr.format, *columns)) + [endstr]
+    with open(filename, 'w') as a:
+        a.write('\n'.join(lines)+'\n')
+
+
+def get_pf_headers(file, rtn_points=True, debug=False):
     """
     Extract column headers from a GEOS-Chem planeflight csv file
 
     Parameters
     -------
     file (str): filename to open
+    rtn_points (bool): also get the (unique) points in the file
     debug (bool): debug the function?
 
     Returns
     -------
     (list, list)
+
+    Notes
+    -----
+     - Only the header line (and the first column if rtn_points=True) is read
     """
     if debug:
         print(file)
-    # Open pf file
+    # Open pf file and just read the header line
     with open(file, 'r') as f:
-        Lines = [i for i in f]
-        names = Lines[0].strip().split()
-        points = [i.strip().split()[0] for i in Lines[1:]]
-#         reader = csv.reader(f, delimiter=' ', skipinitialspace=True)
-#         for row in f:
-#             if row[0] != 'POINT':
-#                 new = row[1:2][0]
-#                 try:
-#                     points.append(new)
-#                 except:
-#                     points = [new]
-#             else:
-#                 names = row[2:]
+        names = f.readline().strip().split()
+    points = []
+    if rtn_points:
+        points = pd.read_csv(file, header=None, skiprows=1, sep=r'\s+',
+                             usecols=[0], dtype=str)[0]
+        points = list(points.unique())
     if debug:
-        print(names, list(set(points)))
-    return names, list(set(points))
+        print(names, points)
+    return names, points
 
 
 def pf_csv2pandas(file=None, vars=None, epoch=False, r_vars=False,
-                  debug=False):
+                  usecols=None, dtype=np.float64, debug=False):
     """
     Planeflight.dat CSV reader - used for processor GEOS-Chem PF output
 
     Parameters
     -------
     file (str): file name (inc. directory)
-    vars (list): vars to extract
-    epoch (bool):
+    vars (list): names of the columns in the file (default = read from header)
+    epoch (bool): return the times as epoch (unix) time, not a datetime index
     r_vars (bool): return list of vars
+    usecols (list): only read these columns (the date/time are always read)
+    dtype (type): dtype to use for the numeric columns (e.g. np.float32)
 
     Returns
     -------
     (pd.DataFrame)
-    """
-    # Open file
-    with open(file, 'r') as f:
-        logging.debug(f)
-
-        # Label 1st column ( + LOC ) if names not in vars
-        # ( This effectively means that pandas arrays are the same )
-        if debug:
-            print([type(i) for i in (vars, ['POINT', 'LOC'])])
-        if 'POINT' not in vars:
-            names = ['POINT', 'LOC'] + vars[:-1]
-        else:
-            names = vars
-        if debug:
-            print(vars, names)
-        # Convert to pandas array
-        df = pd.read_csv(f, header=None, skiprows=1,
-                         delim_whitespace=True, names=names,
-                         dtype={'HHMM': str, 'YYYYMMDD': str, 'POINT': object}
-                         )
-        # Convert strings to datetime using pandas mapping
-        df = DF_YYYYMMDD_HHMM_2_dt(df, rmvars=None, epoch=epoch)
-        if debug:
-            print(df, df.shape)
 
+    Notes
+    -----
+     - The file is parsed with pandas' C parser (splitting on whitespace), only
+     reading the columns requested, and dates are converted vectorised
+    """
+    # Get the column names from the header line
+    if isinstance(vars, type(None)):
+        with open(file, 'r') as f:
+            vars = f.readline().strip().split()
+    # Label 1st column ( + LOC ) if names not in vars
+    # ( This effectively means that pandas arrays are the same )
+    if debug:
+        print([type(i) for i in (vars, ['POINT', 'LOC'])])
+    if 'POINT' not in vars:
+        names = ['POINT', 'LOC'] + vars[:-1]
+    else:
+        names = vars
+    if debug:
+        print(vars, names)
+    # Which columns to read? (always including the date and time)
+    str_vars = names[:2]
+    time_vars = ['YYYYMMDD', 'HHMM']
+    if not isinstance(usecols, type(None)):
+        usecols = [i for i in names if (i in usecols) or (i in time_vars)]
+    # Set the dtypes (strings for the point and location)
+    dtypes = dict([(i, dtype) for i in names])
+    dtypes.update(dict([(i, str) for i in str_vars]))
+    dtypes.update(dict([(i, np.int64) for i in time_vars]))
+    if not isinstance(usecols, type(None)):
+        dtypes = dict([(i, dtypes[i]) for i in usecols])
+    # Convert to pandas array
+    logging.debug(file)
+    df = pd.read_csv(file, header=None, skiprows=1, sep=r'\s+', engine='c',
+                     names=names, usecols=usecols, dtype=dtypes)
+    # Convert strings to datetime using pandas mapping
+    df = DF_YYYYMMDD_HHMM_2_dt(df, rmvars=None, epoch=epoch)
+    if debug:
+        print(df, df.shape)
     # Return pandas DataFrame
     if r_vars:
         return df, list(df.columns)
@@ -413,9 +463,34 @@ def pf_csv2pandas(file=None, vars=None, epoch=False, r_vars=False,
         return df
 
 
-def get_pf_from_folder(folder='./', dates2use=None, debug=False):
+def get_pf_from_folder(folder='./', dates2use=None, usecols=None,
+                       dtype=np.float64, sites=None, points=None, sdate=None,
+                       edate=None, n_workers=1, debug=False):
     """
     Get GEOS-Chem planeflight output from folder
+
+    Parameters
+    -------
+    folder (str): folder containing the planeflight output ("*plane.*")
+    dates2use (list): only use files for these dates
+    usecols (list): only read these columns (see pf_csv2pandas)
+    dtype (type): dtype to use for the numeric columns (e.g. np.float32)
+    sites (list): only include these sites/locations (e.g. 'CVO', 2nd column)
+    points (list): only include these points (str, 1st column)
+    sdate, edate (datetime): only include output between these dates
+    n_workers (int): number of processes to use (default=1, serial; None=n
+        CPUs)
+
+    Returns
+    -------
+    (pd.DataFrame)
+
+    Notes
+    -----
+     - files are selected as they are read (in parallel if n_workers != 1),
+     then concatenated once (with the same dtypes for all files)
+     - For n_workers != 1, call this from within a "if __name__ ==
+     '__main__':" block (processes are started by "spawn" on some platforms)
     """
     # Which files to use?
     files = list(sorted(glob.glob(folder+'/*plane.*')))
@@ -447,14 +522,232 @@ def get_pf_from_folder(folder='./', dates2use=None, debug=False):
         bool = df[dtVar].isin(dates2use)
         files = list(df.loc[bool, FileRootsVar].values)
     # Get headers
-    ALL_vars, sites = get_pf_headers(files[0], debug=debug)
+    ALL_vars, _ = get_pf_headers(files[0], rtn_points=False, debug=debug)
     # Extract dfs
-    dfs = [pf_csv2pandas(i, vars=ALL_vars) for i in files]
-    # Append the dataframes together
-    df = dfs[0].append(dfs[1:])
+    kwargs = {
+        'vars': ALL_vars, 'usecols': usecols, 'dtype': dtype, 'sites': sites,
+        'points': points, 'sdate': sdate, 'edate': edate,
+    }
+    if len(files) > 1 and (n_workers != 1):
+        import functools
+        from concurrent.futures import ProcessPoolExecutor
+        func = functools.partial(get_pf_selection4file, **kwargs)
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            dfs = list(executor.map(func, files))
+    else:
+        dfs = [get_pf_selection4file(i, **kwargs) for i in files]
+    # Combine the dataframes together (only once)
+    df = pd.concat(dfs)
     return df
 
 
+def get_pf_selection4file(file, vars=None, usecols=None, dtype=np.float64,
+                          sites=None, points=None, sdate=None, edate=None):
+    """
+    Read planeflight output from a file and select sites, points and dates
+
+    Parameters
+    -------
+    file (str): file name (inc. directory)
+    vars (list): names of the columns in the file (default = read from header)
+    usecols (list): only read these columns (see pf_csv2pandas)
+    dtype (type): dtype to use for the numeric columns (e.g. np.float32)
+    sites (list): only include these sites/locations (e.g. 'CVO', 2nd column)
+    points (list): only include these points (str, 1st column)
+    sdate, edate (datetime): only include output between these dates
+
+    Returns
+    -------
+    (pd.DataFrame)
+    """
+    if isinstance(vars, type(None)):
+        vars, _ = get_pf_headers(file, rtn_points=False)
+    # Names of the point and site columns (as in pf_csv2pandas)
+    PointVar, SiteVar = vars[:2] if ('POINT' in vars) else ['POINT', 'LOC']
+    # Also read the point/site columns, if selecting by these
+    if not isinstance(usecols, type(None)):
+        usecols = list(usecols)
+        if not isinstance(points, type(None)):
+            usecols += [PointVar]
+        if not isinstance(sites, type(None)):
+            usecols += [SiteVar]
+    df = pf_csv2pandas(file, vars=vars, usecols=usecols, dtype=dtype)
+    select = np.ones(df.shape[0], dtype=bool)
+    if not isinstance(points, type(None)):
+        select &= df[PointVar].isin(points).values
+    if not isinstance(sites, type(None)):
+        select &= df[SiteVar].isin(sites).values
+    if not isinstance(sdate, type(None)):
+        select &= (df.index >= sdate)
+    if not isinstance(edate, type(None)):
+        select &= (df.index <= edate)
+    if select.all():
+        return df
+    return df.loc[select]
+
+
+def mk_NetCDF_of_pf_files(files, filename='pf_output.nc', usecols=None,
+                          dtype=np.float32, by_site=False, n_workers=1,
+                          batch_size=1000000, complevel=4, verbose=True,
+                          debug=False):
+    """
+    Convert planeflight output files to a (compressed) NetCDF file
+
+    Parameters
+    -------
+    files (list): planeflight output files (in time order)
+    filename (str): name of NetCDF file to make (inc. directory)
+    usecols (list): only include these columns (see pf_csv2pandas)
+    dtype (type): dtype to use for the numeric columns (e.g. np.float32)
+    by_site (bool): save each site as a group, with a "time" dimension, rather
+        than as one table with a "POINT" dimension
+    n_workers (int): number of processes to use (default=1, serial; None=n
+        CPUs)
+    batch_size (int): number of rows (points) to write to the file at once
+    complevel (int): zlib compression level for the variables
+
+    Returns
+    -------
+    (None)
+
+    Notes
+    -----
+     - Files are read in order (see get_pf_selections4files) and the NetCDF
+     file is only opened once, with rows written in large batches (see
+     write_pf_df2NetCDF)
+     - Times are saved as "Epoch" (seconds since 1970-01-01) and the time
+     column as integers (e.g. 930 for HHMM='0930')
+    """
+    import contextlib
+    ALL_vars, _ = get_pf_headers(files[0], rtn_points=False, debug=debug)
+    kwargs = {'vars': ALL_vars, 'usecols': usecols, 'dtype': dtype}
+    SiteVar = ALL_vars[1] if ('POINT' in ALL_vars) else 'LOC'
+    if by_site and not isinstance(usecols, type(None)):
+        kwargs['usecols'] = list(usecols) + [SiteVar]
+    with contextlib.ExitStack() as stack:
+        executor = None
+        if len(files) > 1 and (n_workers != 1):
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=n_workers)
+            stack.enter_context(executor)
+        n_ahead = 2 * (n_workers or os.cpu_count() or 1)
+        dfs = get_pf_selections4files(files, executor=executor,
+                                      n_ahead=n_ahead, **kwargs)
+        # Setup the NetCDF file and write the output in batches
+        ncfile = stack.enter_context(Dataset(filename, 'w', format='NETCDF4'))
+        ncfile.Description = 'planeflight output ({} files)'.format(len(files))
+        batch = []
+        for n, df in enumerate(dfs):
+            batch += [df]
+            if (sum([len(i) for i in batch]) >= batch_size) or \
+                    (n == len(files)-1):
+                df = pd.concat(batch)
+                batch = []
+                if by_site:
+                    for site, df_site in df.groupby(SiteVar, sort=False):
+                        if site not in ncfile.groups:
+                            ncfile.createGroup(site)
+                        group = ncfile.groups[site]
+                        df_site = df_site.drop(columns=SiteVar)
+                        write_pf_df2NetCDF(group, df_site, dim='time',
+                                           complevel=complevel)
+                else:
+                    write_pf_df2NetCDF(ncfile, df, dim='POINT',
+                                       complevel=complevel)
+                if verbose:
+                    print('Written {} of {} files'.format(n+1, len(files)))
+
+
+def write_pf_df2NetCDF(ncfile, df, dim='POINT', complevel=4):
+    """
+    Append planeflight output (from pf_csv2pandas) to a NetCDF file (or group)
+
+    Parameters
+    -------
+    ncfile (netCDF4.Dataset): open NetCDF file (or group) to append to
+    df (pd.DataFrame): planeflight output with a datetime index
+    dim (str): name of the (unlimited) dimension for the rows
+    complevel (int): zlib compression level for the variables
+
+    Returns
+    -------
+    (None)
+    """
+    # Add the times in seconds since 1970-01-01
+    epoch0 = np.datetime64('1970-01-01T00:00:00', 's')
+    data = {'Epoch': (df.index.values.astype('datetime64[s]') - epoch0)}
+    data['Epoch'] = data['Epoch'].astype('i8')
+    for var in df.columns:
+        if var == 'Datetime':
+            continue
+        values = df[var].to_numpy()
+        if var == 'HHMM':
+            values = values.astype(np.int64)
+        elif not np.issubdtype(values.dtype, np.number):
+            values = values.astype(object)
+        data[var] = values
+    # Setup the dimension and variables for the first rows
+    if dim not in ncfile.dimensions:
+        ncfile.createDimension(dim, None)
+        for var, values in data.items():
+            if values.dtype == object:
+                ncfile.createVariable(var, str, (dim,))
+            else:
+                ncfile.createVariable(var, values.dtype, (dim,), zlib=True,
+                                      complevel=complevel,
+                                      chunksizes=(2**16,))
+        ncfile['Epoch'].units = 'seconds since 1970-01-01 00:00:00'
+    # Append the rows
+    start = len(ncfile.dimensions[dim])
+    for var, values in data.items():
+        ncfile[var][start:start+len(values)] = values
+
+
+def get_pf_selections4files(files, executor=None, n_ahead=None, **kwargs):
+    """
+    Read planeflight output from files in order (see get_pf_selection4file)
+
+    Parameters
+    -------
+    files (list): planeflight output files
+    executor (concurrent.futures.Executor): pool to read the files with
+        (default = read the files in this process)
+    n_ahead (int): maximum number of files to read ahead of those used
+        (default = twice the number of CPUs)
+    kwargs (dict): arguments for get_pf_selection4file
+
+    Returns
+    -------
+    (generator) of pd.DataFrames
+
+    Notes
+    -----
+     - Only n_ahead files are submitted to executor at once, so the output
+     held in memory is bounded (unlike executor.map)
+    """
+    if isinstance(executor, type(None)):
+        for file in files:
+            yield get_pf_selection4file(file, **kwargs)
+        return
+    import collections
+    import functools
+    if isinstance(n_ahead, type(None)):
+        n_ahead = 2 * (os.cpu_count() or 1)
+    func = functools.partial(get_pf_selection4file, **kwargs)
+    files = iter(files)
+    futures = collections.deque()
+    for file in files:
+        futures.append(executor.submit(func, file))
+        if len(futures) >= n_ahead:
+            break
+    while len(futures) > 0:
+        df = futures.popleft().result()
+        for file in files:
+            futures.append(executor.submit(func, file))
+            break
+        yield df
+
+
 def get_pf_data_from_NetCDF_table(ncfile=None, req_var='TRA_69', spec='IO',
                                   loc='CVO', start=None, end=None, ver='1.7',
                                   sdate=None, edate=None,
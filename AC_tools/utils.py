@@ -214,6 +214,110 @@ def find_nearest(array, value):
     return idx
 
 
+def find_nearest4values(array, values):
+    """
+    Find the indices of the nearest numbers in an array for many values
+
+    Parameters
+    -------
+    array (np.array): 1D array in which to search for nearest values
+    values (np.array): values to search array for closest points
+
+    Returns
+    -------
+    (np.array)
+
+    Notes
+    -------
+     - This gives the same indices as calling find_nearest for each value
+     (inc. the first index for ties), but uses a binary search of the sorted
+     array, so works for millions of values
+     - Arrays of np.datetime64 values are also supported
+    """
+    array = np.asarray(array).ravel()
+    values = np.asarray(values).ravel()
+    if np.issubdtype(array.dtype, np.datetime64):
+        array = array.astype('datetime64[ns]').astype(np.float64)
+        values = values.astype('datetime64[ns]').astype(np.float64)
+    array = array.astype(np.float64)
+    values = values.astype(np.float64)
+    if array.size == 1:
+        return np.zeros(values.shape, dtype=np.int64)
+    order = np.argsort(array, kind='stable')
+    sorted_ = array[order]
+    # Indices (in sorted array) of the values either side of each value
+    hi = np.clip(np.searchsorted(sorted_, values), 0, len(sorted_)-1)
+    lo = np.clip(np.searchsorted(sorted_, values) - 1, 0, len(sorted_)-1)
+    # (use the first of any repeated values)
+    lo = np.searchsorted(sorted_, sorted_[lo])
+    dist_lo = np.abs(values - sorted_[lo])
+    dist_hi = np.abs(values - sorted_[hi])
+    idx = np.where(dist_lo < dist_hi, order[lo], order[hi])
+    ties = dist_lo == dist_hi
+    idx[ties] = np.minimum(order[lo], order[hi])[ties]
+    # NaNs give the first index (as with np.argmin)
+    idx[np.isnan(values)] = 0
+    return idx
+
+
+def get_linear_idx_and_weights(array, values, log=False, period=None):
+    """
+    Get the indices and weights to linearly interpolate an array to values
+
+    Parameters
+    -------
+    array (np.array): 1D (monotonic) array of coordinates to interpolate from
+    values (np.array): values to interpolate to
+    log (bool): interpolate linearly in log(values) (e.g. for pressure)
+    period (float): period of a cyclic coordinate (e.g. 360 for a global
+        longitude grid), values between the last and first elements of
+        the array are then interpolated between these two (wrapped) elements
+
+    Returns
+    -------
+    (np.array, np.array) of indices and weights, both with shape (N, 2)
+
+    Notes
+    -------
+     - values outside of the array are given the edge value (unless period
+     is given)
+     - Arrays of np.datetime64 values are also supported
+    """
+    array = np.asarray(array).ravel()
+    values = np.asarray(values).ravel()
+    if np.issubdtype(array.dtype, np.datetime64):
+        array = array.astype('datetime64[ns]').astype(np.float64)
+        values = values.astype('datetime64[ns]').astype(np.float64)
+    array = array.astype(np.float64)
+    values = values.astype(np.float64)
+    if log:
+        array, values = np.log(array), np.log(values)
+    idx = np.zeros(values.shape+(2,), dtype=np.int64)
+    weights = np.zeros(values.shape+(2,))
+    weights[:, 0] = 1.
+    if array.size == 1:
+        return idx, weights
+    # Use an ascending array
+    descending = array[0] > array[-1]
+    if descending:
+        array = array[::-1]
+    N = len(array)
+    if period is None:
+        values = np.clip(values, array[0], array[-1])
+    else:
+        # Wrap values onto the array, which is extended by one period
+        values = array[0] + np.mod(values - array[0], period)
+        array = np.append(array, array[0] + period)
+    lo = np.clip(np.searchsorted(array, values, side='right') - 1, 0,
+                 len(array)-2)
+    frac = (values - array[lo]) / (array[lo+1] - array[lo])
+    idx[:, 0], idx[:, 1] = lo, (lo+1) % N
+    weights[:, 0], weights[:, 1] = 1. - frac, frac
+    if descending:
+        idx = N - 1 - idx
+    return idx, weights
+
+
 def get_suffix(n):
     """
     Add the appropriate suffix (th/st/rd) to any number given
@@ -1545,6 +1649,40 @@ def get_avg_2D_conc_of_X_weighted_by_Y(ds, Xvar=None, Yvar='AREA', Yda=None):
     return float((ds[Xvar]*Yda).sum() / Yda.sum())
 
 
+def add_AREA2ds(ds, LonVar='lon', LatVar='lat', LonBVar='lon_b',
+                LatBVar='lat_b', AreaVar='AREA'):
+    """
+    Add the surface area (m2) of the grid boxes of a dataset as a variable
+
+    Parameters
+    ----------
+    ds (xr.Dataset): dataset on a regular or nested lon/lat grid
+    LonVar, LatVar (str): names of the lon and lat coordinates in ds
+    LonBVar, LatBVar (str): names of 2D lon and lat bounds in ds (e.g. as on
+        a xESMF grid), used instead of the coordinates if present
+    AreaVar (str): name to give the surface area variable
+
+    Returns
+    -------
+    (xr.Dataset)
+
+    Notes
+    -----
+     - Areas are calculated (and cached) for the grid by calc_surface_area4grid,
+     so no reference files are needed (e.g. for GEOS-CF or regridded output)
+    """
+    if (LonBVar in ds) and (LatBVar in ds):
+        AREA = calc_surface_area4grid(lon_e=ds[LonBVar].values,
+                                      lat_e=ds[LatBVar].values)
+    else:
+        AREA = calc_surface_area4grid(lon_c=ds[LonVar].values,
+                                      lat_c=ds[LatVar].values).T
+    ds[AreaVar] = xr.DataArray(AREA, dims=(LatVar, LonVar),
+                               attrs={'units': 'm2',
+                                      'long_name': 'Surface area of grid box'})
+    return ds
+
+
 def write_lines2txt_file(lines, folder=None, filename=None):
     """
     Write out provided lines to text file
@@ -1593,6 +1731,10 @@ def calc_4D_idx_in_ds(ds=None, df=None, LonVar='lon', LatVar='lat',
     Returns
     -------
     (dict)
+
+    Notes
+    -----
+     - The indexes are arrays of the nearest indexes (see find_nearest4values)
     """
     # Get arrays of the coordinate variables in the dataset
     if isinstance(ds_lat, type(None)):
@@ -1603,21 +1745,81 @@ def calc_4D_idx_in_ds(ds=None, df=None, LonVar='lon', LatVar='lat',
         ds_hPa = ds[dsAltVar].values
     if isinstance(ds_time, type(None)):
         ds_time = ds[dsTimeVar].values
-    # Calculate the index individually by coordinate
-    lat_idx = [find_nearest(ds_lat, i) for i in df[LatVar].values]
-    lon_idx = [find_nearest(ds_lon, i) for i in df[LonVar].values]
-    hPa_idx = [find_nearest(ds_hPa, i) for i in df[AltVar].values]
-    time_idx = [find_nearest(ds_time, i) for i in df.index.values]
+    # Calculate the index by coordinate (for all locations at once)
+    lat_idx = find_nearest4values(ds_lat, df[LatVar].values)
+    lon_idx = find_nearest4values(ds_lon, df[LonVar].values)
+    hPa_idx = find_nearest4values(ds_hPa, df[AltVar].values)
+    time_idx = find_nearest4values(ds_time, df.index.values)
     # Return a dictionary of the values
     d = {LatVar: lat_idx, LonVar: lon_idx, TimeVar: time_idx, AltVar: hPa_idx}
     return d
 
 
+def calc_4D_weights_in_ds(ds=None, df=None, LonVar='lon', LatVar='lat',
+                          TimeVar='time', AltVar='hPa', dsAltVar='lev',
+                          dsLonVar='lon', dsLatVar='lat', dsTimeVar='time',
+                          ds_lat=None, ds_lon=None, ds_hPa=None, ds_time=None,
+                          debug=False):
+    """
+    Calculate the 4D indexes and weights to interpolate a dataset to locations
+
+    Parameters
+    ----------
+    (As for calc_4D_idx_in_ds)
+
+    Returns
+    -------
+    (dict, np.array) of the indexes of the 16 surrounding boxes of each location
+        for each coordinate (as for calc_4D_idx_in_ds, with shape (N, 16)) and
+        the weights for these boxes (shape (N, 16))
+
+    Notes
+    -----
+     - Interpolation is bilinear in lon/lat, linear in log(pressure) in the
+     vertical and linear in time (the weights for each location sum to 1)
+     - Longitudes of global grids wrap around (e.g. across the dateline)
+    """
+    # Get arrays of the coordinate variables in the dataset
+    if isinstance(ds_lat, type(None)):
+        ds_lat = ds[dsLatVar].values
+    if isinstance(ds_lon, type(None)):
+        ds_lon = ds[dsLonVar].values
+    if isinstance(ds_hPa, type(None)):
+        ds_hPa = ds[dsAltVar].values
+    if isinstance(ds_time, type(None)):
+        ds_time = ds[dsTimeVar].values
+    # Longitude is cyclic for global grids
+    lon_period = None
+    if (len(ds_lon) > 1) and np.isclose(
+            len(ds_lon)*np.abs(ds_lon[1]-ds_lon[0]), 360.):
+        lon_period = 360.
+    # Get the indexes and weights by coordinate
+    coords = [
+        (LatVar, ds_lat, df[LatVar].values, False, None),
+        (LonVar, ds_lon, df[LonVar].values, False, lon_period),
+        (AltVar, ds_hPa, df[AltVar].values, True, None),
+        (TimeVar, ds_time, df.index.values, False, None),
+    ]
+    d = {}
+    weights = np.ones((df.shape[0], 1))
+    for n, (var, array, values, log, period) in enumerate(coords):
+        idx, w = get_linear_idx_and_weights(array, values, log=log,
+                                            period=period)
+        # Combine with the other coordinates (giving 2**(n+1) boxes)
+        for var_ in d:
+            d[var_] = np.repeat(d[var_], 2, axis=1)
+        d[var] = np.tile(idx, (1, 2**n))
+        weights = (weights[:, :, None] * w[:, None, :]).reshape(
+            weights.shape[0], -1)
+    return d, weights
+
+
 def extract_ds4df_locs(ds=None, df=None, LonVar='lon', LatVar='lat',
                        TimeVar='time',
                        AltVar='hPa', dsAltVar='hPa',
                        dsLonVar='lon', dsLatVar='lat', dsTimeVar='time',
-                       vars2extract=None, debug=False, testing_mode=False):
+                       dsLevDim='lev', vars2extract=None, n_times4chunk=None,
+                       method='nearest', debug=False, testing_mode=False):
     """
     Extract a xr.Dataset as for given locations (aka offline planeflight)
 
@@ -1631,53 +1833,266 @@ def extract_ds4df_locs(ds=None, df=None, LonVar='lon', LatVar='lat',
     dsLatVar (str): Variable name in dataset for latitude
     AltVar (str): Variable name in DataFrame for pressure (hPa)
     dsAltVar (str): Variable name in dataset for pressure (hPa)
+    dsLevDim (str): name of the vertical dimension in the dataset
     TimeVar (str): Variable name in DataFrame for time
     dsTimeVar (str): Variable name in dataset for time
+    n_times4chunk (int): number of model times to load at once (default=all)
+    method (str): 'nearest' (neighbour) or 'linear' interpolation (see
+        calc_4D_weights_in_ds)
 
     Returns
     -------
     (pd.DataFrame)
+
+    Notes
+    -----
+     - All variables are extracted for all locations at once (with pointwise
+     indexing), or for the locations in each chunk of model times if
+     n_times4chunk is set (e.g. for datasets that do not fit in memory)
+     - There is a row for each location (in the same order as df)
+     - The model coordinates ("ds-lat", ...) are only included for 'nearest'
     """
-    # Check the DataFrame index is datetime.datetime
-    ass_str = 'WARNING: DataFrame index is not of datetime.datetime dtype'
-#    assert df.index.dtype == datetime.datetime, ass_str
     # Extract all of the data variables unless a specific list is provided
     if isinstance(vars2extract, type(None)):
         vars2extract = list(ds.data_vars)
-    # - Create a data frame for values
-    dfN = pd.DataFrame()
-    # get indexes en masse then extract with these
-    d = calc_4D_idx_in_ds(ds=ds, df=df, LonVar=LonVar, LatVar=LatVar,
-                          TimeVar=TimeVar, AltVar=AltVar, dsAltVar=dsAltVar,
-                          dsLonVar=dsLonVar, dsLatVar=dsLatVar,
-                          dsTimeVar=dsTimeVar)
-    # Loop by timestamp
-    times2use = df.index.values
-    for n, time in enumerate(times2use):
-        # get the times for a specific data
-        lat_idx = d[LatVar][n]
-        lon_idx = d[LonVar][n]
-        lev_idx = d[AltVar][n]
-        time_idx = d[TimeVar][n]
-        # en masse extract indexes
-        ds_tmp = ds.isel(lat=lat_idx, lon=lon_idx, time=time_idx,
-                         lev=lev_idx)
-        vals = [ds_tmp[i].data for i in vars2extract]
-        vals = np.array(vals)
-        for nval, val in enumerate(vals):
-            dfN.loc[vars2extract[nval], time] = vals[nval]
-        # Add the model position coordinates...
-        dfN.loc['ds-lat', time] = float(ds_tmp['lat'].values)
-        dfN.loc['ds-lon', time] = float(ds_tmp['lon'].values)
-        dfN.loc['ds-lev', time] = float(ds_tmp['lev'].values)
-        dfN.loc['ds-time', time] = float(ds_tmp['time'].values)
-        del ds_tmp, vals
-    # Make datetime the index
-    dfN = dfN.transpose()
+    # get indexes (and weights) en masse then extract with these
+    idx, weights = get_ds_idx4df_locs(
+        ds=ds, df=df, LonVar=LonVar, LatVar=LatVar, TimeVar=TimeVar,
+        AltVar=AltVar, dsAltVar=dsAltVar, dsLonVar=dsLonVar,
+        dsLatVar=dsLatVar, dsTimeVar=dsTimeVar, dsLevDim=dsLevDim,
+        method=method)
+    # Extract the values (for chunks of model times?)
+    if isinstance(n_times4chunk, type(None)):
+        n_times4chunk = ds[dsTimeVar].shape[0]
+    time_idx = idx[dsTimeVar].reshape(df.shape[0], -1).min(axis=-1)
+    dfs = []
+    for start in range(0, ds[dsTimeVar].shape[0], n_times4chunk):
+        end = start + n_times4chunk
+        points = np.where((time_idx >= start) & (time_idx < end))[0]
+        if len(points) == 0:
+            continue
+        # (inc. the next time for interpolation)
+        ds_tmp = ds[vars2extract].isel({dsTimeVar: slice(start, end+1)})
+        idx_tmp = dict([(i, idx[i][points]) for i in idx])
+        idx_tmp[dsTimeVar] = idx_tmp[dsTimeVar] - start
+        weights_tmp = None
+        if not isinstance(weights, type(None)):
+            weights_tmp = weights[points]
+        dfs += [extract_ds4idx(ds_tmp, idx_tmp, index=points,
+                               weights=weights_tmp)]
+    dfN = pd.concat(dfs).sort_index()
+    dfN.index = df.index
+    # Rename the model position coordinates...
+    dfN = dfN.rename(columns={
+        dsLatVar: 'ds-lat', dsLonVar: 'ds-lon', dsLevDim: 'ds-lev',
+        dsTimeVar: 'ds-time'
+    })
     # Save the datetime as a column too
     dfN['Datetime'] = dfN.index.values
-    # Update the model datetime to be in datetime units
-    dfN['ds-time'] = pd.to_datetime(dfN['ds-time'].values)
+    return dfN
+
+
+def get_ds_idx4df_locs(ds=None, df=None, LonVar='lon', LatVar='lat',
+                       TimeVar='time', AltVar='hPa', dsAltVar='hPa',
+                       dsLonVar='lon', dsLatVar='lat', dsTimeVar='time',
+                       dsLevDim='lev', method='nearest', ds_lat=None,
+                       ds_lon=None, ds_hPa=None, ds_time=None):
+    """
+    Get the indexes (and weights) of a dataset's dimensions for locations
+
+    Parameters
+    ----------
+    (As for extract_ds4df_locs, and)
+    ds_lat, ds_lon, ds_hPa, ds_time (np.array): arrays of the dataset's
+        coordinates (default = read from ds, see calc_4D_idx_in_ds)
+
+    Returns
+    -------
+    (dict, np.array) of the indexes by dimension of the dataset (for use with
+        extract_ds4idx) and the weights of the boxes for 'linear' (or None)
+    """
+    kwargs = {
+        'ds': ds, 'df': df, 'LonVar': LonVar, 'LatVar': LatVar,
+        'TimeVar': TimeVar, 'AltVar': AltVar, 'dsAltVar': dsAltVar,
+        'dsLonVar': dsLonVar, 'dsLatVar': dsLatVar, 'dsTimeVar': dsTimeVar,
+        'ds_lat': ds_lat, 'ds_lon': ds_lon, 'ds_hPa': ds_hPa,
+        'ds_time': ds_time,
+    }
+    weights = None
+    if method == 'linear':
+        d, weights = calc_4D_weights_in_ds(**kwargs)
+    else:
+        d = calc_4D_idx_in_ds(**kwargs)
+    idx = {
+        dsLatVar: d[LatVar], dsLonVar: d[LonVar], dsLevDim: d[AltVar],
+        dsTimeVar: d[TimeVar],
+    }
+    return idx, weights
+
+
+def extract_ds4df_locs2NetCDF(ds=None, df=None, filename='ds4df_locs.nc',
+                              LonVar='lon', LatVar='lat', TimeVar='time',
+                              AltVar='hPa', dsAltVar='hPa', dsLonVar='lon',
+                              dsLatVar='lat', dsTimeVar='time',
+                              dsLevDim='lev', vars2extract=None,
+                              n_times4chunk=1, method='nearest',
+                              complevel=4, verbose=True, debug=False):
+    """
+    Extract a xr.Dataset for (very many) locations and save these to NetCDF
+
+    Parameters
+    ----------
+    (As for extract_ds4df_locs, and)
+    filename (str): name of NetCDF file to save (inc. directory)
+    n_times4chunk (int): number of model times to load at once
+    complevel (int): zlib compression level for the variables
+
+    Returns
+    -------
+    (None)
+
+    Notes
+    -----
+     - Only the (first) model time needed by each location is calculated
+     up front. The locations are then sorted by time and the model times are
+     loaded a chunk at a time. The indexes (and weights) for the locations in
+     each chunk are calculated (from the dataset's coordinates, so dsAltVar
+     need not be in vars2extract) and their values extracted (as for
+     extract_ds4df_locs) and appended to the file. So only one chunk of the
+     model output (and its locations) is in memory at once.
+     - The rows in the file are in time order, with their position in df saved
+     as "point" and their times as "Epoch" (seconds since 1970-01-01)
+    """
+    from netCDF4 import Dataset
+    # Extract all of the data variables unless a specific list is provided
+    if isinstance(vars2extract, type(None)):
+        vars2extract = list(ds.data_vars)
+    # Get the coordinates of the dataset (for the indexes of each chunk)
+    coords = {
+        'ds_lat': ds[dsLatVar].values, 'ds_lon': ds[dsLonVar].values,
+        'ds_hPa': ds[dsAltVar].values, 'ds_time': ds[dsTimeVar].values,
+    }
+    ds_time = coords['ds_time']
+    # Sort the locations by time and get the (first) model time needed
+    order = np.argsort(df.index.values, kind='stable')
+    if method == 'linear':
+        time_idx, _ = get_linear_idx_and_weights(ds_time, df.index.values)
+        time_idx = time_idx.min(axis=-1)[order]
+    else:
+        time_idx = find_nearest4values(ds_time, df.index.values)[order]
+    with Dataset(filename, 'w', format='NETCDF4') as ncfile:
+        for start in range(0, len(ds_time), n_times4chunk):
+            end = start + n_times4chunk
+            # Locations for these model times (these are sorted by time)
+            first, last = np.searchsorted(time_idx, [start, end])
+            if first == last:
+                continue
+            points = order[first:last]
+            # Get the indexes (and weights) for just these locations
+            idx, weights = get_ds_idx4df_locs(
+                df=df.iloc[points], LonVar=LonVar, LatVar=LatVar,
+                TimeVar=TimeVar, AltVar=AltVar, dsLonVar=dsLonVar,
+                dsLatVar=dsLatVar, dsTimeVar=dsTimeVar, dsLevDim=dsLevDim,
+                method=method, **coords)
+            idx[dsTimeVar] = idx[dsTimeVar] - start
+            # Load the model times needed (inc. the next for interpolation)
+            ds_tmp = ds[vars2extract].isel({dsTimeVar: slice(start, end+1)})
+            dfN = extract_ds4idx(ds_tmp.load(), idx, index=df.index[points],
+                                 weights=weights)
+            # Rename the model position coordinates (as extract_ds4df_locs)
+            dfN = dfN.rename(columns={
+                dsLatVar: 'ds-lat', dsLonVar: 'ds-lon', dsLevDim: 'ds-lev',
+                dsTimeVar: 'ds-time'
+            })
+            dfN['point'] = points
+            append_df2NetCDF(ncfile, dfN, complevel=complevel)
+            if verbose:
+                PrtStr = 'Saved {} locations for model times {}-{} (of {})'
+                print(PrtStr.format(len(points), start, end, len(ds_time)))
+            del ds_tmp, dfN, idx, weights
+
+
+def append_df2NetCDF(ncfile, df, dim='point', complevel=4):
+    """
+    Append the columns of a dataframe (with a datetime index) to a NetCDF file
+
+    Parameters
+    ----------
+    ncfile (netCDF4.Dataset): open NetCDF file (or group) to append to
+    df (pd.DataFrame): dataframe of numeric (or datetime) columns
+    dim (str): name of the (unlimited) dimension for the rows
+    complevel (int): zlib compression level for the variables
+
+    Returns
+    -------
+    (None)
+
+    Notes
+    -----
+     - The index and any datetime columns are saved as seconds since
+     1970-01-01 (the index as "Epoch")
+    """
+    epoch0 = np.datetime64('1970-01-01T00:00:00', 's')
+    data = {'Epoch': df.index.values}
+    data.update(dict([(i, df[i].values) for i in df.columns]))
+    for var, values in data.items():
+        if np.issubdtype(values.dtype, np.datetime64):
+            values = (values.astype('datetime64[s]') - epoch0).astype('i8')
+            data[var] = values
+    # Setup the dimension and variables for the first rows
+    if dim not in ncfile.dimensions:
+        ncfile.createDimension(dim, None)
+        for var, values in data.items():
+            ncvar = ncfile.createVariable(var, values.dtype, (dim,), zlib=True,
+                                          complevel=complevel,
+                                          chunksizes=(2**16,))
+            if np.issubdtype(df.index.values.dtype, np.datetime64) and \
+                    (var == 'Epoch'):
+                ncvar.units = 'seconds since 1970-01-01 00:00:00'
+            elif (var in df.columns) and np.issubdtype(df[var].dtype,
+                                                       np.datetime64):
+                ncvar.units = 'seconds since 1970-01-01 00:00:00'
+    # Append the rows
+    start = len(ncfile.dimensions[dim])
+    for var, values in data.items():
+        ncfile[var][start:start+len(values)] = values
+
+
+def extract_ds4idx(ds, idx, index=None, weights=None, dim='point'):
+    """
+    Extract the values of a dataset at (pointwise) indexes
+
+    Parameters
+    ----------
+    ds (xr.dataset): dataset to extract from
+    idx (dict): dictionary of dimension names and arrays of indexes
+    index (array): index to use for the returned dataframe
+    weights (np.array): weights of the boxes for each point, if the index
+        arrays have a 2nd dimension of boxes to combine (e.g. for
+        interpolation - see calc_4D_weights_in_ds). Points with a NaN in
+        any (weighted) box are returned as NaN.
+    dim (str): name of dimension to use for the points
+
+    Returns
+    -------
+    (pd.DataFrame) of values (and the dataset's coordinates if no weights)
+        for each point
+    """
+    dims = (dim,) if isinstance(weights, type(None)) else (dim, 'box')
+    indexers = dict([(i, xr.DataArray(idx[i], dims=dims)) for i in idx])
+    ds_tmp = ds.isel(indexers, missing_dims='ignore').load()
+    dfN = pd.DataFrame(index=index)
+    if isinstance(weights, type(None)):
+        for var in list(ds_tmp.data_vars) + [i for i in idx if i in ds_tmp]:
+            dfN[var] = ds_tmp[var].values
+    else:
+        # Gather the values of all the boxes for each point, then weight them
+        # (NaNs in boxes used for a point give NaN, as with xr.interp, but
+        # boxes with no weight are ignored)
+        weights = xr.DataArray(weights, dims=dims)
+        for var in list(ds_tmp.data_vars):
+            da = ds_tmp[var].where(weights > 0, 0.)
+            dfN[var] = (da * weights).sum(dim='box', skipna=False).values
     return dfN
 
 
@@ -96,6 +96,8 @@ def main(folder=None, print_formatted_KPP_file=True, GC_version=None,
     Hv_dict.index = Hv_dict.index + Gas_dict.shape[0] + Het_dict.shape[0]
     rxn_dicts['Heterogeneous'] = Het_dict
     rxn_dicts['Photolysis'] = Hv_dict
+    # Index the species in the reactions (to find reactions for tagging)
+    rxn_index = AC.get_KPP_species_index(rxn_dicts=rxn_dicts)
 
     # - Print out input KPP files with updated formatting (prior to tagging)
     # (Uniform formatting required for parsing - this step may not be required)
@@ -107,7 +109,9 @@ def main(folder=None, print_formatted_KPP_file=True, GC_version=None,
 
     # - Get outputted KPP files and process these...
     # Get outputted KPP mechanism
-    KPP_mech = AC.get_dict_of_KPP_mech(wd=folder, GC_version=GC_version)
+    KPP_mech = AC.get_KPP_mechanism(wd=folder, GC_version=GC_version)
+    KPP_mech_index = KPP_mech.rxn_index
+    KPP_mech = dict(KPP_mech.RR_dict)
 
     # ---------------------- Tagging of KPP Mechanism
     # Initialise dictionary to store tags used for reactions
@@ -123,6 +127,7 @@ def main(folder=None, print_formatted_KPP_file=True, GC_version=None,
     fam = 'LOx'
     df_fam = AC.get_reactants_and_products4tagged_fam(folder=folder,
                                                       KPP_output_mech=KPP_mech,
+                                                      rxn_index=KPP_mech_index,
                                                       fam=fam)
     # Loop reaction indexes for LOx family and add tags
     for n_key_, key_ in enumerate(rxn_dicts.keys()):
@@ -156,6 +161,7 @@ def main(folder=None, print_formatted_KPP_file=True, GC_version=None,
     rxn_dicts, tagged_rxns = AC.add_tags4strs2mech(rxn_dicts, counter=counter,
                                                    search_strs=search_strs,
                                                    tagged_rxns=tagged_rxns,
+                                                   rxn_index=rxn_index,
                                                    #                                                   debug=debug
                                                    )
     counter = max(tagged_rxns.keys())
@@ -199,6 +205,7 @@ def main(folder=None, print_formatted_KPP_file=True, GC_version=None,
     rxn_dicts, tagged_rxns = AC.add_tags4strs2mech(rxn_dicts, counter=counter,
                                                    search_strs=search_strs,
                                                    tagged_rxns=tagged_rxns,
+                                                   rxn_index=rxn_index,
                                                    search_reactants=True, )
     counter = max(tagged_rxns.keys())
     current_tag = '{}{}'.format(tag_prefix, counter)
@@ -14,6 +14,7 @@ import os.path
 import sys
 import numpy as np
 from pandas import DataFrame
+from netCDF4 import Dataset
 import AC_tools as AC
 
 # ---  Master  settings for main call
@@ -26,7 +27,7 @@ renumerated = True  # True#False#True # Use
 # make 3D gridded output netCDF?
 GRD_input_3D = True  # False#True
 # Are there mulitple sites?
-Multiple_sites = False  # True  # NOTE: this option is not currently working
+Multiple_sites = False  # True
 
 
 def main(wd, vars=None, npwd=None, GRD_input_3D=False, renumerated=False,
@@ -60,10 +61,12 @@ def main(wd, vars=None, npwd=None, GRD_input_3D=False, renumerated=False,
     if GRD_input_3D:
         make_3D_NetCDF(ncfilename=out_nc, wd=wd, debug=debug)
 
-    # Process multiple sites to "subgrouped" NetCDF file
-    # NOTE: this is currently not functioning ... TODO
+    # Process multiple sites to "subgrouped" NetCDF file (a group per site)
     if Multiple_sites:
-        make_2D_subgroup_NetCDF(ncfilename=out_nc, wd=wd, debug=debug)
+        files = get_pf_files(wd, renumerated=renumerated)
+        AC.mk_NetCDF_of_pf_files(files, by_site=True, n_workers=None,
+                                 debug=debug,
+                                 filename=out_nc.split('.nc')[0]+'_by_site.nc')
 
 
 def get_pf_files(wd, renumerated=False, debug=False):
@@ -89,57 +92,14 @@ def get_pf_files(wd, renumerated=False, debug=False):
 def mk_NetCDF_of_pf_files(files, ncfilename=None, debug=False):
     """ 
     Make a table like NetCDF file from to any pf output
-    """
-    # --- Setup NetCDF file
-    ncfile = Dataset(ncfilename, 'w', format='NETCDF4')
-
-    # ---  Loop files, read in and add to NetCDF
-    npoint = 1
-    for n, file in enumerate(files):
-
-        # If 1st file setup NetCDF
-        if n == 0:
-
-            # Get Header infomation from first file
-            vars, sites = get_pf_headers(files[0], debug=debug)
-
-            # Extract all points from file
-            df, vars = AC.pf_csv2pandas(file=file, vars=vars, epoch=True,
-                                        r_vars=True)
-            if debug:
-                print((df.shape, df.columns))
-
-            # set unlimited data points dimension (POINT)
-            POINT = ncfile.createDimension('POINT', None)
-
-            # loop and create variables for each column  (exc. last )
-            if debug:
-                print(vars)
-            [ncfile.createVariable(var, var2type(var), ('POINT'))
-             for var in vars]
-
-            # close the file
-            ncfile.close()
 
-        else:
-            # Extract all points from file
-            df, vars = AC.pf_csv2pandas(file=file, vars=vars, epoch=True,
-                                        r_vars=True)
-
-        # Open the file in append mode
-        ncfile = Dataset(ncfilename, 'a', format='NETCDF4')
-        if debug:
-            print((df.index))
-
-        # Fill variables for given
-        dim_len = len(df.index)
-        for var in vars:
-            ncfile.variables[var][npoint:npoint+dim_len] = df[var].values
-
-        # Tidy up and count
-        npoint += dim_len
-        del df
-        ncfile.close()
+    NOTES:
+    ---
+     - This now just calls the AC_tools function of the same name, which reads
+     files in parallel and writes them in batches
+    """
+    AC.mk_NetCDF_of_pf_files(sorted(files), filename=ncfilename,
+                             dtype=np.float64, n_workers=None, debug=debug)
 
 
 def var2type(var, debug=False):
@@ -206,11 +166,10 @@ def make_3D_NetCDF(ncfilename, wd, debug=False):
     lats, lons, Epoch = [ncfile2D[i] for i in ('LAT', 'LON', 'Epoch')]
     if debug:
         print([len(i) for i in (lats, lons, Epoch)])
-    lats, lons, Epoch = [np.array(i) for i in (lats, lons, Epoch)]
+    # (remove any fill values)
+    lats, lons, Epoch = [np.ma.compressed(i[:]) for i in (lats, lons, Epoch)]
 
     lats, lons = [list(sorted(set(i))) for i in (lats, lons)]
-    # remove fill value. ( 9.969209968386869e+36 ) <= Improve this approach...
-    [i.pop(-1) for i in (lons, lats)]
 
     # setup 3D NetCDF file
     ncfilename = ncfilename.split('.nc')[0]+'_3D.nc'
@@ -259,8 +218,6 @@ def make_3D_NetCDF(ncfilename, wd, debug=False):
 
     # Get unique timesteps
     timesteps = sorted(set(Epoch))
-    # masked 1st value ( headers? )
-    timesteps.pop(0)
 
     # set time dimension to timestep values
     time[:] = timesteps